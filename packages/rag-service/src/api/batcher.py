@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from src.config.settings import get_settings
+from src.rag.pipeline import get_rag_pipeline
+
+logger = logging.getLogger(__name__)
+
+
+class SearchBatcher:
+    """
+    Coalesces concurrent search queries into batched pipeline calls
+
+    Each request queues its query with a future and awaits it. A background
+    worker drains the queue until the batch is full or the wait window
+    expires, then answers the whole batch with one embedding call and one
+    vector store query.
+    """
+
+    def __init__(self, max_batch_size: int = 32, max_wait_ms: int = 75):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Queries taken off the queue and not yet answered
+        self._batch: List[Tuple[str, int, Optional[Dict[str, Any]], asyncio.Future]] = []
+
+    @property
+    def running(self) -> bool:
+        """Whether the background worker is running"""
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self):
+        """Start the background worker on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Search batcher started (batch size: {self.max_batch_size}, "
+            f"wait: {self.max_wait * 1000:.0f}ms)"
+        )
+
+    async def stop(self):
+        """Stop the background worker, failing queries it has not answered"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+
+        pending = [future for _, _, _, future in self._batch]
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait()[3])
+        for future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Search batcher stopped"))
+
+        self._worker = None
+        self._queue = None
+        self._batch = []
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Search for components, batched with other in-flight queries"""
+        if not self.running:
+            pipeline = get_rag_pipeline()
+            return await run_in_threadpool(
+                pipeline.search_components,
+                query=query,
+                limit=limit,
+                filters=filters
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query, limit, filters, future))
+        return await future
+
+    async def _run(self):
+        """Collect queued queries into batches and dispatch them"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            self._batch = batch
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._dispatch(batch)
+            self._batch = []
+
+    async def _dispatch(self, batch: List[Tuple[str, int, Optional[Dict[str, Any]], asyncio.Future]]):
+        """Answer a batch, grouping queries that share the same filters"""
+        groups: Dict[str, list] = {}
+        for item in batch:
+            filters_key = json.dumps(item[2], sort_keys=True, default=str)
+            groups.setdefault(filters_key, []).append(item)
+
+        pipeline = get_rag_pipeline()
+
+        for items in groups.values():
+            queries = [query for query, _, _, _ in items]
+            limit = max(item_limit for _, item_limit, _, _ in items)
+            filters = items[0][2]
+
+            try:
+                results = await run_in_threadpool(
+                    pipeline.search_components_batch,
+                    queries=queries,
+                    limit=limit,
+                    filters=filters
+                )
+            except Exception as e:
+                logger.error(f"Batched search failed: {e}")
+                for _, _, _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, item_limit, _, future), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result[:item_limit])
+
+
+# Global search batcher instance
+_search_batcher: Optional[SearchBatcher] = None
+
+
+def get_search_batcher() -> SearchBatcher:
+    """Get or create global search batcher instance"""
+    global _search_batcher
+    if _search_batcher is None:
+        settings = get_settings()
+        _search_batcher = SearchBatcher(
+            max_batch_size=settings.search_batch_size,
+            max_wait_ms=settings.search_batch_wait_ms
+        )
+    return _search_batcher
@@ -0,0 +1,36 @@
+from functools import lru_cache
+from typing import Dict, Any, Tuple
+
+from src.api.models import Component as ComponentModel
+
+
+@lru_cache(maxsize=4096)
+def _split_tags(tags: str) -> Tuple[str, ...]:
+    """Split a comma-separated tag string, cached since tag sets repeat across components"""
+    return tuple(tags.split(",")) if tags else ()
+
+
+def row_to_component(result: Dict[str, Any]) -> ComponentModel:
+    """
+    Build a Component from a vector store row
+
+    Rows come from our own ChromaDB collection, so the model is built with
+    model_construct and skips field validation.
+    """
+    return metadata_to_component(result.get("metadata") or {})
+
+
+def metadata_to_component(metadata: Dict[str, Any]) -> ComponentModel:
+    """Build a Component straight from a row's stored metadata"""
+    return ComponentModel.model_construct(
+        id=metadata.get("id", ""),
+        name=metadata.get("name", ""),
+        description=metadata.get("description", ""),
+        file_path=metadata.get("file_path", ""),
+        props=[],
+        examples=[],
+        category=metadata.get("category"),
+        import_path=metadata.get("import_path"),
+        export_type=metadata.get("export_type", "named"),
+        tags=list(_split_tags(metadata.get("tags") or ""))
+    )
@@ -0,0 +1,44 @@
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from src.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+# Global vector store executor instance
+_vs_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_vs_executor() -> ThreadPoolExecutor:
+    """
+    Get or create the executor for blocking vector store calls
+    
+    ChromaDB lookups are CPU-bound, so they run on a dedicated pool sized to
+    the core count instead of competing for the default threadpool limiter.
+    """
+    global _vs_executor
+    if _vs_executor is None:
+        settings = get_settings()
+        max_workers = settings.vector_store_workers or os.cpu_count() or 4
+        _vs_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vs")
+        logger.info(f"Vector store executor started with {max_workers} workers")
+    return _vs_executor
+
+
+def shutdown_vs_executor():
+    """Shut down the vector store executor, waiting for running calls"""
+    global _vs_executor
+    if _vs_executor is not None:
+        _vs_executor.shutdown(wait=True, cancel_futures=True)
+        _vs_executor = None
+
+
+async def run_vs(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking vector store call on the vector store executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_vs_executor(), functools.partial(fn, *args, **kwargs))
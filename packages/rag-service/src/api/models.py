@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import Optional, List, Dict, Any
 
 
@@ -78,6 +78,14 @@ class ScanResult(BaseModel):
     errors: List[str] = []
 
 
+class ScanTask(BaseModel):
+    """Background scan task status"""
+    task_id: str
+    status: str
+    result: Optional[ScanResult] = None
+    error: Optional[str] = None
+
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str
@@ -85,3 +93,7 @@ class HealthResponse(BaseModel):
     chroma_status: str
     embedding_model: str
 
+
+# Shared serializers for the hottest responses, built once at import
+COMPONENT_LIST_ADAPTER = TypeAdapter(List[Component])
+SEARCH_RESPONSE_ADAPTER = TypeAdapter(SearchResponse)
@@ -1,42 +1,41 @@
 from fastapi import APIRouter, HTTPException, status, Body
-from typing import List
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from typing import List, Dict, Any, AsyncIterator
 import logging
-import uuid
 
-from src.api.models import Component as ComponentModel
-from src.rag.pipeline import get_rag_pipeline
+import orjson
+
+from src.api.models import Component as ComponentModel, COMPONENT_LIST_ADAPTER
+from src.api.converters import row_to_component
+from src.api.executor import run_vs
+from src.api.routes.search import clear_search_cache
+from src.config.settings import get_settings
+from src.util.ids import uuid7
+from src.rag.pipeline import RAGPipeline, get_rag_pipeline
 from src.db.vector_store import get_vector_store
+from src.db.schemas import ComponentSchema
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/components", tags=["components"])
 
+settings = get_settings()
+
 
 @router.get("", response_model=List[ComponentModel])
 async def list_components():
-    """List all components"""
+    """List all components, streamed page by page"""
     try:
         pipeline = get_rag_pipeline()
-        components_data = pipeline.get_all_components()
-        
-        components = []
-        for comp_data in components_data:
-            metadata = comp_data.get("metadata", {})
-            components.append(
-                ComponentModel(
-                    id=metadata.get("id", ""),
-                    name=metadata.get("name", ""),
-                    description=comp_data.get("document", "").split("\n")[1].replace("Description: ", "") if comp_data.get("document") else "",
-                    file_path=metadata.get("file_path", ""),
-                    props=[],
-                    examples=[],
-                    category=metadata.get("category"),
-                    import_path=metadata.get("import_path"),
-                    export_type=metadata.get("export_type", "named"),
-                    tags=metadata.get("tags", "").split(",") if metadata.get("tags") else []
-                )
-            )
+        page_size = settings.list_page_size
         
-        return components
+        # Fetch the first page up front so failures still produce an error response
+        first_page = await run_vs(pipeline.get_components_page, page_size, 0)
+        
+        return StreamingResponse(
+            _stream_components(pipeline, first_page, page_size),
+            media_type="application/json"
+        )
         
     except Exception as e:
         logger.error(f"Failed to list components: {e}")
@@ -46,12 +45,43 @@ async def list_components():
         )
 
 
+async def _stream_components(
+    pipeline: RAGPipeline,
+    page: List[Dict[str, Any]],
+    page_size: int
+) -> AsyncIterator[bytes]:
+    """Yield a JSON array of components, holding one page in memory at a time"""
+    yield b"["
+    
+    offset = 0
+    separator = b""
+    while page:
+        yield separator + b",".join(
+            orjson.dumps(row_to_component(comp_data).model_dump())
+            for comp_data in page
+        )
+        separator = b","
+        
+        if len(page) < page_size:
+            break
+        
+        offset += page_size
+        try:
+            page = await run_vs(pipeline.get_components_page, page_size, offset)
+        except Exception as e:
+            # The response has already started; end the array rather than emit invalid JSON
+            logger.error(f"Failed to stream components at offset {offset}: {e}")
+            break
+    
+    yield b"]"
+
+
 @router.get("/{component_id}", response_model=ComponentModel)
 async def get_component(component_id: str):
     """Get a component by ID"""
     try:
         pipeline = get_rag_pipeline()
-        comp_data = pipeline.get_component(component_id)
+        comp_data = await run_vs(pipeline.get_component, component_id)
         
         if not comp_data:
             raise HTTPException(
@@ -59,19 +89,7 @@ async def get_component(component_id: str):
                 detail=f"Component not found: {component_id}"
             )
         
-        metadata = comp_data.get("metadata", {})
-        return ComponentModel(
-            id=metadata.get("id", ""),
-            name=metadata.get("name", ""),
-            description=comp_data.get("document", "").split("\n")[1].replace("Description: ", "") if comp_data.get("document") else "",
-            file_path=metadata.get("file_path", ""),
-            props=[],
-            examples=[],
-            category=metadata.get("category"),
-            import_path=metadata.get("import_path"),
-            export_type=metadata.get("export_type", "named"),
-            tags=metadata.get("tags", "").split(",") if metadata.get("tags") else []
-        )
+        return row_to_component(comp_data)
         
     except HTTPException:
         raise
@@ -89,15 +107,13 @@ async def create_component(component: ComponentModel):
     try:
         # Generate ID if not provided
         if not component.id:
-            component.id = str(uuid.uuid4())
+            component.id = str(uuid7())
         
         pipeline = get_rag_pipeline()
         
-        # Convert to dict
-        component_dict = component.model_dump()
-        
         # Add to pipeline
-        success = pipeline.add_component(component_dict)
+        success = await run_in_threadpool(pipeline.add_component, component)
+        clear_search_cache()
         
         if not success:
             raise HTTPException(
@@ -126,11 +142,20 @@ async def update_component(component_id: str, component: ComponentModel):
         
         pipeline = get_rag_pipeline()
         
-        # Convert to dict
-        component_dict = component.model_dump()
+        # Identical payloads skip the embedding and the search cache reset
+        content_hash = ComponentSchema.content_hash(component)
+        if await run_vs(pipeline.is_unchanged, component_id, content_hash):
+            logger.info(f"Component unchanged: {component.name} ({component_id})")
+            return component
         
         # Update in pipeline
-        success = pipeline.update_component(component_dict)
+        success = await run_in_threadpool(
+            pipeline.update_component,
+            component,
+            content_hash=content_hash,
+            check_unchanged=False
+        )
+        clear_search_cache()
         
         if not success:
             raise HTTPException(
@@ -155,7 +180,8 @@ async def delete_component(component_id: str):
     """Delete a component"""
     try:
         pipeline = get_rag_pipeline()
-        success = pipeline.delete_component(component_id)
+        success = await run_vs(pipeline.delete_component, component_id)
+        clear_search_cache()
         
         if not success:
             raise HTTPException(
@@ -180,30 +206,18 @@ async def get_components_by_name(component_name: str):
         pipeline = get_rag_pipeline()
         
         # Search by name
-        results = pipeline.search_components(
+        results = await run_in_threadpool(
+            pipeline.search_components,
             query=f"Component: {component_name}",
             limit=10
         )
         
-        components = []
-        for result in results:
-            metadata = result.get("metadata", {})
-            components.append(
-                ComponentModel(
-                    id=metadata.get("id", ""),
-                    name=metadata.get("name", ""),
-                    description=result.get("document", "").split("\n")[1].replace("Description: ", "") if result.get("document") else "",
-                    file_path=metadata.get("file_path", ""),
-                    props=[],
-                    examples=[],
-                    category=metadata.get("category"),
-                    import_path=metadata.get("import_path"),
-                    export_type=metadata.get("export_type", "named"),
-                    tags=metadata.get("tags", "").split(",") if metadata.get("tags") else []
-                )
-            )
+        components = [row_to_component(result) for result in results]
         
-        return components
+        return Response(
+            content=COMPONENT_LIST_ADAPTER.dump_json(components),
+            media_type="application/json"
+        )
         
     except Exception as e:
         logger.error(f"Failed to get components by name: {e}")
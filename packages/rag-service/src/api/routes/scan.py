@@ -1,45 +1,30 @@
 from fastapi import APIRouter, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from collections import OrderedDict
+import asyncio
+import functools
 import logging
 import os
 
-from src.api.models import ScanComponentFolderRequest, ScanResult
+from src.api.models import ScanComponentFolderRequest, ScanResult, ScanTask
+from src.api.routes.search import clear_search_cache
 from src.intelligence.component_scanner import get_component_scanner
+from src.util.ids import uuid7
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/scan", tags=["scan"])
 
+# Background scans by task id; the oldest finished tasks are dropped first
+_MAX_SCAN_TASKS = 100
+_scan_tasks: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+
 
 @router.post("", response_model=ScanResult)
 async def scan_component_folder(request: ScanComponentFolderRequest):
     """Scan a component folder and index components"""
     try:
-        # Validate folder path
-        if not os.path.exists(request.folder_path):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Folder not found: {request.folder_path}"
-            )
-        
-        if not os.path.isdir(request.folder_path):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Path is not a directory: {request.folder_path}"
-            )
-        
-        # Scan the folder
-        scanner = get_component_scanner()
-        result = scanner.scan_folder(
-            folder_path=request.folder_path,
-            include_storybooks=request.include_storybooks,
-            include_tests=request.include_tests,
-            recursive=request.recursive
-        )
-        
-        return ScanResult(
-            components_found=result["components_found"],
-            components=result["components"],
-            errors=result.get("errors", [])
-        )
+        await _validate_folder(request.folder_path)
+        return await _scan(request)
         
     except HTTPException:
         raise
@@ -50,3 +35,93 @@ async def scan_component_folder(request: ScanComponentFolderRequest):
             detail=f"Scan failed: {str(e)}"
         )
 
+
+@router.post("/async", response_model=ScanTask, status_code=status.HTTP_202_ACCEPTED)
+async def start_scan_task(request: ScanComponentFolderRequest):
+    """Start scanning a component folder in the background"""
+    await _validate_folder(request.folder_path)
+    
+    task_id = uuid7().hex
+    task = asyncio.create_task(_scan(request))
+    task.add_done_callback(functools.partial(_log_scan_failure, task_id))
+    _scan_tasks[task_id] = task
+    _prune_scan_tasks()
+    
+    logger.info(f"Started scan task {task_id}: {request.folder_path}")
+    return ScanTask(task_id=task_id, status="running")
+
+
+@router.get("/{task_id}", response_model=ScanTask)
+async def get_scan_task(task_id: str):
+    """Get the status of a background scan"""
+    task = _scan_tasks.get(task_id)
+    if task is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Scan task not found: {task_id}"
+        )
+    
+    if not task.done():
+        return ScanTask(task_id=task_id, status="running")
+    
+    if task.cancelled():
+        return ScanTask(task_id=task_id, status="failed", error="Scan was cancelled")
+    
+    error = task.exception()
+    if error is not None:
+        return ScanTask(task_id=task_id, status="failed", error=str(error))
+    
+    return ScanTask(task_id=task_id, status="completed", result=task.result())
+
+
+async def _validate_folder(folder_path: str):
+    """Raise a 400 unless the path is an existing directory"""
+    if not await run_in_threadpool(os.path.exists, folder_path):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Folder not found: {folder_path}"
+        )
+    
+    if not await run_in_threadpool(os.path.isdir, folder_path):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Path is not a directory: {folder_path}"
+        )
+
+
+async def _scan(request: ScanComponentFolderRequest) -> ScanResult:
+    """Run the scanner off the event loop and reset cached searches"""
+    scanner = get_component_scanner()
+    result = await run_in_threadpool(
+        scanner.scan_folder,
+        folder_path=request.folder_path,
+        include_storybooks=request.include_storybooks,
+        include_tests=request.include_tests,
+        recursive=request.recursive
+    )
+    clear_search_cache()
+    
+    return ScanResult(
+        components_found=result["components_found"],
+        components=[component.to_dict() for component in result["components"]],
+        errors=result.get("errors", [])
+    )
+
+
+def _log_scan_failure(task_id: str, task: asyncio.Task):
+    """Log a failed background scan, whether or not anyone polls its status"""
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        logger.error(f"Scan task {task_id} failed: {error}")
+
+
+def _prune_scan_tasks():
+    """Forget the oldest finished scans once too many are stored"""
+    if len(_scan_tasks) <= _MAX_SCAN_TASKS:
+        return
+    for task_id in [t for t, task in _scan_tasks.items() if task.done()]:
+        del _scan_tasks[task_id]
+        if len(_scan_tasks) <= _MAX_SCAN_TASKS:
+            break
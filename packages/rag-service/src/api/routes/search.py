@@ -1,64 +1,124 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Response
+from typing import List, Dict, Any, Optional
+from cachetools import TTLCache
+import hashlib
 import logging
 
+import orjson
+
 from src.api.models import (
     SearchRequest,
     SearchResponse,
     SearchResult,
-    Component as ComponentModel
+    SEARCH_RESPONSE_ADAPTER,
 )
-from src.rag.pipeline import get_rag_pipeline
+from src.api.batcher import get_search_batcher
+from src.api.converters import metadata_to_component
+from src.config.settings import get_settings
+from src.rag.pipeline import RAGPipeline
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/search", tags=["search"])
 
+settings = get_settings()
+
+# Shared by every search result; responses are only serialized, never mutated
+_MATCHED_NAME_DESCRIPTION = ["name", "description"]
+_MATCHED_DESCRIPTION = ["description"]
+
+# Recent search responses, keyed by write generation, endpoint, normalized
+# query, limit and filters
+_response_cache = TTLCache(maxsize=settings.search_cache_size, ttl=settings.search_cache_ttl)
+# Bumped by clear_search_cache, so a search that read the index before a
+# write finished caches its response under a generation no longer looked up
+_cache_generation = 0
+
+
+def _cache_key(kind: str, query: str, limit: int, filters: Optional[Dict[str, Any]]) -> str:
+    """Build the response cache key for a search request"""
+    key = hashlib.blake2b(digest_size=16)
+    for part in (
+        kind.encode(),
+        query.strip().lower().encode(),
+        str(limit).encode(),
+        orjson.dumps(filters or {}, option=orjson.OPT_SORT_KEYS),
+    ):
+        key.update(part)
+        key.update(b"\0")
+    return key.hexdigest()
+
+
+def _get_cached_response(generation: int, key: str, query: str) -> Optional[SearchResponse]:
+    """Return a cached response for the key, echoing the caller's query"""
+    cached = _response_cache.get((generation, key))
+    if cached is None:
+        return None
+    
+    return SearchResponse.model_construct(
+        results=cached.results,
+        total=cached.total,
+        query=query
+    )
+
+
+def _json_response(response: SearchResponse) -> Response:
+    """Serialize a search response with the shared pydantic-core serializer"""
+    return Response(
+        content=SEARCH_RESPONSE_ADAPTER.dump_json(response),
+        media_type="application/json"
+    )
+
+
+def _cache_response(generation: int, key: str, response: SearchResponse):
+    """Store a response in the cache under the generation it was searched in"""
+    _response_cache[(generation, key)] = response
+
+
+def clear_search_cache():
+    """Drop cached search responses after the indexed components change"""
+    global _cache_generation
+    _cache_generation += 1
+    _response_cache.clear()
+
 
 @router.post("", response_model=SearchResponse)
 async def search_components(request: SearchRequest):
     """Search for components using semantic search"""
     try:
-        pipeline = get_rag_pipeline()
+        limit = request.limit or 10
+        generation = _cache_generation
+        cache_key = _cache_key("search", request.query, limit, request.filters)
+        cached = _get_cached_response(generation, cache_key, request.query)
+        if cached is not None:
+            return _json_response(cached)
+        
+        batcher = get_search_batcher()
         
         # Perform search
-        results = pipeline.search_components(
+        results = await batcher.search(
             query=request.query,
-            limit=request.limit or 10,
+            limit=limit,
             filters=request.filters
         )
         
         # Convert to response format
-        search_results = []
-        for result in results:
-            metadata = result.get("metadata", {})
-            
-            # Reconstruct component from metadata
-            component = ComponentModel(
-                id=metadata.get("id", ""),
-                name=metadata.get("name", ""),
-                description=result.get("document", "").split("\n")[1].replace("Description: ", ""),
-                file_path=metadata.get("file_path", ""),
-                props=[],
-                examples=[],
-                category=metadata.get("category"),
-                import_path=metadata.get("import_path"),
-                export_type=metadata.get("export_type", "named"),
-                tags=metadata.get("tags", "").split(",") if metadata.get("tags") else []
-            )
-            
-            search_results.append(
-                SearchResult(
-                    component=component,
-                    score=result.get("score", 0.0),
-                    matched_fields=["name", "description"]
-                )
+        search_results = [
+            SearchResult.model_construct(
+                component=metadata_to_component(result["metadata"] or {}),
+                score=result.get("score", 0.0),
+                matched_fields=_MATCHED_NAME_DESCRIPTION
             )
+            for result in results
+        ]
         
-        return SearchResponse(
+        response = SearchResponse.model_construct(
             results=search_results,
             total=len(search_results),
             query=request.query
         )
+        _cache_response(generation, cache_key, response)
+        
+        return _json_response(response)
         
     except Exception as e:
         logger.error(f"Search failed: {e}")
@@ -72,45 +132,39 @@ async def search_components(request: SearchRequest):
 async def suggest_components(request: SearchRequest):
     """Suggest components based on UI description"""
     try:
-        pipeline = get_rag_pipeline()
+        limit = request.limit or 5
+        generation = _cache_generation
+        cache_key = _cache_key("suggest", request.query, limit, None)
+        cached = _get_cached_response(generation, cache_key, request.query)
+        if cached is not None:
+            return _json_response(cached)
+        
+        batcher = get_search_batcher()
         
         # Get suggestions
-        results = pipeline.suggest_component_for_ui(
-            ui_description=request.query,
-            limit=request.limit or 5
+        results = await batcher.search(
+            query=RAGPipeline.build_ui_query(request.query),
+            limit=limit
         )
         
         # Convert to response format
-        search_results = []
-        for result in results:
-            metadata = result.get("metadata", {})
-            
-            component = ComponentModel(
-                id=metadata.get("id", ""),
-                name=metadata.get("name", ""),
-                description=result.get("document", "").split("\n")[1].replace("Description: ", ""),
-                file_path=metadata.get("file_path", ""),
-                props=[],
-                examples=[],
-                category=metadata.get("category"),
-                import_path=metadata.get("import_path"),
-                export_type=metadata.get("export_type", "named"),
-                tags=metadata.get("tags", "").split(",") if metadata.get("tags") else []
-            )
-            
-            search_results.append(
-                SearchResult(
-                    component=component,
-                    score=result.get("score", 0.0),
-                    matched_fields=["description"]
-                )
+        search_results = [
+            SearchResult.model_construct(
+                component=metadata_to_component(result["metadata"] or {}),
+                score=result.get("score", 0.0),
+                matched_fields=_MATCHED_DESCRIPTION
             )
+            for result in results
+        ]
         
-        return SearchResponse(
+        response = SearchResponse.model_construct(
             results=search_results,
             total=len(search_results),
             query=request.query
         )
+        _cache_response(generation, cache_key, response)
+        
+        return _json_response(response)
         
     except Exception as e:
         logger.error(f"Suggest failed: {e}")
@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
+import dataclasses
 
 
 class Settings(BaseSettings):
@@ -11,18 +13,80 @@ class Settings(BaseSettings):
     api_prefix: str = "/api"
     host: str = "127.0.0.1"
     port: int = 8765
+    # Worker processes when started with `python -m src.main`; each loads its
+    # own embedding model, and more than one needs a ChromaDB server (chroma_host)
+    workers: int = 1
+    reload: bool = False
+    # Load the torch embedding model when src.main is imported, so a forking
+    # server started with --preload (gunicorn) shares one copy between workers
+    preload_embedding_model: bool = False
     
     # ChromaDB Settings
     chroma_persist_directory: str = "./chroma_data"
     chroma_collection_name: str = "components"
+    # Distance for new collections: "cosine", or "ip" (inner product), which
+    # skips normalizing vectors that EmbeddingService already normalizes
+    chroma_space: str = "cosine"
+    # Connect to a ChromaDB server instead of the embedded store when set
+    chroma_host: Optional[str] = None
+    chroma_port: int = 8000
+    chroma_http_pool_size: int = 64
+    # Embedded collections up to this size are searched by brute force in memory
+    exact_search_max_components: int = 10000  # 0 disables
+    # Hold that copy as int8, a quarter of the memory, with scores accurate to about 1%
+    exact_search_int8: bool = False
+    
+    # Scan Settings
+    # Extraction cache file; defaults to .component-cache.json in the Chroma directory
+    component_cache_path: Optional[str] = None
+    # Node.js used to run the TypeScript parser (e.g. "node"); empty keeps
+    # heuristic parsing
+    node_executable: Optional[str] = None
+    # Seconds to wait for the TypeScript parser to answer before falling back
+    parser_timeout: float = 60.0
     
     # Embedding Settings
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     embedding_dimension: int = 384
+    # Texts per encoder forward pass; each call is length-sorted before batching
+    embedding_batch_size: int = 64
+    # "torch" runs the sentence-transformers model; "onnx" runs the ONNX export
+    # in the model repository (embedding_onnx_file) on ONNX Runtime
+    embedding_backend: str = "torch"
+    embedding_onnx_file: str = "onnx/model.onnx"
+    # "fp32", "fp16" or "bf16"; half precision applies to the torch backend on CUDA
+    embedding_precision: str = "fp32"
+    query_embedding_cache_size: int = 1024  # 0 disables
+    # Encode in this many worker processes, each with its own copy of the model
+    encode_processes: int = 0  # 0 encodes in the service process
     
     # Search Settings
     default_search_limit: int = 10
     max_search_limit: int = 50
+    search_batch_size: int = 32
+    search_batch_wait_ms: int = 75
+    search_cache_size: int = 4096
+    search_cache_ttl: int = 60
+    # Queries this similar (cosine) to a recent one reuse its results
+    search_similarity_threshold: float = 0.97
+    search_similarity_cache_size: int = 256  # 0 disables
+    # Seconds similarity-cached results are served; bounds how long writes made
+    # by other worker processes go unseen
+    search_similarity_cache_ttl: float = 60.0
+    # Added to the score of components with Storybook examples, scaled by
+    # n / (n + 1) for n examples, reordering each page of results
+    search_example_weight: float = 0.0  # 0 disables
+    list_page_size: int = 500
+    # Seconds a component listing is reused; any write made here refreshes it sooner
+    list_cache_ttl: float = 5.0  # 0 disables
+    
+    # Concurrency Settings
+    thread_pool_size: int = 128
+    vector_store_workers: Optional[int] = None  # Defaults to the CPU count
+    scan_workers: Optional[int] = None  # Defaults to the CPU count; 1 disables
+    # Threads per embedding forward pass; with several uvicorn workers, keep
+    # workers x torch_num_threads within the core count
+    torch_num_threads: Optional[int] = None  # Defaults to the CPU count divided by workers
     
     # CORS Settings
     cors_origins: list[str] = ["*"]
@@ -32,8 +96,18 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
 
 
+# Immutable snapshot of the settings handed to the rest of the service, so that
+# hot-path attribute reads are plain slot lookups rather than model access
+FrozenSettings = dataclasses.make_dataclass(
+    "FrozenSettings",
+    [(name, field.annotation) for name, field in Settings.model_fields.items()],
+    frozen=True,
+    slots=True,
+)
+
+
 @lru_cache()
-def get_settings() -> Settings:
-    """Get cached settings instance"""
-    return Settings()
+def get_settings() -> FrozenSettings:
+    """Get cached settings instance, frozen after loading"""
+    return FrozenSettings(**Settings().model_dump())
 
@@ -0,0 +1,187 @@
+from typing import List, Dict, Any, Optional, Tuple, Union
+import threading
+
+import numpy as np
+
+from src.rag.vector_math import normalize
+
+
+# Rows of an int8 matrix converted back to float32 at a time during a search
+DEQUANTIZE_BLOCK_ROWS = 1024
+
+
+def quantize_rows(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantize each row to int8 with its own scale, so row ~= int8 row * scale"""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    rows = np.round(vectors / scales[:, np.newaxis]).astype(np.int8)
+    return rows, scales.astype(np.float32)
+
+
+class ExactIndex:
+    """
+    In-memory copy of a small collection, searched by brute force
+    
+    Embeddings are kept normalized in one contiguous float32 matrix, so a
+    search is a single matrix product followed by a partial sort, with no
+    HNSW traversal. Results are exact and have the layout of a ChromaDB
+    query, with cosine distances and similarity scores.
+    
+    With quantize=True the matrix is held as int8 with one scale per row, a
+    quarter of the memory, and scores are accurate to about 1%. numpy has no
+    int8 matrix product, so searches convert blocks of rows back to float32
+    and are somewhat slower; this lets far larger collections stay in memory.
+    """
+    
+    def __init__(self, quantize: bool = False):
+        self.quantize = quantize
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def add(self, ids, documents, embeddings, metadatas):
+        """Add components, leaving any already held as they are, as ChromaDB add does"""
+        self._write(ids, documents, embeddings, metadatas, insert=True, replace=False)
+    
+    def update(self, ids, documents, embeddings, metadatas):
+        """Replace components already held, ignoring the rest, as ChromaDB update does"""
+        self._write(ids, documents, embeddings, metadatas, insert=False, replace=True)
+    
+    def upsert(self, ids, documents, embeddings, metadatas):
+        """Add components, replacing any already held under the same IDs"""
+        self._write(ids, documents, embeddings, metadatas, insert=True, replace=True)
+    
+    def _write(
+        self,
+        ids: List[str],
+        documents: List[str],
+        embeddings: Union[List[List[float]], np.ndarray],
+        metadatas: List[Optional[Dict[str, Any]]],
+        insert: bool,
+        replace: bool
+    ):
+        """Apply a batch of writes to the held components"""
+        if not ids:
+            return
+        
+        vectors = normalize(embeddings)
+        scales = None
+        if self.quantize:
+            vectors, scales = quantize_rows(vectors)
+        
+        with self._lock:
+            appended = []
+            for row, component_id in enumerate(ids):
+                position = self._positions.get(component_id)
+                if position is None:
+                    if not insert:
+                        continue
+                    self._positions[component_id] = len(self._ids)
+                    self._ids.append(component_id)
+                    self._documents.append(documents[row])
+                    self._metadatas.append(metadatas[row] or {})
+                    appended.append(row)
+                elif replace:
+                    self._documents[position] = documents[row]
+                    self._metadatas[position] = metadatas[row] or {}
+                    self._matrix[position] = vectors[row]
+                    if scales is not None:
+                        self._scales[position] = scales[row]
+            
+            if appended:
+                rows = vectors[appended]
+                self._matrix = rows if self._matrix is None else np.vstack([self._matrix, rows])
+                if scales is not None:
+                    appended_scales = scales[appended]
+                    self._scales = (
+                        appended_scales if self._scales is None
+                        else np.concatenate([self._scales, appended_scales])
+                    )
+    
+    def delete(self, ids: List[str]):
+        """Remove components, ignoring IDs that are not held"""
+        with self._lock:
+            removed = {self._positions[i] for i in ids if i in self._positions}
+            if not removed:
+                return
+            
+            kept = [p for p in range(len(self._ids)) if p not in removed]
+            self._ids = [self._ids[p] for p in kept]
+            self._documents = [self._documents[p] for p in kept]
+            self._metadatas = [self._metadatas[p] for p in kept]
+            self._matrix = self._matrix[kept]
+            if self._scales is not None:
+                self._scales = self._scales[kept]
+            self._positions = {component_id: p for p, component_id in enumerate(self._ids)}
+    
+    def search(
+        self,
+        query_embeddings: Union[List[List[float]], np.ndarray],
+        limit: int,
+        filters: Optional[Dict[str, List[Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Find the components most similar to each query embedding
+        
+        Args:
+            query_embeddings: One embedding per query
+            limit: Maximum number of results per query
+            filters: Metadata field to the values it may take; all must match
+        
+        Returns:
+            Result rows in ChromaDB's query layout, one per query embedding
+        """
+        queries = normalize(query_embeddings)
+        with self._lock:
+            ids, documents, metadatas = self._ids, self._documents, self._metadatas
+            scores = self._scores(queries)
+            
+            if filters:
+                allowed = np.fromiter(
+                    (all(m.get(key) in values for key, values in filters.items()) for m in metadatas),
+                    dtype=bool,
+                    count=len(metadatas)
+                )
+                scores[~allowed] = -np.inf
+                candidates = int(allowed.sum())
+            else:
+                candidates = len(ids)
+        
+        k = min(limit, candidates)
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": [], "scores": []}
+        for column in scores.T:
+            if k > 0:
+                top = np.argpartition(-column, k - 1)[:k]
+                top = top[np.argsort(-column[top], kind="stable")]
+            else:
+                top = np.empty(0, dtype=np.intp)
+            
+            row_scores = column[top].astype(np.float64)
+            results["ids"].append([ids[i] for i in top])
+            results["documents"].append([documents[i] for i in top])
+            results["metadatas"].append([metadatas[i] for i in top])
+            results["distances"].append((1.0 - row_scores).tolist())
+            results["scores"].append(row_scores.tolist())
+        
+        return results
+    
+    def _scores(self, queries: np.ndarray) -> np.ndarray:
+        """Similarity of every held component (rows) to every query (columns)"""
+        if self._matrix is None:
+            return np.empty((0, len(queries)), dtype=np.float32)
+        if self._scales is None:
+            return self._matrix @ queries.T
+        
+        scores = np.empty((len(self._matrix), len(queries)), dtype=np.float32)
+        for start in range(0, len(self._matrix), DEQUANTIZE_BLOCK_ROWS):
+            block = self._matrix[start:start + DEQUANTIZE_BLOCK_ROWS].astype(np.float32)
+            scores[start:start + DEQUANTIZE_BLOCK_ROWS] = block @ queries.T
+        scores *= self._scales[:, np.newaxis]
+        return scores
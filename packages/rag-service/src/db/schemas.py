@@ -1,50 +1,128 @@
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+import hashlib
+import threading
+
+import orjson
+from pydantic import BaseModel
+
+# Components arrive as dicts, as the scanner's dataclasses and as models from the API;
+# fields are read through ComponentSchema.field, so any of these works
+ComponentLike = Any
+
+# Documents built for recently indexed content, keyed by content hash
+_DOCUMENT_CACHE_SIZE = 4096
+_document_cache: "OrderedDict[str, str]" = OrderedDict()
+# Documents are built from threadpool threads, so cache access is serialized
+_document_cache_lock = threading.Lock()
 
 
 class ComponentSchema:
     """Schema for component documents in ChromaDB"""
     
     @staticmethod
-    def to_document(component: Dict[str, Any]) -> str:
-        """Convert component to searchable document text"""
+    def field(component: Any, name: str, default: Any = None) -> Any:
+        """Read a field from a dict or a model, treating None as missing"""
+        if isinstance(component, dict):
+            value = component.get(name)
+        else:
+            value = getattr(component, name, None)
+        return default if value is None else value
+    
+    @staticmethod
+    def content_hash(component: ComponentLike) -> str:
+        """Stable hash of a component's content, used to detect unchanged re-indexes"""
+        if isinstance(component, BaseModel):
+            payload = component.model_dump_json().encode()
+        else:
+            payload = orjson.dumps(component, option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    @staticmethod
+    def to_document(component: ComponentLike, content_hash: Optional[str] = None) -> str:
+        """
+        Convert component to searchable document text
+        
+        When the component's content hash is given, the document is reused
+        from a cache of recently built documents.
+        """
+        if content_hash is None:
+            return ComponentSchema._build_document(component)
+        
+        with _document_cache_lock:
+            document = _document_cache.get(content_hash)
+            if document is not None:
+                _document_cache.move_to_end(content_hash)
+                return document
+        
+        document = ComponentSchema._build_document(component)
+        with _document_cache_lock:
+            _document_cache[content_hash] = document
+            _document_cache.move_to_end(content_hash)
+            if len(_document_cache) > _DOCUMENT_CACHE_SIZE:
+                _document_cache.popitem(last=False)
+        return document
+    
+    @staticmethod
+    def _build_document(component: ComponentLike) -> str:
+        """Assemble the searchable document text for a component"""
+        field = ComponentSchema.field
         parts = [
-            f"Component: {component.get('name', '')}",
-            f"Description: {component.get('description', '')}",
-            f"Category: {component.get('category', 'Uncategorized')}",
+            f"Component: {field(component, 'name', '')}",
+            f"Description: {field(component, 'description', '')}",
+            f"Category: {field(component, 'category', 'Uncategorized')}",
         ]
         
         # Add props information
-        props = component.get('props', [])
+        props = field(component, 'props', [])
         if props:
-            prop_names = [p.get('name', '') for p in props]
+            prop_names = [field(p, 'name', '') for p in props]
             parts.append(f"Props: {', '.join(prop_names)}")
         
         # Add tags
-        tags = component.get('tags', [])
+        tags = field(component, 'tags', [])
         if tags:
             parts.append(f"Tags: {', '.join(tags)}")
         
         # Add examples
-        examples = component.get('examples', [])
+        examples = field(component, 'examples', [])
         if examples:
-            example_titles = [e.get('title', '') for e in examples]
+            example_titles = [field(e, 'title', '') for e in examples]
             parts.append(f"Examples: {', '.join(example_titles)}")
         
         return "\n".join(parts)
     
     @staticmethod
-    def to_metadata(component: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert component to metadata for ChromaDB"""
+    def to_metadata(component: ComponentLike, content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Convert component to metadata for ChromaDB
+        
+        ChromaDB rejects None metadata values, so missing fields fall back to
+        their defaults.
+        """
+        field = ComponentSchema.field
         return {
-            "id": component.get("id", ""),
-            "name": component.get("name", ""),
-            "category": component.get("category", ""),
-            "file_path": component.get("file_path", ""),
-            "import_path": component.get("import_path", ""),
-            "export_type": component.get("export_type", "named"),
-            "theme_wrapper": component.get("theme_wrapper", ""),
-            "num_props": len(component.get("props", [])),
-            "num_examples": len(component.get("examples", [])),
-            "tags": ",".join(component.get("tags", [])),
+            "id": field(component, "id", ""),
+            "name": field(component, "name", ""),
+            "description": field(component, "description", ""),
+            "category": field(component, "category", ""),
+            "file_path": field(component, "file_path", ""),
+            "import_path": field(component, "import_path", ""),
+            "export_type": field(component, "export_type", "named"),
+            "theme_wrapper": field(component, "theme_wrapper", ""),
+            "num_props": len(field(component, "props", [])),
+            "num_examples": len(field(component, "examples", [])),
+            "tags": ",".join(field(component, "tags", [])),
+            "content_hash": content_hash or ComponentSchema.content_hash(component),
         }
+    
+    @staticmethod
+    def description_from_document(document: str) -> str:
+        """Recover the description from a document built by to_document"""
+        if not document:
+            return ""
+        lines = document.split("\n")
+        if len(lines) < 2:
+            return ""
+        return lines[1].replace("Description: ", "", 1)
 
@@ -1,13 +1,44 @@
 import chromadb
 from chromadb.config import Settings as ChromaSettings
-from typing import List, Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any, Callable, Optional, Tuple, Union
 import logging
+import threading
+
+import numpy as np
+from cachetools import TTLCache
 
 from src.config.settings import get_settings
+from src.db.exact_index import ExactIndex
+from src.db.schemas import ComponentSchema
 
 logger = logging.getLogger(__name__)
 
 
+# Component listings held by the read cache, across page sizes and offsets
+_READ_CACHE_SIZE = 64
+
+# Components read per page when checking for descriptions to backfill
+_BACKFILL_PAGE_SIZE = 1000
+
+# Metadata fields that search filters may match on
+_ALLOWED_FILTER_KEYS = frozenset({"category", "export_type", "import_path"})
+
+
+def _filter_values(value: Any) -> List[Any]:
+    """The values a filter accepts, given one value or a list of them"""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return list(value)
+    return [value]
+
+
+def _match_filter(field: str, value: Any) -> Dict[str, Any]:
+    """Build a where clause matching a field against one value or any of a list"""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return {field: {"$in": list(value)}}
+    return {field: value}
+
+
 class VectorStore:
     """ChromaDB vector store wrapper"""
     
@@ -15,32 +46,138 @@ class VectorStore:
         self.settings = get_settings()
         self.client = None
         self.collection = None
+        self._exact_index: Optional[ExactIndex] = None
+        self._exact_lock = threading.Lock()
+        
+        # Recent component listings, keyed by the number of writes made so far
+        self._generation = 0
+        self._read_cache: Optional[TTLCache] = (
+            TTLCache(maxsize=_READ_CACHE_SIZE, ttl=self.settings.list_cache_ttl)
+            if self.settings.list_cache_ttl > 0 else None
+        )
+        self._read_cache_lock = threading.Lock()
+        
         self._initialize()
     
     def _initialize(self):
         """Initialize ChromaDB client and collection"""
         try:
-            # Create ChromaDB client with persistent storage
-            self.client = chromadb.Client(
-                ChromaSettings(
-                    persist_directory=self.settings.chroma_persist_directory,
-                    anonymized_telemetry=False,
+            if self.settings.chroma_host:
+                self.client = self._create_http_client()
+            else:
+                # Create ChromaDB client with persistent storage
+                self.client = chromadb.Client(
+                    ChromaSettings(
+                        persist_directory=self.settings.chroma_persist_directory,
+                        anonymized_telemetry=False,
+                    )
                 )
-            )
             
-            # Get or create collection
-            self.collection = self.client.get_or_create_collection(
-                name=self.settings.chroma_collection_name,
-                metadata={"hnsw:space": "cosine"}
-            )
+            # Get or create collection; the space is fixed when the index is
+            # created, and passing another would only rewrite its metadata
+            try:
+                self.collection = self.client.get_collection(
+                    name=self.settings.chroma_collection_name
+                )
+            except Exception:
+                self.collection = self.client.get_or_create_collection(
+                    name=self.settings.chroma_collection_name,
+                    metadata={"hnsw:space": self.settings.chroma_space}
+                )
+            
+            space = (self.collection.metadata or {}).get("hnsw:space", "l2")
+            if space != self.settings.chroma_space:
+                logger.warning(
+                    f"Collection {self.settings.chroma_collection_name} uses '{space}' distance, "
+                    f"not '{self.settings.chroma_space}'; recreate it to switch"
+                )
             
             logger.info(f"Initialized ChromaDB collection: {self.settings.chroma_collection_name}")
             logger.info(f"Collection count: {self.collection.count()}")
             
+            self._backfill_descriptions()
+            self._exact_index = None
+            self._generation += 1
+            
         except Exception as e:
             logger.error(f"Failed to initialize ChromaDB: {e}")
             raise
     
+    def _create_http_client(self):
+        """
+        Create a client for a ChromaDB server
+        
+        The client keeps one HTTP session for its lifetime; its connection pool
+        is enlarged so concurrent threadpool requests reuse warm keep-alive
+        connections instead of opening new ones.
+        """
+        client = chromadb.HttpClient(
+            host=self.settings.chroma_host,
+            port=str(self.settings.chroma_port),
+            settings=ChromaSettings(anonymized_telemetry=False),
+        )
+        
+        session = getattr(getattr(client, "_server", None), "_session", None)
+        if session is not None:
+            adapter = HTTPAdapter(
+                pool_connections=self.settings.chroma_http_pool_size // 2,
+                pool_maxsize=self.settings.chroma_http_pool_size,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        
+        logger.info(f"Connected to ChromaDB server at {self.settings.chroma_host}:{self.settings.chroma_port}")
+        return client
+    
+    def _backfill_descriptions(self):
+        """
+        Store the description in metadata for components indexed before it was
+        kept there, recovering it from the document text
+        
+        Runs on every startup, so only metadata is read, a page at a time, and
+        documents are fetched just for the components missing a description.
+        ChromaDB can only replace collection metadata as a whole, hnsw:space
+        included, so no marker is kept to skip the check.
+        """
+        try:
+            missing = []
+            offset = 0
+            while True:
+                page = self.collection.get(
+                    include=["metadatas"],
+                    limit=_BACKFILL_PAGE_SIZE,
+                    offset=offset
+                )
+                missing.extend(
+                    component_id
+                    for component_id, metadata in zip(page["ids"], page["metadatas"])
+                    if "description" not in (metadata or {})
+                )
+                if len(page["ids"]) < _BACKFILL_PAGE_SIZE:
+                    break
+                offset += _BACKFILL_PAGE_SIZE
+            
+            for start in range(0, len(missing), _BACKFILL_PAGE_SIZE):
+                result = self.collection.get(
+                    ids=missing[start:start + _BACKFILL_PAGE_SIZE],
+                    include=["documents", "metadatas"]
+                )
+                self.collection.update(
+                    ids=result["ids"],
+                    metadatas=[
+                        {
+                            **(metadata or {}),
+                            "description": ComponentSchema.description_from_document(document)
+                        }
+                        for metadata, document in zip(result["metadatas"], result["documents"])
+                    ]
+                )
+            
+            if missing:
+                logger.info(f"Backfilled descriptions for {len(missing)} components")
+        except Exception as e:
+            logger.error(f"Failed to backfill component descriptions: {e}")
+    
     def add_component(
         self,
         component_id: str,
@@ -56,6 +193,7 @@ class VectorStore:
                 documents=[document],
                 metadatas=[metadata]
             )
+            self._record_write(ExactIndex.add, [component_id], [document], [embedding], [metadata])
             return True
         except Exception as e:
             logger.error(f"Failed to add component {component_id}: {e}")
@@ -76,6 +214,7 @@ class VectorStore:
                 documents=[document],
                 metadatas=[metadata]
             )
+            self._record_write(ExactIndex.update, [component_id], [document], [embedding], [metadata])
             return True
         except Exception as e:
             logger.error(f"Failed to update component {component_id}: {e}")
@@ -85,35 +224,150 @@ class VectorStore:
         """Delete a component from the vector store"""
         try:
             self.collection.delete(ids=[component_id])
+            self._record_write(ExactIndex.delete, [component_id])
             return True
         except Exception as e:
             logger.error(f"Failed to delete component {component_id}: {e}")
             return False
     
+    def add_components(
+        self,
+        ids: List[str],
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]]
+    ) -> bool:
+        """Add several components to the vector store in one call"""
+        try:
+            self.collection.add(
+                ids=ids,
+                embeddings=embeddings,
+                documents=documents,
+                metadatas=metadatas
+            )
+            self._record_write(ExactIndex.add, ids, documents, embeddings, metadatas)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to add {len(ids)} components: {e}")
+            return False
+    
+    def update_components(
+        self,
+        ids: List[str],
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]]
+    ) -> bool:
+        """Update several components in the vector store in one call"""
+        try:
+            self.collection.update(
+                ids=ids,
+                embeddings=embeddings,
+                documents=documents,
+                metadatas=metadatas
+            )
+            self._record_write(ExactIndex.update, ids, documents, embeddings, metadatas)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update {len(ids)} components: {e}")
+            return False
+    
+    def upsert_components(
+        self,
+        ids: List[str],
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]]
+    ) -> bool:
+        """Add several components, replacing any already stored under the same IDs"""
+        try:
+            self.collection.upsert(
+                ids=ids,
+                embeddings=embeddings,
+                documents=documents,
+                metadatas=metadatas
+            )
+            self._record_write(ExactIndex.upsert, ids, documents, embeddings, metadatas)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to upsert {len(ids)} components: {e}")
+            return False
+    
+    def delete_components(self, ids: List[str]) -> bool:
+        """Delete several components from the vector store in one call"""
+        try:
+            self.collection.delete(ids=ids)
+            self._record_write(ExactIndex.delete, ids)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete {len(ids)} components: {e}")
+            return False
+    
     def search(
         self,
-        query_embedding: List[float],
+        query_embedding: Union[List[float], List[List[float]], np.ndarray],
         limit: int = 10,
         filters: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Search for similar components"""
+        """
+        Search for similar components
+        
+        Accepts a single embedding or several, as lists or a numpy array.
+        ChromaDB answers several embeddings in one query, with one result row
+        per embedding. Each row's distances are also converted to similarity
+        scores under "scores"; for normalized embeddings, cosine and inner
+        product distances are both 1 - similarity.
+        
+        While an embedded collection holds at most exact_search_max_components,
+        searches go to an in-memory ExactIndex instead, which returns the same
+        layout with exact rather than approximate nearest neighbours.
+        """
+        if isinstance(query_embedding, np.ndarray):
+            query_embeddings = np.atleast_2d(query_embedding)
+        else:
+            batched = len(query_embedding) > 0 and hasattr(query_embedding[0], "__len__")
+            query_embeddings = query_embedding if batched else [query_embedding]
+        
         try:
-            where = None
-            if filters:
-                # Convert filters to ChromaDB where clause
-                where = self._build_where_clause(filters)
+            # Small embedded collections are searched exactly, in memory
+            exact_index = self._get_exact_index()
+            if exact_index is not None:
+                return exact_index.search(
+                    query_embeddings,
+                    limit,
+                    self._exact_filters(filters) if filters else None
+                )
+            
+            # Convert filters to ChromaDB where clause
+            where = self._build_where_clause(filters) if filters else None
+            
+            # ChromaDB only takes lists; arrays are converted once, here
+            if isinstance(query_embeddings, np.ndarray):
+                query_embeddings = query_embeddings.tolist()
             
             results = self.collection.query(
-                query_embeddings=[query_embedding],
+                query_embeddings=query_embeddings,
                 n_results=limit,
                 where=where,
                 include=["documents", "metadatas", "distances"]
             )
             
+            results["scores"] = [
+                (1.0 - np.asarray(distances, dtype=np.float64)).tolist()
+                for distances in results["distances"]
+            ]
+            
             return results
         except Exception as e:
             logger.error(f"Search failed: {e}")
-            return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+            rows = len(query_embeddings)
+            return {
+                "ids": [[] for _ in range(rows)],
+                "documents": [[] for _ in range(rows)],
+                "metadatas": [[] for _ in range(rows)],
+                "distances": [[] for _ in range(rows)],
+                "scores": [[] for _ in range(rows)]
+            }
     
     def get_component(self, component_id: str) -> Optional[Dict[str, Any]]:
         """Get a component by ID"""
@@ -134,24 +388,90 @@ class VectorStore:
             logger.error(f"Failed to get component {component_id}: {e}")
             return None
     
-    def get_all_components(self) -> List[Dict[str, Any]]:
-        """Get all components"""
+    def get_content_hash(self, component_id: str) -> Optional[str]:
+        """Get the stored content hash of a component, without its document"""
         try:
-            result = self.collection.get(include=["documents", "metadatas"])
+            result = self.collection.get(ids=[component_id], include=["metadatas"])
             
-            components = []
-            for i, component_id in enumerate(result["ids"]):
-                components.append({
-                    "id": component_id,
-                    "document": result["documents"][i],
-                    "metadata": result["metadatas"][i]
-                })
+            if result["ids"]:
+                return result["metadatas"][0].get("content_hash")
+            return None
+        except Exception as e:
+            logger.error(f"Failed to get content hash for {component_id}: {e}")
+            return None
+    
+    def get_content_hashes(self, component_ids: List[str]) -> Dict[str, Optional[str]]:
+        """Get the stored content hashes of several components, by ID, in one call"""
+        try:
+            result = self.collection.get(ids=component_ids, include=["metadatas"])
+            
+            return {
+                component_id: (metadata or {}).get("content_hash")
+                for component_id, metadata in zip(result["ids"], result["metadatas"])
+            }
+        except Exception as e:
+            logger.error(f"Failed to get content hashes for {len(component_ids)} components: {e}")
+            return {}
+    
+    def get_documents_and_embeddings(self, component_ids: List[str]) -> Dict[str, Tuple[str, List[float]]]:
+        """Get the stored document and embedding of several components, by ID, in one call"""
+        try:
+            result = self.collection.get(ids=component_ids, include=["documents", "embeddings"])
             
-            return components
+            return {
+                component_id: (document, embedding)
+                for component_id, document, embedding in zip(
+                    result["ids"], result["documents"], result["embeddings"]
+                )
+            }
+        except Exception as e:
+            logger.error(f"Failed to get embeddings for {len(component_ids)} components: {e}")
+            return {}
+    
+    def get_all_components(self) -> List[Dict[str, Any]]:
+        """Get all components"""
+        try:
+            return self._cached_read(("all",), self._read_all_components)
         except Exception as e:
             logger.error(f"Failed to get all components: {e}")
             return []
     
+    def _read_all_components(self) -> List[Dict[str, Any]]:
+        """Read all components from the collection"""
+        result = self.collection.get(include=["documents", "metadatas"])
+        
+        return [
+            {"id": component_id, "document": document, "metadata": metadata}
+            for component_id, document, metadata in zip(
+                result["ids"], result["documents"], result["metadatas"]
+            )
+        ]
+    
+    def get_all_components_paged(self, limit: int = 500, offset: int = 0) -> List[Dict[str, Any]]:
+        """Get one page of components"""
+        try:
+            return self._cached_read(("page", limit, offset), lambda: self._read_page(limit, offset))
+        except Exception as e:
+            logger.error(f"Failed to get components page at offset {offset}: {e}")
+            raise
+    
+    def _read_page(self, limit: int, offset: int) -> List[Dict[str, Any]]:
+        """Read one page of components from the collection"""
+        result = self.collection.get(
+            limit=limit,
+            offset=offset,
+            include=["documents", "metadatas"]
+        )
+        
+        return [
+            {
+                "id": component_id,
+                "document": result["documents"][i],
+                "metadata": result["metadatas"][i]
+            }
+            for i, component_id in enumerate(result["ids"])
+        ]
+    
     def count(self) -> int:
         """Get total number of components"""
         try:
@@ -160,16 +480,92 @@ class VectorStore:
             logger.error(f"Failed to get count: {e}")
             return 0
     
-    def _build_where_clause(self, filters: Dict[str, Any]) -> Dict[str, Any]:
-        """Build ChromaDB where clause from filters"""
-        where = {}
+    def _get_exact_index(self) -> Optional[ExactIndex]:
+        """
+        Get the in-memory index of the collection, loading it if the
+        collection is small enough
         
-        if "category" in filters:
-            where["category"] = filters["category"]
+        Only used with the embedded store, where every write goes through
+        this process and the index can be kept in step with the collection.
+        """
+        max_components = self.settings.exact_search_max_components
+        if max_components <= 0 or self.settings.chroma_host:
+            return None
         
-        # Add more filter handling as needed
+        exact_index = self._exact_index
+        if exact_index is not None:
+            return exact_index
+        
+        with self._exact_lock:
+            if self._exact_index is None and self.collection.count() <= max_components:
+                result = self.collection.get(include=["documents", "embeddings", "metadatas"])
+                exact_index = ExactIndex(quantize=self.settings.exact_search_int8)
+                exact_index.add(result["ids"], result["documents"], result["embeddings"], result["metadatas"])
+                self._exact_index = exact_index
+                logger.info(f"Loaded {len(exact_index)} components for exact search")
+            return self._exact_index
+    
+    def _record_write(self, write, ids: List[str], *columns: Any):
+        """
+        Account for a successful write: cached listings become stale, and the
+        in-memory index gets the same write, or is dropped once the collection
+        outgrows it
+        """
+        with self._exact_lock:
+            self._generation += 1
+            if self._exact_index is None:
+                return
+            write(self._exact_index, ids, *columns)
+            if len(self._exact_index) > self.settings.exact_search_max_components:
+                self._exact_index = None
+                logger.info("Collection too large for exact search, using the HNSW index")
+    
+    def _cached_read(self, key: Tuple[Any, ...], read: Callable[[], Any]) -> Any:
+        """
+        Serve a listing from the read cache, reading it on a miss
         
-        return where if where else None
+        Entries are keyed by the write generation at the start of the read,
+        so a read racing a write can only be cached under the old generation.
+        """
+        if self._read_cache is None:
+            return read()
+        
+        key = (self._generation, *key)
+        with self._read_cache_lock:
+            value = self._read_cache.get(key)
+        if value is None:
+            value = read()
+            with self._read_cache_lock:
+                self._read_cache[key] = value
+        return value
+    
+    @staticmethod
+    def _exact_filters(filters: Dict[str, Any]) -> Dict[str, List[Any]]:
+        """Filters as the values each known field may take, for the in-memory index"""
+        return {
+            key: _filter_values(value)
+            for key, value in filters.items()
+            if key in _ALLOWED_FILTER_KEYS
+        }
+    
+    def _build_where_clause(self, filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Build ChromaDB where clause from filters
+        
+        List values match any of the given values, so several categories can be
+        searched in one query. Multiple filters are combined with $and.
+        """
+        clauses = [
+            _match_filter(key, value)
+            for key, value in filters.items()
+            if key in _ALLOWED_FILTER_KEYS
+        ]
+        
+        if not clauses:
+            return None
+        if len(clauses) == 1:
+            return clauses[0]
+        return {"$and": clauses}
     
     def health_check(self) -> bool:
         """Check if vector store is healthy"""
@@ -1,21 +1,54 @@
 import os
+import re
 import json
+import queue
 import subprocess
+import threading
+from contextlib import nullcontext
+from itertools import islice
 from typing import Dict, Any, List, Optional
 import logging
 
+from src.config.settings import get_settings
+from src.intelligence.fs import iter_files, open_source
+from src.intelligence.models import PropMeta
+
 logger = logging.getLogger(__name__)
 
+# Patterns run over raw file bytes; only captured spans are decoded
+# `interface ButtonProps extends ... { ... }`, capturing the body
+_PROPS_INTERFACE_RE = re.compile(rb'interface\s+\w*Props\w*[^{]*\{([^}]*)\}', re.DOTALL)
+# `  label?: string;` lines inside an interface body: name, optional marker, type
+_PROP_RE = re.compile(rb'^\s*(?:readonly\s+)?(\w+)(\??)\s*:\s*([^;,\n]+)', re.MULTILINE)
+_CHILDREN_RE = re.compile(rb'children', re.IGNORECASE)
+
+# Files sent to the parser server per request when parsing a directory
+PARSE_BATCH_SIZE = 64
+# Parser server crashes tolerated before falling back to heuristics for good
+MAX_PARSER_FAILURES = 3
+
 
 class ASTParser:
     """
-    TypeScript/TSX AST parser using ts-morph via Node.js
+    TypeScript/TSX AST parser using the TypeScript compiler via Node.js
     
-    This parser extracts component metadata from TypeScript/React files
+    Files are parsed by one long-lived `parser.js --server` process, started
+    on first use, so Node.js startup is paid once rather than per file. When
+    Node.js or the typescript package is unavailable, parsing falls back to
+    source heuristics.
     """
     
     def __init__(self):
         self.parser_script = self._get_parser_script_path()
+        self.node_executable = get_settings().node_executable
+        self.timeout = get_settings().parser_timeout
+        self._proc: Optional[subprocess.Popen] = None
+        # Output lines of the running server, read by a thread so waits can time out
+        self._lines: "Optional[queue.Queue[str]]" = None
+        self._server_failures = 0
+        self._request_id = 0
+        # One request/response exchange with the server at a time
+        self._lock = threading.Lock()
     
     def _get_parser_script_path(self) -> str:
         """Get path to the Node.js parser script"""
@@ -32,46 +65,206 @@ class ASTParser:
         Returns:
             Dictionary with component metadata or None if parsing fails
         """
-        try:
-            if not os.path.exists(file_path):
-                logger.error(f"File not found: {file_path}")
-                return None
+        return self.parse_files([file_path])[0]
+    
+    def start(self) -> bool:
+        """
+        Start the parser server unless it is running or unavailable
+        
+        Returns:
+            Whether files will be parsed by the server, which reads them itself
+        """
+        with self._lock:
+            return self._ensure_server() is not None
+    
+    def parse_files(
+        self,
+        file_paths: List[str],
+        contents: Optional[Dict[str, bytes]] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Parse several TypeScript/TSX files in one request to the parser server
+        
+        The files share one TypeScript program, so types they import from each
+        other are resolved once for the whole batch.
+        
+        Args:
+            file_paths: Paths to the files to parse
+            contents: Already-read file contents by path, for heuristic parsing
             
-            # For now, return a simple mock result
-            # In production, this would call Node.js with ts-morph
-            logger.info(f"Parsing file: {file_path}")
+        Returns:
+            Component metadata (or None if parsing fails) for each file, in order
+        """
+        results = self._request_parse(file_paths) or [None] * len(file_paths)
+        contents = contents or {}
+        
+        parsed = []
+        for file_path, result in zip(file_paths, results):
+            # Per-file, so formatted only when debug logging is on
+            logger.debug("Parsing file: %s", file_path)
             
-            # Mock implementation - extract basic info from file
-            return self._mock_parse(file_path)
+            if result is None or "error" in result:
+                parsed.append(self._parse_heuristic(file_path, contents.get(file_path)))
+            elif result.get("missing"):
+                logger.error(f"File not found: {file_path}")
+                parsed.append(None)
+            else:
+                result["file_path"] = file_path
+                result["props"] = [PropMeta(**prop) for prop in result["props"]]
+                parsed.append(result)
+        
+        return parsed
+    
+    def close(self):
+        """Stop the parser server, if it is running"""
+        with self._lock:
+            self._stop_server()
+    
+    def _request_parse(self, file_paths: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """Send one parse request to the server; None if it cannot answer"""
+        if not file_paths:
+            return []
+        
+        with self._lock:
+            proc = self._ensure_server()
+            if proc is None:
+                return None
             
+            self._request_id += 1
+            request = {"id": self._request_id, "paths": [os.path.abspath(p) for p in file_paths]}
+            try:
+                proc.stdin.write(json.dumps(request) + "\n")
+                proc.stdin.flush()
+                line = self._read_line(self._lines)
+                if not line:
+                    raise EOFError("parser process exited")
+                response = json.loads(line)
+                if response.get("id") != request["id"]:
+                    raise ValueError(f"unexpected response {line[:200]!r}")
+            except (OSError, ValueError, EOFError) as e:
+                logger.warning(f"TypeScript parser failed, using heuristic parsing: {e}")
+                self._server_failures += 1
+                self._stop_server()
+                return None
+        
+        if "results" not in response:
+            logger.warning(f"TypeScript parser error: {response.get('error')}")
+            return None
+        return response["results"]
+    
+    def _ensure_server(self) -> Optional[subprocess.Popen]:
+        """Start the parser server unless it is running or unavailable"""
+        if self._proc is not None:
+            return self._proc
+        if not self.node_executable or self._server_failures >= MAX_PARSER_FAILURES:
+            return None
+        
+        try:
+            proc = subprocess.Popen(
+                [self.node_executable, self.parser_script, "--server"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+            )
+        except OSError as e:
+            logger.info(f"Node.js unavailable, using heuristic parsing: {e}")
+            self._server_failures = MAX_PARSER_FAILURES
+            return None
+        
+        lines: "queue.Queue[str]" = queue.Queue()
+        threading.Thread(
+            target=self._pump_lines,
+            args=(proc.stdout, lines),
+            name="ast-parser-output",
+            daemon=True
+        ).start()
+        
+        try:
+            ready = json.loads(self._read_line(lines) or "{}")
+        except (ValueError, TimeoutError):
+            ready = {}
+        
+        if not ready.get("ready"):
+            reason = (ready.get("error") or "no response").splitlines()[0]
+            logger.info(f"TypeScript parser unavailable, using heuristic parsing: {reason}")
+            self._server_failures = MAX_PARSER_FAILURES
+            self._terminate(proc)
+            return None
+        
+        self._proc = proc
+        self._lines = lines
+        return proc
+    
+    @staticmethod
+    def _pump_lines(stream, lines: "queue.Queue[str]"):
+        """Forward a parser process's output lines to a queue, then "" at EOF"""
+        try:
+            for line in stream:
+                lines.put(line)
+        except (OSError, ValueError):
+            pass
+        lines.put("")
+    
+    def _read_line(self, lines: "queue.Queue[str]") -> str:
+        """Next output line of the parser process, waiting at most the parser timeout"""
+        try:
+            return lines.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"no response within {self.timeout}s") from None
+    
+    def _stop_server(self):
+        """Stop the parser server; it is restarted on the next request"""
+        proc, self._proc = self._proc, None
+        self._lines = None
+        if proc is not None:
+            self._terminate(proc)
+    
+    @staticmethod
+    def _terminate(proc: subprocess.Popen):
+        """Close a parser process's stdin, which ends it, killing it if it lingers"""
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except Exception:
+            proc.kill()
+            proc.wait()
+    
+    def _parse_heuristic(self, file_path: str, content: Optional[bytes] = None) -> Optional[Dict[str, Any]]:
+        """Parse a file with source heuristics, when the TypeScript parser cannot"""
+        try:
+            return self._mock_parse(file_path, content)
+        except FileNotFoundError:
+            logger.error(f"File not found: {file_path}")
+            return None
         except Exception as e:
             logger.error(f"Failed to parse file {file_path}: {e}")
             return None
     
-    def _mock_parse(self, file_path: str) -> Dict[str, Any]:
+    def _mock_parse(self, file_path: str, content: Optional[bytes] = None) -> Dict[str, Any]:
         """
-        Mock parser implementation
-        TODO: Replace with actual ts-morph implementation
+        Heuristic parser, used when the TypeScript parser is unavailable
+        
+        Parses the given content if the file was already read, else reads it.
         """
         file_name = os.path.basename(file_path)
         component_name = os.path.splitext(file_name)[0]
         
         # Try to read file to extract some basic info
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Simple heuristics
-            has_default_export = 'export default' in content
-            has_props = 'Props' in content or 'interface' in content
-            has_children = 'children' in content.lower()
-            
-            props = []
-            if has_props:
-                # Try to extract prop names (very basic)
-                if 'interface' in content:
-                    # This is a very simplified extraction
-                    props = self._extract_props_simple(content)
+            source = nullcontext(content) if content is not None else open_source(file_path)
+            with source as content:
+                # Simple heuristics; each search stops at its first hit, so a
+                # memory-mapped file is only paged in as far as it needs
+                interface_at = content.find(b'interface')
+                has_default_export = content.find(b'export default') != -1
+                has_children = _CHILDREN_RE.search(content) is not None
+                
+                # Props come from an `interface ...Props` declaration, searched
+                # from the first `interface`; files without one skip it
+                props = []
+                if interface_at != -1:
+                    props = self._extract_props_simple(content, interface_at)
             
             return {
                 "name": component_name,
@@ -83,6 +276,8 @@ class ASTParser:
                 "is_hoc": False
             }
             
+        except FileNotFoundError:
+            raise
         except Exception as e:
             logger.error(f"Failed to read file {file_path}: {e}")
             return {
@@ -95,46 +290,24 @@ class ASTParser:
                 "is_hoc": False
             }
     
-    def _extract_props_simple(self, content: str) -> List[Dict[str, Any]]:
+    def _extract_props_simple(self, content: bytes, start: int = 0) -> List[PropMeta]:
         """
         Simple prop extraction (placeholder)
         TODO: Implement proper AST-based extraction
         """
-        props = []
-        
-        # Very basic regex-like extraction
-        lines = content.split('\n')
-        in_interface = False
+        # Body of the first `interface ...Props` declaration at or after start
+        match = _PROPS_INTERFACE_RE.search(content, start)
+        if not match:
+            return []
         
-        for line in lines:
-            stripped = line.strip()
-            
-            if 'interface' in stripped and 'Props' in stripped:
-                in_interface = True
-                continue
-            
-            if in_interface:
-                if '}' in stripped:
-                    in_interface = False
-                    break
-                
-                if ':' in stripped and not stripped.startswith('//'):
-                    # Try to extract prop name and type
-                    parts = stripped.split(':')
-                    if len(parts) >= 2:
-                        prop_name = parts[0].strip().replace('?', '')
-                        prop_type = parts[1].strip().rstrip(';').rstrip(',')
-                        required = '?' not in parts[0]
-                        
-                        props.append({
-                            "name": prop_name,
-                            "type": prop_type,
-                            "required": required,
-                            "default_value": None,
-                            "description": None
-                        })
-        
-        return props
+        return [
+            PropMeta(
+                name=name.decode(),
+                type=prop_type.strip().decode('utf-8', 'replace'),
+                required=not optional
+            )
+            for name, optional, prop_type in _PROP_RE.findall(match.group(1))
+        ]
     
     def parse_directory(self, directory_path: str, recursive: bool = True) -> List[Dict[str, Any]]:
         """
@@ -150,25 +323,15 @@ class ASTParser:
         components = []
         
         try:
-            if recursive:
-                for root, dirs, files in os.walk(directory_path):
-                    # Skip node_modules and other common directories
-                    dirs[:] = [d for d in dirs if d not in ['node_modules', '.git', 'dist', 'build']]
-                    
-                    for file in files:
-                        if file.endswith(('.tsx', '.ts', '.jsx')):
-                            file_path = os.path.join(root, file)
-                            metadata = self.parse_file(file_path)
-                            if metadata:
-                                components.append(metadata)
-            else:
-                for file in os.listdir(directory_path):
-                    if file.endswith(('.tsx', '.ts', '.jsx')):
-                        file_path = os.path.join(directory_path, file)
-                        if os.path.isfile(file_path):
-                            metadata = self.parse_file(file_path)
-                            if metadata:
-                                components.append(metadata)
+            file_paths = (
+                entry.path
+                for entry in iter_files(directory_path, recursive)
+                if entry.name.endswith(('.tsx', '.ts', '.jsx'))
+            )
+            
+            # Parse batches as the walk reaches them rather than after it ends
+            while batch := list(islice(file_paths, PARSE_BATCH_SIZE)):
+                components.extend(metadata for metadata in self.parse_files(batch) if metadata)
             
             logger.info(f"Parsed {len(components)} components from {directory_path}")
             return components
@@ -178,7 +341,19 @@ class ASTParser:
             return []
 
 
+# Global AST parser instance
+_ast_parser: Optional[ASTParser] = None
+
+
 def get_ast_parser() -> ASTParser:
-    """Get AST parser instance"""
-    return ASTParser()
+    """Get or create global AST parser instance"""
+    global _ast_parser
+    if _ast_parser is None:
+        _ast_parser = ASTParser()
+    return _ast_parser
+
 
+def shutdown_ast_parser():
+    """Stop the global AST parser's Node.js server, if one was started"""
+    if _ast_parser is not None:
+        _ast_parser.close()
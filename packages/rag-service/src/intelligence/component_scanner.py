@@ -1,14 +1,42 @@
 import os
-from typing import List, Dict, Any
+import hashlib
+import json
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 import logging
 
-from src.intelligence.metadata_extractor import get_metadata_extractor
+from src.config.settings import get_settings
+from src.intelligence.metadata_extractor import get_metadata_extractor, extract_many_in_worker
 from src.intelligence.ast_parser import get_ast_parser
-from src.intelligence.storybook_parser import get_storybook_parser
+from src.intelligence.storybook_parser import get_storybook_parser, is_storybook_file, storybook_stem
+from src.intelligence.fs import iter_dirs
+from src.intelligence.models import ComponentMeta
 from src.rag.pipeline import get_rag_pipeline
 
 logger = logging.getLogger(__name__)
 
+# Number of components written to the RAG pipeline per batch during a scan
+INDEX_BATCH_SIZE = 256
+
+# Smaller batches are indexed early, but only while the indexer would otherwise be idle
+INDEX_MIN_BATCH_SIZE = 64
+
+# Scans with at least this many component files extract metadata in worker processes
+PARALLEL_SCAN_MIN_FILES = 64
+
+# Files extracted per chunk, in a scan worker process or in-process
+SCAN_CHUNK_SIZE = 32
+
+# Extensions of files that may hold components
+_SCANNED_EXTENSIONS = frozenset(('tsx', 'jsx', 'ts'))
+
+# Component file extensions a story may belong to, in order of preference
+_COMPONENT_EXTENSIONS = ('.tsx', '.jsx', '.ts', '.js')
+
 
 class ComponentScanner:
     """
@@ -26,6 +54,15 @@ class ComponentScanner:
         self.ast_parser = get_ast_parser()
         self.storybook_parser = get_storybook_parser()
         self.rag_pipeline = get_rag_pipeline()
+        
+        # Content hash of each rescanned file as last indexed, persisted with the vector store
+        self.file_hashes_path = os.path.join(
+            get_settings().chroma_persist_directory, ".component-hashes.json"
+        )
+        self._file_hashes = self._load_file_hashes()
+        self._file_hashes_dirty = False
+        # Scans and rescans run concurrently on the shared scanner
+        self._file_hashes_lock = threading.Lock()
     
     def scan_folder(
         self,
@@ -52,53 +89,50 @@ class ComponentScanner:
         errors = []
         
         try:
-            # Find all component files
-            component_files = self._find_component_files(
+            # Component files with their Storybook files, streamed from the walk
+            files = walk_components(
                 folder_path,
                 recursive,
-                include_tests
+                include_tests,
+                include_storybooks
             )
             
-            logger.info(f"Found {len(component_files)} component files")
-            
-            # Find Storybook files if requested
-            storybook_map = {}
-            if include_storybooks:
-                storybook_files = self.storybook_parser.find_storybook_files(
-                    folder_path,
-                    recursive
-                )
-                logger.info(f"Found {len(storybook_files)} storybook files")
-                
-                # Map storybook files to components
-                storybook_map = self._map_storybooks_to_components(storybook_files)
-            
-            # Process each component file
-            for file_path in component_files:
-                try:
-                    # Get associated storybook if exists
-                    storybook_path = storybook_map.get(file_path)
-                    
-                    # Extract metadata
-                    component = self.metadata_extractor.extract_from_file(
-                        file_path,
-                        storybook_path
-                    )
-                    
+            # Extract each component file as the walk reaches it. Batches are
+            # embedded and written on an indexing thread meanwhile, one at a
+            # time, so at most one batch waits while the next is collected
+            files_scanned = 0
+            pending = []
+            index_errors = []
+            indexing: Optional[Future] = None
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="scan-index") as indexer:
+                for component, error_msg in self._extract_components(files):
+                    files_scanned += 1
                     if component:
-                        # Add to RAG pipeline
-                        success = self.rag_pipeline.add_component(component)
-                        
-                        if success:
-                            components.append(component)
-                            logger.info(f"Indexed component: {component['name']}")
-                        else:
-                            errors.append(f"Failed to index component: {component['name']}")
+                        pending.append(component)
                     
-                except Exception as e:
-                    error_msg = f"Error processing {file_path}: {str(e)}"
-                    logger.error(error_msg)
-                    errors.append(error_msg)
+                    if error_msg:
+                        logger.error(error_msg)
+                        errors.append(error_msg)
+                    
+                    idle = indexing is None or indexing.done()
+                    if len(pending) >= INDEX_BATCH_SIZE or (idle and len(pending) >= INDEX_MIN_BATCH_SIZE):
+                        if indexing is not None:
+                            indexing.result()
+                        indexing = indexer.submit(self._index_batch, pending, components, index_errors)
+                        pending = []
+                
+                if indexing is not None:
+                    indexing.result()
+                if pending:
+                    self._index_batch(pending, components, index_errors)
+            errors.extend(index_errors)
+            
+            logger.info(
+                f"Indexed {len(components)} of {files_scanned} component files "
+                f"from {folder_path} ({len(errors)} errors)"
+            )
+            self.metadata_extractor.save_cache()
+            self._save_file_hashes()
             
             return {
                 "components_found": len(components),
@@ -115,94 +149,204 @@ class ComponentScanner:
                 "errors": [error_msg]
             }
     
-    def _find_component_files(
+    def _extract_components(
         self,
-        folder_path: str,
-        recursive: bool,
-        include_tests: bool
-    ) -> List[str]:
-        """Find all component files in a folder"""
-        component_files = []
+        files: Iterable[Tuple[str, Optional[str]]]
+    ) -> Iterator[Tuple[Optional[ComponentMeta], Optional[str]]]:
+        """
+        Extract metadata for each component file as the walk yields it
         
-        try:
-            if recursive:
-                for root, dirs, files in os.walk(folder_path):
-                    # Skip node_modules and other common directories
-                    dirs[:] = [d for d in dirs if d not in [
-                        'node_modules', '.git', 'dist', 'build', '.next', 'coverage'
-                    ]]
-                    
-                    for file in files:
-                        if self._is_component_file(file, include_tests):
-                            component_files.append(os.path.join(root, file))
-            else:
-                for file in os.listdir(folder_path):
-                    file_path = os.path.join(folder_path, file)
-                    if os.path.isfile(file_path) and self._is_component_file(file, include_tests):
-                        component_files.append(file_path)
+        Files unchanged since they were last extracted are served from the
+        extraction cache. The rest are independent, so large scans fan out
+        over a process pool; small scans stay in-process where pool startup
+        would dominate. Uncached files are held back only until it is clear
+        which kind of scan this is.
+        
+        Args:
+            files: Component file paths with their optional storybook paths
             
-            return component_files
+        Yields:
+            The component metadata (or None) and an error message, per file
+        """
+        lookups = self._lookup_cached(files)
+        
+        held = []
+        for file_path, storybook_path, signature, cached in lookups:
+            if cached is not None:
+                yield cached, None
+                continue
+            held.append((file_path, storybook_path, signature, None))
+            if len(held) >= PARALLEL_SCAN_MIN_FILES:
+                break
+        
+        executor = _get_scan_executor() if len(held) >= PARALLEL_SCAN_MIN_FILES else None
+        if executor is not None:
+            yield from self._extract_in_pool(executor, chain(held, lookups))
+            return
+        
+        # In-process extraction, in chunks whose files are read concurrently
+        chunk = []
+        for file_path, storybook_path, _, cached in chain(held, lookups):
+            if cached is not None:
+                yield cached, None
+                continue
+            chunk.append((file_path, storybook_path))
+            if len(chunk) >= SCAN_CHUNK_SIZE:
+                yield from self.metadata_extractor.extract_many(chunk)
+                chunk = []
+        
+        if chunk:
+            yield from self.metadata_extractor.extract_many(chunk)
+    
+    def _lookup_cached(
+        self,
+        files: Iterable[Tuple[str, Optional[str]]]
+    ) -> Iterator[Tuple[str, Optional[str], Any, Optional[ComponentMeta]]]:
+        """
+        Pair each file with its signature and its cached component, if still valid
+        
+        A file that is about to be extracted again loses its rescan hash, which
+        only vouches for the component cached when the hash was recorded.
+        """
+        for file_path, storybook_path in files:
+            signature, cached = self.metadata_extractor.lookup(file_path, storybook_path)
+            if cached is None:
+                self._forget_file_hash(file_path)
+            yield file_path, storybook_path, signature, cached
+    
+    def _extract_in_pool(
+        self,
+        executor: ProcessPoolExecutor,
+        lookups: Iterable[Tuple[str, Optional[str], Any, Optional[ComponentMeta]]]
+    ) -> Iterator[Tuple[Optional[ComponentMeta], Optional[str]]]:
+        """
+        Extract uncached files in the scan worker pool
+        
+        Chunks are submitted while the walk continues, and finished chunks are
+        handed back in submission order as soon as they are ready.
+        """
+        in_flight = deque()
+        chunk = []
+        
+        for file_path, storybook_path, signature, cached in lookups:
+            if cached is not None:
+                yield cached, None
+            else:
+                chunk.append((file_path, storybook_path, signature))
+                if len(chunk) >= SCAN_CHUNK_SIZE:
+                    in_flight.append(self._submit_chunk(executor, chunk))
+                    chunk = []
             
+            while in_flight and in_flight[0][1].done():
+                yield from self._chunk_results(*in_flight.popleft())
+        
+        if chunk:
+            in_flight.append(self._submit_chunk(executor, chunk))
+        while in_flight:
+            yield from self._chunk_results(*in_flight.popleft())
+    
+    @staticmethod
+    def _submit_chunk(executor: ProcessPoolExecutor, chunk: List[Tuple[str, Optional[str], Any]]):
+        """Submit a chunk of files to the worker pool"""
+        tasks = [(file_path, storybook_path) for file_path, storybook_path, _ in chunk]
+        return chunk, executor.submit(extract_many_in_worker, tasks)
+    
+    def _chunk_results(
+        self,
+        chunk: List[Tuple[str, Optional[str], Any]],
+        future: Future
+    ) -> Iterator[Tuple[Optional[ComponentMeta], Optional[str]]]:
+        """Yield a finished chunk's results, caching each extracted component"""
+        try:
+            results = future.result()
         except Exception as e:
-            logger.error(f"Error finding component files: {e}")
-            return []
+            results = [(None, f"Error processing {file_path}: {str(e)}") for file_path, _, _ in chunk]
+        
+        for (file_path, _, signature), (component, error_msg) in zip(chunk, results):
+            if component and signature is not None:
+                self.metadata_extractor.remember(file_path, signature, component)
+            yield component, error_msg
     
-    def _is_component_file(self, filename: str, include_tests: bool) -> bool:
+    def _index_batch(
+        self,
+        batch: List[ComponentMeta],
+        components: List[ComponentMeta],
+        errors: List[str]
+    ):
+        """Add a batch of components to the RAG pipeline, recording each outcome"""
+        try:
+            results = self.rag_pipeline.add_components_batch(batch, upsert=True)
+        except Exception as e:
+            logger.error(f"Failed to index batch: {e}")
+            results = [
+                (component, False, f"Failed to index component: {component.name}")
+                for component in batch
+            ]
+        
+        for component, success, error_msg in results:
+            if success:
+                components.append(component)
+            else:
+                errors.append(error_msg)
+    
+    @staticmethod
+    def _is_component_file(filename: str, include_tests: bool) -> bool:
         """Check if a file is a component file"""
-        # Skip test files unless requested
-        if not include_tests and ('.test.' in filename or '.spec.' in filename):
+        # Reject on the extension first; most files walked are not scripts at all
+        _, dot, extension = filename.rpartition('.')
+        if not dot or extension not in _SCANNED_EXTENSIONS:
             return False
         
-        # Skip storybook files (they're handled separately)
-        if '.stories.' in filename:
-            return False
+        # Names with one dot cannot contain `.test.`, `.spec.`, `.stories.` or `.d.`
+        if filename.count('.') > 1:
+            # Skip test files unless requested
+            if not include_tests and ('.test.' in filename or '.spec.' in filename):
+                return False
+            
+            # Skip storybook files (they're handled separately)
+            if '.stories.' in filename:
+                return False
+            
+            # Exclude .d.ts files (type definitions)
+            if extension == 'ts' and filename.endswith('.d.ts'):
+                return False
         
         # Include .tsx and .jsx files (React components)
-        # Exclude .d.ts files (type definitions)
-        if filename.endswith('.tsx') or filename.endswith('.jsx'):
+        if extension != 'ts':
             return True
         
-        # Optionally include .ts/.js files that look like components
-        # (start with uppercase letter)
-        if filename.endswith('.ts') and not filename.endswith('.d.ts'):
-            name_part = os.path.splitext(filename)[0]
-            return name_part[0].isupper() if name_part else False
-        
-        return False
+        # Include .ts files that look like components (start with uppercase letter)
+        return filename[0].isupper()
     
+    @staticmethod
     def _map_storybooks_to_components(
-        self,
-        storybook_files: List[str]
+        storybook_files: List[str],
+        component_files: List[str]
     ) -> Dict[str, str]:
         """
         Map Storybook files to their corresponding component files
         
+        Candidates are looked up in the set of component files already found,
+        so mapping needs no filesystem calls.
+        
         Returns:
             Dictionary mapping component file path to storybook file path
         """
+        known_components = set(component_files)
         storybook_map = {}
         
         for storybook_file in storybook_files:
-            # Extract component name from storybook filename
-            # e.g., Button.stories.tsx -> Button.tsx
-            base_name = os.path.basename(storybook_file)
-            component_name = base_name.replace('.stories.tsx', '.tsx').replace('.stories.ts', '.ts')
-            
-            # Look for corresponding component file in same directory
-            component_dir = os.path.dirname(storybook_file)
-            component_file = os.path.join(component_dir, component_name)
-            
-            if os.path.exists(component_file):
-                storybook_map[component_file] = storybook_file
-            else:
-                # Try .jsx extension
-                component_file_jsx = component_file.replace('.tsx', '.jsx').replace('.ts', '.js')
-                if os.path.exists(component_file_jsx):
-                    storybook_map[component_file_jsx] = storybook_file
+            # e.g., Button.stories.tsx -> Button.tsx, or Button.jsx, Button.ts, Button.js
+            stem = storybook_stem(storybook_file)
+            for extension in _COMPONENT_EXTENSIONS:
+                component_file = stem + extension
+                if component_file in known_components:
+                    storybook_map[component_file] = storybook_file
+                    break
         
         return storybook_map
     
-    def rescan_component(self, file_path: str) -> Dict[str, Any]:
+    def rescan_component(self, file_path: str) -> Optional[ComponentMeta]:
         """
         Rescan a single component file
         
@@ -213,16 +357,30 @@ class ComponentScanner:
             Updated component metadata
         """
         try:
-            # Check if component exists in RAG pipeline
+            # Skip re-parsing and re-indexing when the file content is unchanged
+            content_hash = self._hash_file(file_path)
+            with self._file_hashes_lock:
+                unchanged = self._file_hashes.get(file_path) == content_hash
+            if unchanged:
+                component = self.metadata_extractor.get_previous(file_path)
+                if component is not None:
+                    logger.info(f"Component unchanged: {component.name}")
+                    return component
+            
             # Extract metadata
             component = self.metadata_extractor.extract_from_file(file_path)
+            self.metadata_extractor.save_cache()
             
             if component:
                 # Update in RAG pipeline
-                success = self.rag_pipeline.update_component(component)
+                success = self.rag_pipeline.add_component(component, upsert=True)
                 
                 if success:
-                    logger.info(f"Rescanned component: {component['name']}")
+                    with self._file_hashes_lock:
+                        self._file_hashes[file_path] = content_hash
+                        self._file_hashes_dirty = True
+                    self._save_file_hashes()
+                    logger.info(f"Rescanned component: {component.name}")
                     return component
             
             return None
@@ -231,8 +389,125 @@ class ComponentScanner:
             logger.error(f"Failed to rescan component {file_path}: {e}")
             return None
 
+    
+    @staticmethod
+    def _hash_file(file_path: str) -> str:
+        """Hash a file's content with blake2b"""
+        with open(file_path, 'rb') as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    
+    def _load_file_hashes(self) -> Dict[str, str]:
+        """Load the file hashes saved by previous rescans"""
+        try:
+            with open(self.file_hashes_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable file hashes {self.file_hashes_path}: {e}")
+            return {}
+    
+    def _forget_file_hash(self, file_path: str):
+        """Drop a file's rescan hash, so its next rescan extracts it again"""
+        with self._file_hashes_lock:
+            if self._file_hashes.pop(file_path, None) is not None:
+                self._file_hashes_dirty = True
+    
+    def _save_file_hashes(self):
+        """Persist the file hashes next to the vector store, if they have changed"""
+        with self._file_hashes_lock:
+            if not self._file_hashes_dirty:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.file_hashes_path) or ".", exist_ok=True)
+                tmp_path = f"{self.file_hashes_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._file_hashes, f)
+                os.replace(tmp_path, self.file_hashes_path)
+                self._file_hashes_dirty = False
+            except Exception as e:
+                logger.warning(f"Failed to save file hashes {self.file_hashes_path}: {e}")
+
+
+def walk_components(
+    folder_path: str,
+    recursive: bool = True,
+    include_tests: bool = False,
+    include_storybooks: bool = True
+) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Find component files and their Storybook files, one directory at a time
+    
+    A story sits next to its component, so each directory's stories are mapped
+    as soon as the directory is listed and no list of the whole tree is built.
+    
+    Args:
+        folder_path: Path to the folder to scan
+        recursive: Whether to scan recursively
+        include_tests: Whether to include test files
+        include_storybooks: Whether to look up Storybook files
+        
+    Yields:
+        Component file path and its Storybook file path, if any
+    """
+    for _, entries in iter_dirs(folder_path, recursive):
+        component_files = []
+        storybook_files = []
+        for entry in entries:
+            name = entry.name
+            if ComponentScanner._is_component_file(name, include_tests):
+                component_files.append(entry.path)
+            elif include_storybooks and is_storybook_file(name):
+                storybook_files.append(entry.path)
+        
+        storybook_map = (
+            ComponentScanner._map_storybooks_to_components(storybook_files, component_files)
+            if storybook_files else {}
+        )
+        for component_file in component_files:
+            yield component_file, storybook_map.get(component_file)
+
+
+# Global scan worker pool, created by the first large scan
+_scan_executor: Optional[ProcessPoolExecutor] = None
+# Concurrent scans must not each start a pool
+_scan_executor_lock = threading.Lock()
+
+
+def _get_scan_executor() -> Optional[ProcessPoolExecutor]:
+    """Get or create the scan worker pool, or None when parallel scans are disabled"""
+    global _scan_executor
+    with _scan_executor_lock:
+        if _scan_executor is None:
+            max_workers = get_settings().scan_workers or os.cpu_count() or 1
+            if max_workers <= 1:
+                return None
+            # Spawn rather than fork: the service process runs threads (server, thread pools)
+            _scan_executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Started scan worker pool with {max_workers} processes")
+        return _scan_executor
+
+
+def shutdown_scan_executor():
+    """Shut down the scan worker pool if one was started"""
+    global _scan_executor
+    with _scan_executor_lock:
+        executor, _scan_executor = _scan_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Global component scanner instance
+_component_scanner: Optional[ComponentScanner] = None
+
 
 def get_component_scanner() -> ComponentScanner:
-    """Get component scanner instance"""
-    return ComponentScanner()
+    """Get or create global component scanner instance"""
+    global _component_scanner
+    if _component_scanner is None:
+        _component_scanner = ComponentScanner()
+    return _component_scanner
 
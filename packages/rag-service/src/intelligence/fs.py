@@ -0,0 +1,148 @@
+import os
+import mmap
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Directories never searched for components or stories
+SKIP_DIRS = frozenset({'node_modules', '.git', 'dist', 'build', '.next', 'coverage'})
+
+# Files at least this large are memory-mapped rather than read into memory
+MMAP_MIN_SIZE = 4096
+
+# Threads reading source files concurrently
+READ_WORKERS = 32
+
+
+def iter_dirs(directory: str, recursive: bool = True) -> Iterator[Tuple[str, List[os.DirEntry]]]:
+    """
+    Yield each directory under a directory with its file entries, using os.scandir
+    
+    Entries carry the file type from the directory listing, so telling files
+    from directories costs no extra stat per entry. Symlinked directories are
+    not followed and unreadable subdirectories are skipped, as with os.walk.
+    Only one directory's listing is held at a time.
+    
+    Args:
+        directory: Directory to search
+        recursive: Whether to descend into subdirectories
+        
+    Yields:
+        Directory path and a DirEntry for each regular file (or symlink to one) in it
+    """
+    pending_dirs = [directory]
+    while pending_dirs:
+        current = pending_dirs.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError as e:
+            if current == directory:
+                raise
+            logger.warning(f"Skipping unreadable directory {current}: {e}")
+            continue
+        
+        files = []
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and entry.name not in SKIP_DIRS:
+                        pending_dirs.append(entry.path)
+                elif entry.is_file():
+                    files.append(entry)
+        
+        yield current, files
+
+
+def iter_files(directory: str, recursive: bool = True) -> Iterator[os.DirEntry]:
+    """
+    Yield the file entries under a directory, one directory listing at a time
+    
+    Args:
+        directory: Directory to search
+        recursive: Whether to descend into subdirectories
+        
+    Yields:
+        DirEntry for each regular file (or symlink to one)
+    """
+    for _, files in iter_dirs(directory, recursive):
+        yield from files
+
+
+@contextmanager
+def open_source(file_path: str) -> Iterator[Union[bytes, mmap.mmap]]:
+    """
+    Open a source file as a bytes-like object for bytes regexes
+    
+    Large files are memory-mapped, so patterns run over the page cache without
+    copying or decoding the whole file; callers decode only what they capture.
+    Small files are read directly, where mapping costs more than it saves.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < MMAP_MIN_SIZE:
+            yield f.read()
+            return
+        
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            try:
+                mapped.close()
+            except BufferError:
+                # A live match object still references the map; it is freed with it
+                pass
+
+
+# Global file reading pool, created on first use
+_read_executor: Optional[ThreadPoolExecutor] = None
+_read_executor_lock = threading.Lock()
+
+
+def _get_read_executor() -> ThreadPoolExecutor:
+    """Get or create the file reading pool"""
+    global _read_executor
+    with _read_executor_lock:
+        if _read_executor is None:
+            _read_executor = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="read")
+        return _read_executor
+
+
+def _read_bytes(file_path: str) -> Optional[bytes]:
+    """Read a whole file, or None if it cannot be read"""
+    try:
+        with open(file_path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def read_many(file_paths: Iterable[str]) -> Dict[str, bytes]:
+    """
+    Read several files concurrently
+    
+    Each read blocks on its own page faults; running them on a thread pool lets
+    the kernel service several files at once, and the caller's single-threaded
+    parsing then works on bytes already in memory. Files that cannot be read
+    are left out, so callers open them as usual and report the error.
+    
+    Args:
+        file_paths: Files to read
+        
+    Returns:
+        Content of each readable file, by path
+    """
+    file_paths = list(dict.fromkeys(file_paths))
+    if len(file_paths) <= 1:
+        contents = map(_read_bytes, file_paths)
+    else:
+        contents = _get_read_executor().map(_read_bytes, file_paths)
+    
+    return {
+        file_path: content
+        for file_path, content in zip(file_paths, contents)
+        if content is not None
+    }
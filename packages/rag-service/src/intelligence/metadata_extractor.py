@@ -1,12 +1,60 @@
-from typing import Dict, Any, List
-import uuid
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+import copy
+import json
 import logging
+import os
+import re
+import threading
 
+from src.config.settings import get_settings
 from src.intelligence.ast_parser import get_ast_parser
+from src.intelligence.fs import read_many
 from src.intelligence.storybook_parser import get_storybook_parser
+from src.intelligence.models import ComponentMeta, ExampleMeta
+from src.util.ids import path_id
 
 logger = logging.getLogger(__name__)
 
+# Number of extracted components kept in memory, keyed by file path
+EXTRACTION_CACHE_SIZE = 8192
+
+# (mtime_ns, size) of a component file and of its storybook file, if any
+FileSignature = Tuple[int, int, Optional[str], int, int]
+
+
+def _keyword_pattern(table: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> "re.Pattern[str]":
+    """
+    Compile (group, keywords) pairs into one pattern whose matches name their group
+    
+    The alternation sits in a lookahead so overlapping keywords are all reported.
+    """
+    return re.compile("(?=" + "|".join(
+        f"(?P<{group}>{'|'.join(keywords)})" for group, keywords in table
+    ) + ")")
+
+
+# Name keywords per category, in priority order
+_CATEGORY_KEYWORDS = (
+    ("Actions", ("button", "link")),
+    ("Forms", ("input", "select", "form", "checkbox", "radio")),
+    ("Overlays", ("modal", "dialog", "popup")),
+    ("Layout", ("card", "panel", "container")),
+    ("Typography", ("text", "heading", "title", "label")),
+    ("Media", ("icon", "image", "avatar")),
+    ("Navigation", ("nav", "menu", "tab")),
+)
+_CATEGORY_PRIORITY = {category: i for i, (category, _) in enumerate(_CATEGORY_KEYWORDS)}
+_CATEGORY_RE = _keyword_pattern(_CATEGORY_KEYWORDS)
+
+# Name keywords per tag, in the order tags are listed
+_TAG_KEYWORDS = (
+    ("interactive", ("button",)),
+    ("form", ("form", "input")),
+    ("layout", ("layout", "container")),
+)
+_TAG_RE = _keyword_pattern(_TAG_KEYWORDS)
+
 
 class MetadataExtractor:
     """
@@ -15,18 +63,30 @@ class MetadataExtractor:
     Combines data from AST parsing, Storybook files, and other sources
     """
     
-    def __init__(self):
+    def __init__(self, cache_path: Optional[str] = None):
         self.ast_parser = get_ast_parser()
         self.storybook_parser = get_storybook_parser()
+        
+        # Extracted components by file path, with the file signature they came from
+        self.cache_path = cache_path
+        self._cache: "OrderedDict[str, Tuple[FileSignature, ComponentMeta]]" = OrderedDict()
+        self._cache_dirty = False
+        # Concurrent scans share the extractor, so cache access is serialized
+        self._cache_lock = threading.Lock()
+        if cache_path:
+            self._load_cache()
     
     def extract_from_file(
         self,
         file_path: str,
         storybook_path: str = None
-    ) -> Dict[str, Any]:
+    ) -> Optional[ComponentMeta]:
         """
         Extract complete metadata for a component
         
+        Unchanged files (same mtime and size for the component and its
+        storybook) are answered from the extraction cache without re-parsing.
+        
         Args:
             file_path: Path to the component file
             storybook_path: Optional path to storybook file
@@ -34,34 +94,189 @@ class MetadataExtractor:
         Returns:
             Complete component metadata
         """
-        # Parse AST
-        ast_data = self.ast_parser.parse_file(file_path)
+        signature = self._signature(file_path, storybook_path)
+        if signature is not None:
+            cached = self.get_cached(file_path, signature)
+            if cached is not None:
+                return cached
+        
+        component = self._extract(file_path, storybook_path)
+        
+        if component and signature is not None:
+            self.remember(file_path, signature, component)
+        
+        return component
+    
+    def extract_many(
+        self,
+        tasks: List[Tuple[str, Optional[str]]]
+    ) -> List[Tuple[Optional[ComponentMeta], Optional[str]]]:
+        """
+        Extract metadata for a batch of components
+        
+        The files the parsers will read are loaded concurrently up front, and
+        the component files are parsed in one parser request. Unlike
+        extract_from_file, the cache is not consulted; callers pass files
+        already known to be uncached.
+        
+        Args:
+            tasks: Component file paths with their optional storybook paths
+            
+        Returns:
+            The component metadata (or None) and an error message, per task
+        """
+        file_paths = [file_path for file_path, _ in tasks]
+        signatures = [self._signature(file_path, storybook_path) for file_path, storybook_path in tasks]
+        
+        # The parser server reads component files itself; stories are always parsed here.
+        # Starting it first keeps the first batch in a process from reading them for nothing
+        to_read = [storybook_path for _, storybook_path in tasks if storybook_path]
+        if not self.ast_parser.start():
+            to_read.extend(file_paths)
+        contents = read_many(to_read)
+        
+        try:
+            parsed = self.ast_parser.parse_files(file_paths, contents)
+        except Exception as e:
+            return [(None, f"Error processing {file_path}: {str(e)}") for file_path in file_paths]
+        
+        results = []
+        for (file_path, storybook_path), signature, ast_data in zip(tasks, signatures, parsed):
+            try:
+                component = self._build_component(
+                    file_path, storybook_path, ast_data, contents.get(storybook_path)
+                )
+            except Exception as e:
+                results.append((None, f"Error processing {file_path}: {str(e)}"))
+                continue
+            
+            if component and signature is not None:
+                self.remember(file_path, signature, component)
+            results.append((component, None))
+        
+        return results
+    
+    def lookup(self, file_path: str, storybook_path: str = None) -> Tuple[Optional[FileSignature], Optional[ComponentMeta]]:
+        """Get a file's current signature and its cached component, if still valid"""
+        signature = self._signature(file_path, storybook_path)
+        if signature is None:
+            return None, None
+        return signature, self.get_cached(file_path, signature)
+    
+    def get_cached(self, file_path: str, signature: FileSignature) -> Optional[ComponentMeta]:
+        """Get a copy of the cached component for a file if its signature matches"""
+        with self._cache_lock:
+            entry = self._cache.get(file_path)
+            if entry is None or entry[0] != signature:
+                return None
+            self._cache.move_to_end(file_path)
+        return copy.deepcopy(entry[1])
+    
+    def get_previous(self, file_path: str) -> Optional[ComponentMeta]:
+        """Get a copy of the last component extracted from a file, whatever its signature"""
+        with self._cache_lock:
+            entry = self._cache.get(file_path)
+        return copy.deepcopy(entry[1]) if entry is not None else None
+    
+    def remember(self, file_path: str, signature: FileSignature, component: ComponentMeta):
+        """Cache the component extracted from a file with the given signature"""
+        entry = (signature, copy.deepcopy(component))
+        with self._cache_lock:
+            self._cache[file_path] = entry
+            self._cache.move_to_end(file_path)
+            if len(self._cache) > EXTRACTION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+            self._cache_dirty = True
+    
+    def save_cache(self):
+        """Write the extraction cache to disk, if it is persisted and has changed"""
+        if not self.cache_path or not self._cache_dirty:
+            return
+        
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            with self._cache_lock:
+                entries = {
+                    file_path: {"signature": list(signature), "component": component.to_dict()}
+                    for file_path, (signature, component) in self._cache.items()
+                }
+                self._cache_dirty = False
+            tmp_path = f"{self.cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            self._cache_dirty = True
+            logger.warning(f"Failed to save extraction cache {self.cache_path}: {e}")
+    
+    def _load_cache(self):
+        """Load the extraction cache written by a previous run"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable extraction cache {self.cache_path}: {e}")
+            return
+        
+        for file_path, entry in list(entries.items())[-EXTRACTION_CACHE_SIZE:]:
+            component = ComponentMeta.from_dict(entry["component"])
+            # Entries written before ids were derived from the path get their stable id
+            component.id = path_id(file_path)
+            self._cache[file_path] = (tuple(entry["signature"]), component)
+        logger.info(f"Loaded {len(self._cache)} cached component extractions")
+    
+    @staticmethod
+    def _signature(file_path: str, storybook_path: Optional[str]) -> Optional[FileSignature]:
+        """Stat a component file and its storybook, or None if either is missing"""
+        try:
+            stat = os.stat(file_path)
+            if storybook_path:
+                story_stat = os.stat(storybook_path)
+                return (stat.st_mtime_ns, stat.st_size, storybook_path, story_stat.st_mtime_ns, story_stat.st_size)
+            return (stat.st_mtime_ns, stat.st_size, None, 0, 0)
+        except OSError:
+            return None
+    
+    def _extract(self, file_path: str, storybook_path: Optional[str]) -> Optional[ComponentMeta]:
+        """Parse a component file and its storybook into component metadata"""
+        return self._build_component(file_path, storybook_path, self.ast_parser.parse_file(file_path))
+    
+    def _build_component(
+        self,
+        file_path: str,
+        storybook_path: Optional[str],
+        ast_data: Optional[Dict[str, Any]],
+        storybook_content: Optional[bytes] = None
+    ) -> Optional[ComponentMeta]:
+        """Build component metadata from a parsed component file and its storybook"""
         if not ast_data:
             return None
         
-        # Generate component ID
-        component_id = str(uuid.uuid4())
+        # Components are identified by their file, so rescans replace them
+        component_id = path_id(file_path)
         
         # Build base component metadata
-        component = {
-            "id": component_id,
-            "name": ast_data.get("name", ""),
-            "description": self._generate_description(ast_data),
-            "file_path": file_path,
-            "props": ast_data.get("props", []),
-            "examples": [],
-            "theme_wrapper": None,
-            "category": self._infer_category(ast_data),
-            "tags": self._generate_tags(ast_data),
-            "import_path": self._generate_import_path(file_path),
-            "export_type": ast_data.get("export_type", "named")
-        }
+        component = ComponentMeta(
+            id=component_id,
+            name=ast_data.get("name", ""),
+            description=self._generate_description(ast_data),
+            file_path=file_path,
+            props=ast_data.get("props", []),
+            examples=[],
+            theme_wrapper=None,
+            category=self._infer_category(ast_data),
+            tags=self._generate_tags(ast_data),
+            import_path=self._generate_import_path(file_path),
+            export_type=ast_data.get("export_type", "named")
+        )
         
         # Add storybook examples if available
         if storybook_path:
-            storybook_data = self.storybook_parser.parse_file(storybook_path)
+            storybook_data = self.storybook_parser.parse_file(storybook_path, storybook_content)
             if storybook_data:
-                component["examples"] = self._convert_stories_to_examples(storybook_data)
+                component.examples = self._convert_stories_to_examples(storybook_data)
         
         return component
     
@@ -74,7 +289,7 @@ class MetadataExtractor:
         description_parts = [f"React component {name}"]
         
         if props:
-            prop_names = [p["name"] for p in props[:3]]
+            prop_names = [p.name for p in props[:3]]
             description_parts.append(f"with props: {', '.join(prop_names)}")
         
         if has_children:
@@ -86,23 +301,16 @@ class MetadataExtractor:
         """Infer component category from metadata"""
         name = ast_data.get("name", "").lower()
         
-        # Simple categorization based on name
-        if any(keyword in name for keyword in ['button', 'link']):
-            return "Actions"
-        elif any(keyword in name for keyword in ['input', 'select', 'form', 'checkbox', 'radio']):
-            return "Forms"
-        elif any(keyword in name for keyword in ['modal', 'dialog', 'popup']):
-            return "Overlays"
-        elif any(keyword in name for keyword in ['card', 'panel', 'container']):
-            return "Layout"
-        elif any(keyword in name for keyword in ['text', 'heading', 'title', 'label']):
-            return "Typography"
-        elif any(keyword in name for keyword in ['icon', 'image', 'avatar']):
-            return "Media"
-        elif any(keyword in name for keyword in ['nav', 'menu', 'tab']):
-            return "Navigation"
-        else:
-            return "General"
+        # Categorize by the highest-priority keyword found anywhere in the name
+        best = None
+        for match in _CATEGORY_RE.finditer(name):
+            priority = _CATEGORY_PRIORITY[match.lastgroup]
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    break
+        
+        return _CATEGORY_KEYWORDS[best][0] if best is not None else "General"
     
     def _generate_tags(self, ast_data: Dict[str, Any]) -> List[str]:
         """Generate tags for the component"""
@@ -117,12 +325,8 @@ class MetadataExtractor:
             tags.append("hoc")
         
         # Add tags based on name patterns
-        if 'button' in name:
-            tags.append("interactive")
-        if 'form' in name or 'input' in name:
-            tags.append("form")
-        if 'layout' in name or 'container' in name:
-            tags.append("layout")
+        matched = {match.lastgroup for match in _TAG_RE.finditer(name)}
+        tags.extend(tag for tag, _ in _TAG_KEYWORDS if tag in matched)
         
         return tags
     
@@ -153,25 +357,23 @@ class MetadataExtractor:
             # Fallback to filename
             return os.path.basename(without_ext)
     
-    def _convert_stories_to_examples(self, storybook_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _convert_stories_to_examples(self, storybook_data: Dict[str, Any]) -> List[ExampleMeta]:
         """Convert Storybook stories to component examples"""
-        examples = []
-        
-        for story in storybook_data.get("stories", []):
-            examples.append({
-                "title": story.get("name", "Example"),
-                "code": story.get("code", ""),
-                "description": f"Example from Storybook: {story.get('name')}",
-                "source": "storybook"
-            })
-        
-        return examples
+        return [
+            ExampleMeta(
+                title=story.get("name", "Example"),
+                code=story.get("code", ""),
+                description=f"Example from Storybook: {story.get('name')}",
+                source="storybook"
+            )
+            for story in storybook_data.get("stories", [])
+        ]
     
     def enrich_with_usage_patterns(
         self,
-        component: Dict[str, Any],
+        component: ComponentMeta,
         usage_patterns: List[Dict[str, Any]]
-    ) -> Dict[str, Any]:
+    ) -> ComponentMeta:
         """
         Enrich component metadata with usage patterns from monorepo analysis
         
@@ -187,7 +389,40 @@ class MetadataExtractor:
         return component
 
 
+# Global metadata extractor instance, shared by every scan so its cache is too
+_metadata_extractor: Optional[MetadataExtractor] = None
+
+
 def get_metadata_extractor() -> MetadataExtractor:
-    """Get metadata extractor instance"""
-    return MetadataExtractor()
+    """Get or create global metadata extractor instance"""
+    global _metadata_extractor
+    if _metadata_extractor is None:
+        settings = get_settings()
+        cache_path = settings.component_cache_path or os.path.join(
+            settings.chroma_persist_directory, ".component-cache.json"
+        )
+        _metadata_extractor = MetadataExtractor(cache_path=cache_path)
+    return _metadata_extractor
+
 
+# Extractor used inside scan worker processes, created on first use per worker
+_worker_extractor: Optional[MetadataExtractor] = None
+
+
+def extract_many_in_worker(
+    tasks: List[Tuple[str, Optional[str]]]
+) -> List[Tuple[Optional[ComponentMeta], Optional[str]]]:
+    """
+    Extract metadata for a chunk of components in a scan worker process
+    
+    Args:
+        tasks: Component file paths with their optional storybook paths
+        
+    Returns:
+        The component metadata (or None) and an error message, per task
+    """
+    global _worker_extractor
+    if _worker_extractor is None:
+        _worker_extractor = MetadataExtractor()
+    
+    return _worker_extractor.extract_many(tasks)
@@ -0,0 +1,79 @@
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional
+import sys
+
+
+# Vocabulary fields (prop names and types, categories, tags, export types)
+# repeat across thousands of components. Values decoded from source, parser
+# output or the extraction cache are fresh strings each time, so they are
+# interned to share one copy per distinct value.
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern a string, passing None through"""
+    return sys.intern(value) if value is not None else None
+
+
+@dataclass(slots=True)
+class PropMeta:
+    """Component prop extracted from source"""
+    name: str
+    type: str
+    required: bool
+    default_value: Optional[str] = None
+    description: Optional[str] = None
+    
+    def __post_init__(self):
+        self.name = sys.intern(self.name)
+        self.type = sys.intern(self.type)
+
+
+@dataclass(slots=True)
+class ExampleMeta:
+    """Component usage example extracted from a story"""
+    title: str
+    code: str
+    description: Optional[str] = None
+    source: Optional[str] = "storybook"
+    
+    def __post_init__(self):
+        self.source = _intern(self.source)
+
+
+@dataclass(slots=True)
+class ComponentMeta:
+    """
+    Component metadata produced by a scan
+    
+    Slotted dataclasses keep large scans compact; convert with to_dict only
+    where a plain dict is needed, such as JSON output.
+    """
+    id: str
+    name: str
+    description: str
+    file_path: str
+    props: List[PropMeta] = field(default_factory=list)
+    examples: List[ExampleMeta] = field(default_factory=list)
+    theme_wrapper: Optional[str] = None
+    category: Optional[str] = None
+    tags: List[str] = field(default_factory=list)
+    import_path: Optional[str] = None
+    export_type: Optional[str] = "named"
+    
+    def __post_init__(self):
+        self.category = _intern(self.category)
+        self.export_type = _intern(self.export_type)
+        self.tags = [sys.intern(tag) for tag in self.tags]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a plain dict, including nested props and examples"""
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ComponentMeta":
+        """Build from a dict produced by to_dict"""
+        return cls(
+            **{
+                **data,
+                "props": [PropMeta(**prop) for prop in data.get("props", [])],
+                "examples": [ExampleMeta(**example) for example in data.get("examples", [])],
+            }
+        )
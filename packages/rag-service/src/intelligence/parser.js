@@ -0,0 +1,233 @@
+#!/usr/bin/env node
+/**
+ * TypeScript component parser for the RAG service
+ *
+ * `node parser.js --server` answers newline-delimited JSON requests on stdin:
+ *
+ *   {"id": 1, "paths": ["/src/Button.tsx", "/src/Card.tsx"]}
+ *
+ * with one response line per request, results in request order:
+ *
+ *   {"id": 1, "results": [{...component metadata}, {"missing": true}]}
+ *
+ * All files of one request share a single ts.Program and TypeChecker, so
+ * props inherited from interfaces in other files are resolved once for the
+ * whole batch. Each request's program is built from the previous one, and
+ * parsed declaration files (lib.d.ts, @types/react) are kept between
+ * requests, so they are not parsed again. The first line written is
+ * {"ready": true}, or
+ * {"ready": false, "error": "..."} when the typescript package is missing.
+ *
+ * `node parser.js <file>...` prints the results for the given files.
+ */
+'use strict';
+
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+
+function loadTypeScript() {
+  return require(require.resolve('typescript', { paths: [process.cwd(), __dirname] }));
+}
+
+function write(message) {
+  process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+function getModifiers(ts, node) {
+  return (ts.canHaveModifiers(node) && ts.getModifiers(node)) || [];
+}
+
+function isDefaultExport(ts, node) {
+  if (ts.isExportDeclaration(node)) {
+    const clause = node.exportClause;
+    return Boolean(
+      clause && ts.isNamedExports(clause) && clause.elements.some((e) => e.name.text === 'default')
+    );
+  }
+  return getModifiers(ts, node).some((m) => m.kind === ts.SyntaxKind.DefaultKeyword);
+}
+
+function isHocCall(ts, expression) {
+  if (!ts.isCallExpression(expression)) {
+    return false;
+  }
+  const callee = expression.expression;
+  const name = ts.isPropertyAccessExpression(callee) ? callee.name.text : callee.getText();
+  return /^with[A-Z]/.test(name);
+}
+
+function findPropsDeclaration(ts, sourceFile, componentName) {
+  let preferred;
+  let fallback;
+  ts.forEachChild(sourceFile, (node) => {
+    if (
+      (ts.isInterfaceDeclaration(node) || ts.isTypeAliasDeclaration(node)) &&
+      node.name.text.includes('Props')
+    ) {
+      if (!preferred && node.name.text === `${componentName}Props`) {
+        preferred = node;
+      }
+      fallback = fallback || node;
+    }
+  });
+  return preferred || fallback;
+}
+
+function isLibraryProp(symbol) {
+  const declarations = symbol.declarations || [];
+  return declarations.length > 0 && declarations.every((d) => d.getSourceFile().isDeclarationFile);
+}
+
+function extractProps(ts, checker, declaration) {
+  const type = checker.getTypeAtLocation(declaration.name);
+  // Props inherited from library typings (e.g. HTML attributes) are left out
+  return checker
+    .getPropertiesOfType(type)
+    .filter((symbol) => !isLibraryProp(symbol))
+    .map((symbol) => ({
+      name: symbol.getName(),
+      type: checker.typeToString(checker.getTypeOfSymbolAtLocation(symbol, declaration)),
+      required: (symbol.flags & ts.SymbolFlags.Optional) === 0,
+      default_value: null,
+      description: ts.displayPartsToString(symbol.getDocumentationComment(checker)) || null,
+    }));
+}
+
+function parseSourceFile(ts, checker, sourceFile, filePath) {
+  const name = path.basename(filePath, path.extname(filePath));
+  const dependencies = [];
+  let hasDefaultExport = false;
+  let isHoc = false;
+
+  ts.forEachChild(sourceFile, (node) => {
+    if (ts.isImportDeclaration(node) && ts.isStringLiteral(node.moduleSpecifier)) {
+      dependencies.push(node.moduleSpecifier.text);
+    } else if (ts.isExportAssignment(node) && !node.isExportEquals) {
+      hasDefaultExport = true;
+      isHoc = isHocCall(ts, node.expression);
+    } else if (isDefaultExport(ts, node)) {
+      hasDefaultExport = true;
+    }
+  });
+
+  const declaration = findPropsDeclaration(ts, sourceFile, name);
+  const props = declaration ? extractProps(ts, checker, declaration) : [];
+
+  return {
+    name,
+    file_path: filePath,
+    export_type: hasDefaultExport ? 'default' : 'named',
+    props,
+    dependencies,
+    has_children: props.some((p) => p.name === 'children') || /children/i.test(sourceFile.text),
+    is_hoc: isHoc,
+  };
+}
+
+function compilerOptions(ts) {
+  return {
+    allowJs: true,
+    jsx: ts.JsxEmit.Preserve,
+    noEmit: true,
+    skipLibCheck: true,
+    types: [],
+  };
+}
+
+function createCompilerHost(ts, options) {
+  // Declaration files are parsed once and reused while unchanged on disk;
+  // component files change between scans and are read fresh each time
+  const host = ts.createCompilerHost(options);
+  const getSourceFile = host.getSourceFile;
+  const declarations = new Map();
+  host.getSourceFile = (fileName, ...rest) => {
+    if (!fileName.endsWith('.d.ts')) {
+      return getSourceFile(fileName, ...rest);
+    }
+    let mtime;
+    try {
+      mtime = fs.statSync(fileName).mtimeMs;
+    } catch (error) {
+      mtime = -1;
+    }
+    const cached = declarations.get(fileName);
+    if (cached && cached.mtime === mtime) {
+      return cached.sourceFile;
+    }
+    const sourceFile = getSourceFile(fileName, ...rest);
+    if (sourceFile) {
+      declarations.set(fileName, { mtime, sourceFile });
+    }
+    return sourceFile;
+  };
+  return host;
+}
+
+function parseFiles(ts, paths, host, oldProgram) {
+  const options = compilerOptions(ts);
+  const program = ts.createProgram(
+    paths.filter((p) => fs.existsSync(p)),
+    options,
+    host || ts.createCompilerHost(options),
+    oldProgram
+  );
+  const checker = program.getTypeChecker();
+
+  const results = paths.map((filePath) => {
+    const sourceFile = program.getSourceFile(filePath);
+    if (!sourceFile) {
+      return { missing: true };
+    }
+    try {
+      return parseSourceFile(ts, checker, sourceFile, filePath);
+    } catch (error) {
+      return { error: String((error && error.message) || error) };
+    }
+  });
+  return { program, results };
+}
+
+function serve() {
+  let ts;
+  try {
+    ts = loadTypeScript();
+  } catch (error) {
+    write({ ready: false, error: String((error && error.message) || error) });
+    return;
+  }
+  write({ ready: true });
+
+  const host = createCompilerHost(ts, compilerOptions(ts));
+  let program;
+
+  // Requests are answered synchronously, so responses keep request order;
+  // the process exits once stdin is closed
+  const lines = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+  lines.on('line', (line) => {
+    if (!line.trim()) {
+      return;
+    }
+    let request;
+    try {
+      request = JSON.parse(line);
+    } catch (error) {
+      write({ id: null, error: 'Invalid request' });
+      return;
+    }
+    try {
+      const parsed = parseFiles(ts, request.paths || [], host, program);
+      program = parsed.program;
+      write({ id: request.id, results: parsed.results });
+    } catch (error) {
+      write({ id: request.id, error: String((error && error.message) || error) });
+    }
+  });
+}
+
+const args = process.argv.slice(2);
+if (args.includes('--server')) {
+  serve();
+} else {
+  write(parseFiles(loadTypeScript(), args.map((p) => path.resolve(p))).results);
+}
@@ -1,10 +1,119 @@
 import os
 import re
+from contextlib import nullcontext
 from typing import Dict, Any, List, Optional
 import logging
 
+from src.intelligence.fs import open_source
+
 logger = logging.getLogger(__name__)
 
+# Patterns compiled once rather than looked up in re's cache on every file.
+# They run over raw file bytes; only captured spans are decoded.
+_TITLE_RE = re.compile(rb'title:\s*[\'"]([^\'"]+)[\'"]')
+# `export const Name: Type = ` at an `export const` found by the story scan
+_STORY_HEAD_RE = re.compile(rb'export const (\w+)(?:\s*:[^=\n]*)?\s*=\s*')
+_ARGS_KEY_RE = re.compile(rb'\bargs\s*:\s*(?=\{)')
+# `key: value` entry, after any leading whitespace and comments
+_ARG_ENTRY_RE = re.compile(rb'(?:\s|//[^\n]*|/\*.*?\*/)*[\'"]?(\w+)[\'"]?\s*:\s*(.*)', re.DOTALL)
+# Characters the brace matcher must look at: brackets, separators, strings, comments
+_SIGNIFICANT_RE = re.compile(rb'[{}\[\]()\'"`,]|//|/\*')
+
+_OPENERS = frozenset((b'{', b'[', b'('))
+_CLOSERS = frozenset((b'}', b']', b')'))
+_QUOTES = frozenset((b"'", b'"', b'`'))
+
+
+def _decode(span: bytes) -> str:
+    """Decode a captured span of source"""
+    return span.decode('utf-8', 'replace')
+
+
+def _skip_string(content: bytes, pos: int, quote: bytes) -> int:
+    """Return the index just past the string whose opening quote ends at pos"""
+    while True:
+        end = content.find(quote, pos)
+        if end == -1:
+            return len(content)
+        # The quote is escaped if preceded by an odd number of backslashes
+        backslashes = 0
+        while content[end - 1 - backslashes:end - backslashes] == b'\\':
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return end + 1
+        pos = end + 1
+
+
+def _scan(content: bytes, start: int, end: int):
+    """
+    Yield (token, position) for brackets and commas between start and end
+    
+    Strings and comments are skipped, so brackets inside them are ignored.
+    """
+    pos = start
+    while pos < end:
+        match = _SIGNIFICANT_RE.search(content, pos, end)
+        if match is None:
+            return
+        token = match.group()
+        pos = match.end()
+        if token in _QUOTES:
+            pos = _skip_string(content, pos, token)
+        elif token == b'//':
+            newline = content.find(b'\n', pos, end)
+            pos = end if newline == -1 else newline + 1
+        elif token == b'/*':
+            close = content.find(b'*/', pos, end)
+            pos = end if close == -1 else close + 2
+        else:
+            yield token, match.start()
+
+
+def _match_bracket(content: bytes, start: int) -> int:
+    """Return the index just past the bracket closing the one at start, or -1"""
+    depth = 0
+    for token, pos in _scan(content, start, len(content)):
+        if token in _OPENERS:
+            depth += 1
+        elif token in _CLOSERS:
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+    return -1
+
+
+def _split_top_level(content: bytes) -> List[bytes]:
+    """Split an object or argument list body on its top-level commas"""
+    parts = []
+    depth = 0
+    part_start = 0
+    for token, pos in _scan(content, 0, len(content)):
+        if token in _OPENERS:
+            depth += 1
+        elif token in _CLOSERS:
+            depth -= 1
+        elif depth == 0:
+            parts.append(content[part_start:pos])
+            part_start = pos + 1
+    parts.append(content[part_start:])
+    return parts
+
+
+_STORYBOOK_SUFFIXES = ('.stories.tsx', '.stories.ts', '.stories.jsx', '.stories.js')
+
+
+def is_storybook_file(filename: str) -> bool:
+    """Check if a file is a Storybook stories file"""
+    return '.stories.' in filename and (filename.endswith('.tsx') or filename.endswith('.ts'))
+
+
+def storybook_stem(path: str) -> str:
+    """Strip the stories suffix from a Storybook file path or name"""
+    for suffix in _STORYBOOK_SUFFIXES:
+        if path.endswith(suffix):
+            return path.removesuffix(suffix)
+    return path
+
 
 class StorybookParser:
     """
@@ -13,33 +122,29 @@ class StorybookParser:
     Extracts story information and example usage
     """
     
-    def parse_file(self, file_path: str) -> Optional[Dict[str, Any]]:
+    def parse_file(self, file_path: str, content: Optional[bytes] = None) -> Optional[Dict[str, Any]]:
         """
         Parse a Storybook file
         
         Args:
             file_path: Path to the .stories.tsx file
+            content: The file's content, if already read
             
         Returns:
             Dictionary with story information
         """
         try:
-            if not os.path.exists(file_path):
-                logger.error(f"Storybook file not found: {file_path}")
-                return None
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
             # Extract component name from file path
             file_name = os.path.basename(file_path)
-            component_name = file_name.replace('.stories.tsx', '').replace('.stories.ts', '')
-            
-            # Extract stories
-            stories = self._extract_stories(content)
+            component_name = storybook_stem(file_name)
             
-            # Extract title from meta
-            title = self._extract_title(content) or component_name
+            source = nullcontext(content) if content is not None else open_source(file_path)
+            with source as content:
+                # Extract stories
+                stories = self._extract_stories(content)
+                
+                # Extract title from meta
+                title = self._extract_title(content) or component_name
             
             return {
                 "title": title,
@@ -48,119 +153,98 @@ class StorybookParser:
                 "file_path": file_path
             }
             
+        except FileNotFoundError:
+            logger.error(f"Storybook file not found: {file_path}")
+            return None
         except Exception as e:
             logger.error(f"Failed to parse storybook file {file_path}: {e}")
             return None
     
-    def _extract_title(self, content: str) -> Optional[str]:
+    def _extract_title(self, content: bytes) -> Optional[str]:
         """Extract title from Storybook meta"""
         # Look for title in meta object
-        title_match = re.search(r'title:\s*[\'"]([^\'"]+)[\'"]', content)
+        title_match = _TITLE_RE.search(content)
         if title_match:
-            return title_match.group(1)
+            return _decode(title_match.group(1))
         return None
     
-    def _extract_stories(self, content: str) -> List[Dict[str, Any]]:
+    def _extract_stories(self, content: bytes) -> List[Dict[str, Any]]:
         """
         Extract stories from content
         
+        Walks each `export const`, matching braces (skipping strings and
+        comments) to capture object stories whole, including nested objects.
         This is a simplified implementation. In production, would use proper AST parsing.
         """
         stories = []
         
-        # Look for story exports
-        # Pattern: export const StoryName = ...
-        story_pattern = r'export const (\w+)(?:\s*:\s*\w+)?\s*=\s*\{([^}]+)\}'
-        matches = re.finditer(story_pattern, content, re.MULTILINE | re.DOTALL)
-        
-        for match in matches:
-            story_name = match.group(1)
-            story_content = match.group(2)
-            
-            # Skip meta exports
-            if story_name == 'meta' or story_name == 'default':
-                continue
+        pos = content.find(b'export const ')
+        while pos != -1:
+            head = _STORY_HEAD_RE.match(content, pos)
+            next_pos = pos + 1
             
-            # Extract args if present
-            args = self._extract_args(story_content)
+            if head:
+                story_name = _decode(head.group(1))
+                rhs = head.end()
+                
+                # Object story: export const StoryName = { ... }
+                if content[rhs:rhs + 1] == b'{':
+                    end = _match_bracket(content, rhs)
+                    # Skip meta exports
+                    if end != -1 and story_name not in ('meta', 'default'):
+                        stories.append({
+                            "name": story_name,
+                            "code": _decode(content[pos:end]),
+                            "args": self._extract_args(content[rhs + 1:end - 1])
+                        })
+                    next_pos = end if end != -1 else rhs
+                
+                # Template.bind pattern (older Storybook format)
+                else:
+                    line_end = content.find(b'\n', rhs)
+                    if line_end == -1:
+                        line_end = len(content)
+                    bind = content.rfind(b'.bind({})', rhs, line_end)
+                    if bind != -1:
+                        stories.append({
+                            "name": story_name,
+                            "code": _decode(content[pos:bind + len(b'.bind({})')]),
+                            "args": {}
+                        })
+                    next_pos = line_end
             
-            stories.append({
-                "name": story_name,
-                "code": match.group(0),
-                "args": args
-            })
-        
-        # Also look for Template.bind pattern (older Storybook format)
-        template_pattern = r'export const (\w+) = .*\.bind\({}\)'
-        template_matches = re.finditer(template_pattern, content)
-        
-        for match in template_matches:
-            story_name = match.group(1)
-            stories.append({
-                "name": story_name,
-                "code": match.group(0),
-                "args": {}
-            })
+            pos = content.find(b'export const ', next_pos)
         
         return stories
     
-    def _extract_args(self, story_content: str) -> Dict[str, Any]:
-        """Extract args from story content"""
+    def _extract_args(self, story_content: bytes) -> Dict[str, Any]:
+        """Extract top-level args from story content"""
         args = {}
         
         # Look for args object
-        args_match = re.search(r'args:\s*\{([^}]+)\}', story_content, re.DOTALL)
-        if args_match:
-            args_content = args_match.group(1)
+        args_key = _ARGS_KEY_RE.search(story_content)
+        if args_key:
+            end = _match_bracket(story_content, args_key.end())
+            if end == -1:
+                return args
             
-            # Simple key-value extraction
-            # This is very basic and would need improvement for complex objects
-            arg_pattern = r'(\w+):\s*([^,\n]+)'
-            for arg_match in re.finditer(arg_pattern, args_content):
-                key = arg_match.group(1)
-                value = arg_match.group(2).strip()
-                args[key] = value
+            for entry in _split_top_level(story_content[args_key.end() + 1:end - 1]):
+                entry_match = _ARG_ENTRY_RE.match(entry)
+                if entry_match:
+                    key = _decode(entry_match.group(1))
+                    args[key] = _decode(entry_match.group(2).strip())
         
         return args
-    
-    def find_storybook_files(self, directory: str, recursive: bool = True) -> List[str]:
-        """
-        Find all Storybook files in a directory
-        
-        Args:
-            directory: Directory to search
-            recursive: Whether to search recursively
-            
-        Returns:
-            List of file paths
-        """
-        storybook_files = []
-        
-        try:
-            if recursive:
-                for root, dirs, files in os.walk(directory):
-                    # Skip node_modules and other common directories
-                    dirs[:] = [d for d in dirs if d not in ['node_modules', '.git', 'dist', 'build']]
-                    
-                    for file in files:
-                        if '.stories.' in file and (file.endswith('.tsx') or file.endswith('.ts')):
-                            storybook_files.append(os.path.join(root, file))
-            else:
-                for file in os.listdir(directory):
-                    if '.stories.' in file and (file.endswith('.tsx') or file.endswith('.ts')):
-                        file_path = os.path.join(directory, file)
-                        if os.path.isfile(file_path):
-                            storybook_files.append(file_path)
-            
-            logger.info(f"Found {len(storybook_files)} storybook files in {directory}")
-            return storybook_files
-            
-        except Exception as e:
-            logger.error(f"Failed to find storybook files in {directory}: {e}")
-            return []
+
+
+# Global Storybook parser instance
+_storybook_parser: Optional[StorybookParser] = None
 
 
 def get_storybook_parser() -> StorybookParser:
-    """Get Storybook parser instance"""
-    return StorybookParser()
+    """Get or create global Storybook parser instance"""
+    global _storybook_parser
+    if _storybook_parser is None:
+        _storybook_parser = StorybookParser()
+    return _storybook_parser
 
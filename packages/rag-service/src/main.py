@@ -1,13 +1,23 @@
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+import anyio
 import logging
+import os
 import sys
 
+import torch
+
 from src.config.settings import get_settings
 from src.api.routes import search, components, scan
 from src.api.models import HealthResponse
+from src.api.batcher import get_search_batcher
+from src.api.executor import get_vs_executor, run_vs, shutdown_vs_executor
 from src.db.vector_store import get_vector_store
-from src.rag.embeddings import get_embedding_service
+from src.intelligence.ast_parser import shutdown_ast_parser
+from src.intelligence.component_scanner import shutdown_scan_executor
+from src.rag.embeddings import get_embedding_service, shutdown_embedding_service
 
 # Configure logging
 logging.basicConfig(
@@ -23,11 +33,23 @@ logger = logging.getLogger(__name__)
 # Get settings
 settings = get_settings()
 
+# Workers forked from a preloading parent share its model weights copy-on-write;
+# ONNX Runtime sessions and encode worker pools do not survive a fork
+if settings.preload_embedding_model:
+    if settings.embedding_backend == "torch" and not settings.encode_processes:
+        get_embedding_service()
+    else:
+        logger.warning(
+            "preload_embedding_model only applies to the torch embedding backend "
+            "without encode_processes"
+        )
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
-    description="RAG service for Component AI Agent"
+    description="RAG service for Component AI Agent",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -45,6 +67,23 @@ async def startup_event():
     """Initialize services on startup"""
     logger.info("Starting RAG service...")
     
+    # Blocking vector store and embedding calls are offloaded to the threadpool
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.thread_pool_size
+    
+    # Pure vector store lookups get their own pool sized to the core count
+    app.state.vs_pool = get_vs_executor()
+    
+    # Embedding runs one forward pass at a time across all CPU threads;
+    # inter-op parallelism only adds contention for the same cores
+    torch.set_num_threads(
+        settings.torch_num_threads or max(1, (os.cpu_count() or 4) // settings.workers)
+    )
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set before torch first runs parallel work
+        pass
+    
     try:
         # Initialize vector store
         vector_store = get_vector_store()
@@ -54,6 +93,16 @@ async def startup_event():
         embedding_service = get_embedding_service()
         logger.info(f"Embedding service initialized (dimension: {embedding_service.get_dimension()})")
         
+        # A failed warmup only leaves the first search slower
+        try:
+            await run_in_threadpool(embedding_service.warmup)
+        except Exception as e:
+            logger.warning(f"Embedding model warmup failed: {e}")
+        
+        # Start coalescing concurrent search queries into batches
+        if settings.search_batch_size > 1:
+            await get_search_batcher().start()
+        
         logger.info("RAG service started successfully")
         
     except Exception as e:
@@ -65,6 +114,11 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down RAG service...")
+    await get_search_batcher().stop()
+    shutdown_vs_executor()
+    shutdown_scan_executor()
+    shutdown_ast_parser()
+    shutdown_embedding_service()
 
 
 @app.get("/")
@@ -81,10 +135,9 @@ async def root():
 async def health_check():
     """Health check endpoint"""
     try:
+        # The count query blocks, so it runs off the event loop
         vector_store = get_vector_store()
-        chroma_healthy = vector_store.health_check()
-        
-        embedding_service = get_embedding_service()
+        chroma_healthy = await run_vs(vector_store.health_check)
         
         return HealthResponse(
             status="healthy" if chroma_healthy else "degraded",
@@ -110,10 +163,13 @@ app.include_router(scan.router, prefix=settings.api_prefix)
 
 if __name__ == "__main__":
     import uvicorn
+    # The event loop and HTTP parser default to uvloop and httptools when
+    # installed (uvicorn[standard]); reloading only works with one worker
     uvicorn.run(
-        "main:app",
+        "src.main:app",
         host=settings.host,
         port=settings.port,
-        reload=True
+        workers=settings.workers,
+        reload=settings.reload and settings.workers == 1
     )
 
@@ -1,6 +1,15 @@
 from sentence_transformers import SentenceTransformer
-from typing import List, Union
+from cachetools import LRUCache
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import Any, List, Optional, Union
 import logging
+import multiprocessing
+import os
+import threading
+
+import numpy as np
+import torch
 
 from src.config.settings import get_settings
 
@@ -10,37 +19,223 @@ logger = logging.getLogger(__name__)
 class EmbeddingService:
     """Service for generating embeddings using sentence transformers"""
     
-    def __init__(self):
+    def __init__(self, encode_processes: Optional[int] = None):
         self.settings = get_settings()
         self.model = None
-        self._load_model()
+        self._autocast_dtype: Optional[torch.dtype] = None
+        self._encode_pool: Optional[ProcessPoolExecutor] = None
+        self._encode_processes = (
+            self.settings.encode_processes if encode_processes is None else encode_processes
+        )
+        
+        # Embeddings of recent search queries; encode is called from many threads
+        self._query_cache: "LRUCache[str, np.ndarray]" = LRUCache(
+            maxsize=self.settings.query_embedding_cache_size
+        )
+        self._query_cache_lock = threading.Lock()
+        
+        if self._encode_processes > 0:
+            self._start_encode_pool()
+        else:
+            self._load_model()
     
     def _load_model(self):
         """Load the embedding model"""
+        if self.settings.embedding_backend == "onnx" and self._load_onnx_model():
+            return
+        
         try:
             logger.info(f"Loading embedding model: {self.settings.embedding_model}")
             self.model = SentenceTransformer(self.settings.embedding_model)
+            self._set_precision(self.settings.embedding_precision)
             logger.info("Embedding model loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
             raise
     
-    def encode(self, text: Union[str, List[str]]) -> Union[List[float], List[List[float]]]:
-        """Generate embeddings for text"""
+    def _start_encode_pool(self):
+        """
+        Load the model in worker processes instead of this one
+        
+        Tokenization and the Python side of encode hold the GIL, so concurrent
+        encode calls from request threads take turns in one process. Workers
+        run them in parallel at the cost of one model per process, and split
+        the cores between them for torch.
+        """
+        threads = self.settings.torch_num_threads or max(
+            1, (os.cpu_count() or 4) // (self._encode_processes * self.settings.workers)
+        )
+        # Spawn rather than fork: the service process runs threads (server, thread pools)
+        self._encode_pool = ProcessPoolExecutor(
+            max_workers=self._encode_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_encode_worker,
+            initargs=(threads,)
+        )
+        self._dimension = self._encode_pool.submit(_run_in_worker, "get_dimension").result()
+        logger.info(
+            f"Started {self._encode_processes} embedding worker processes "
+            f"with {threads} threads each"
+        )
+    
+    def _set_precision(self, precision: str):
+        """
+        Run the model in half precision on CUDA
+        
+        fp16 converts the weights. bf16 keeps fp32 weights and autocasts each
+        encode call, since numpy has no bfloat16 for the returned embeddings.
+        On CPU half precision is slower, so the model stays in fp32.
+        """
+        if precision == "fp32":
+            return
+        if self.model.device.type != "cuda":
+            logger.info(f"Embedding precision {precision} needs CUDA, using fp32")
+            return
+        
+        if precision == "fp16":
+            self.model.half()
+        elif precision == "bf16":
+            self._autocast_dtype = torch.bfloat16
+        else:
+            logger.warning(f"Unknown embedding precision {precision}, using fp32")
+            return
+        logger.info(f"Embedding model running in {precision}")
+    
+    def _load_onnx_model(self) -> bool:
+        """Load the model's ONNX export, falling back to PyTorch when it is unavailable"""
         try:
-            embeddings = self.model.encode(text, convert_to_numpy=True)
+            from src.rag.onnx_encoder import OnnxEncoder
             
-            if isinstance(text, str):
-                return embeddings.tolist()
-            else:
-                return [emb.tolist() for emb in embeddings]
+            logger.info(
+                f"Loading ONNX embedding model: {self.settings.embedding_model} "
+                f"({self.settings.embedding_onnx_file})"
+            )
+            self.model = OnnxEncoder(self.settings.embedding_model, self.settings.embedding_onnx_file)
+            logger.info("ONNX embedding model loaded successfully")
+            return True
+        except Exception as e:
+            logger.warning(f"ONNX embedding model unavailable, using PyTorch: {e}")
+            return False
+    
+    def encode(
+        self,
+        text: Union[str, List[str]],
+        batch_size: Optional[int] = None,
+        use_cache: bool = False,
+        return_numpy: bool = False
+    ) -> Union[List[float], List[List[float]], np.ndarray]:
+        """
+        Generate embeddings for text
+        
+        Embeddings are L2-normalized, so cosine similarity between them is a
+        plain dot product. Pass lists rather than looping: the model sorts one
+        call's texts by length so each batch pads to a similar length.
+        
+        With use_cache=True, texts embedded recently are answered from an LRU
+        cache and only the misses are run through the model, in one call.
+        Meant for search queries, which repeat; component documents do not.
+        
+        With return_numpy=True the float32 array is returned as is, for callers
+        that compute on it rather than convert every value to a Python float.
+        """
+        if use_cache and self.settings.query_embedding_cache_size > 0:
+            return self._encode_cached(text, batch_size, return_numpy)
+        
+        if self._encode_pool is not None:
+            embeddings = self._encode_pool.submit(
+                _run_in_worker, "encode", text, batch_size=batch_size, return_numpy=True
+            ).result()
+            return embeddings if return_numpy else embeddings.tolist()
+        
+        try:
+            # The progress bar defaults on at INFO logging and redraws per batch
+            autocast = (
+                torch.autocast("cuda", dtype=self._autocast_dtype)
+                if self._autocast_dtype is not None else nullcontext()
+            )
+            with autocast:
+                embeddings = self.model.encode(
+                    text,
+                    batch_size=batch_size or self.settings.embedding_batch_size,
+                    convert_to_numpy=True,
+                    show_progress_bar=False,
+                    normalize_embeddings=True
+                )
+            
+            return embeddings if return_numpy else embeddings.tolist()
         except Exception as e:
             logger.error(f"Failed to generate embeddings: {e}")
             raise
     
+    def _encode_cached(
+        self,
+        text: Union[str, List[str]],
+        batch_size: Optional[int],
+        return_numpy: bool
+    ) -> Union[List[float], List[List[float]], np.ndarray]:
+        """Generate embeddings through the query cache"""
+        texts = [text] if isinstance(text, str) else text
+        
+        with self._query_cache_lock:
+            found = [self._query_cache.get(t) for t in texts]
+        
+        missing = list(dict.fromkeys(t for t, embedding in zip(texts, found) if embedding is None))
+        if missing:
+            rows = self.encode(missing, batch_size=batch_size, return_numpy=True)
+            # Cached rows are shared between callers, so they are made read-only
+            rows.setflags(write=False)
+            computed = dict(zip(missing, rows))
+            with self._query_cache_lock:
+                self._query_cache.update(computed)
+            found = [computed[t] if embedding is None else embedding for t, embedding in zip(texts, found)]
+        
+        embeddings = found[0] if isinstance(text, str) else np.stack(found)
+        return embeddings if return_numpy else embeddings.tolist()
+    
+    def warmup(self):
+        """
+        Run a forward pass on a batch of typical search query length, so
+        one-off kernel and allocator setup is not paid by the first request
+        """
+        if self._encode_pool is not None:
+            # Submitted together, so the pool starts and warms every worker
+            futures = [
+                self._encode_pool.submit(_run_in_worker, "warmup")
+                for _ in range(self._encode_processes)
+            ]
+            for future in futures:
+                future.result()
+            return
+        
+        self.encode(["warmup " * 32] * 8, return_numpy=True)
+    
     def get_dimension(self) -> int:
         """Get embedding dimension"""
+        if self._encode_pool is not None:
+            return self._dimension
         return self.model.get_sentence_embedding_dimension()
+    
+    def shutdown(self):
+        """Shut down the encode worker processes if they were started"""
+        if self._encode_pool is not None:
+            self._encode_pool.shutdown(wait=True, cancel_futures=True)
+            self._encode_pool = None
+
+
+# Embedding service of an encode worker process
+_worker_service: Optional[EmbeddingService] = None
+
+
+def _init_encode_worker(num_threads: int):
+    """Load the model in an encode worker process"""
+    global _worker_service
+    torch.set_num_threads(num_threads)
+    _worker_service = EmbeddingService(encode_processes=0)
+
+
+def _run_in_worker(method: str, *args: Any, **kwargs: Any) -> Any:
+    """Call a method of the worker process's embedding service"""
+    return getattr(_worker_service, method)(*args, **kwargs)
 
 
 # Global embedding service instance
@@ -54,3 +249,8 @@ def get_embedding_service() -> EmbeddingService:
         _embedding_service = EmbeddingService()
     return _embedding_service
 
+
+def shutdown_embedding_service():
+    """Shut down the embedding service's worker processes if it started any"""
+    if _embedding_service is not None:
+        _embedding_service.shutdown()
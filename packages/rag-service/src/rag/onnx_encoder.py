@@ -0,0 +1,94 @@
+from typing import List, Union
+import json
+
+import numpy as np
+import onnxruntime as ort
+from huggingface_hub import hf_hub_download
+from transformers import AutoTokenizer
+
+from src.rag.vector_math import normalize
+
+
+# Used when the model repository has no sentence-transformers config
+DEFAULT_MAX_SEQ_LENGTH = 256
+
+
+def mean_pool(token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Average token embeddings over the non-padding tokens of each text"""
+    mask = attention_mask[:, :, np.newaxis].astype(token_embeddings.dtype)
+    summed = (token_embeddings * mask).sum(axis=1)
+    return summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+
+class OnnxEncoder:
+    """
+    Sentence encoder running an ONNX export of the model on ONNX Runtime
+    
+    Stands in for SentenceTransformer in EmbeddingService, with the same
+    encode() signature. The export is taken from the model's Hugging Face
+    repository (e.g. onnx/model.onnx, or a quantized onnx/model_qint8_*.onnx),
+    and embeddings are mean-pooled, as for the sentence-transformers MiniLM
+    and MPNet models.
+    """
+    
+    def __init__(self, model_name: str, onnx_file: str):
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.max_seq_length = self._read_max_seq_length(model_name)
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            hf_hub_download(model_name, onnx_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        self._dimension = self.session.get_outputs()[0].shape[-1]
+    
+    def _read_max_seq_length(self, model_name: str) -> int:
+        """Token limit the model was trained with, from its sentence-transformers config"""
+        try:
+            with open(hf_hub_download(model_name, "sentence_bert_config.json")) as f:
+                return int(json.load(f)["max_seq_length"])
+        except Exception:
+            return min(self.tokenizer.model_max_length, DEFAULT_MAX_SEQ_LENGTH)
+    
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        show_progress_bar: bool = False,
+        normalize_embeddings: bool = False
+    ) -> np.ndarray:
+        """Embed one text or a list of texts, as SentenceTransformer.encode does"""
+        texts = [sentences] if isinstance(sentences, str) else list(sentences)
+        embeddings = np.zeros((len(texts), self._dimension), dtype=np.float32)
+        
+        # Longest texts first, so each batch pads to a similar length
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            tokens = self.tokenizer(
+                [texts[i] for i in indices],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            inputs = {
+                name: value.astype(np.int64)
+                for name, value in tokens.items()
+                if name in self._input_names
+            }
+            token_embeddings = self.session.run(None, inputs)[0]
+            embeddings[indices] = mean_pool(token_embeddings, tokens["attention_mask"])
+        
+        if normalize_embeddings:
+            embeddings = normalize(embeddings)
+        
+        return embeddings[0] if isinstance(sentences, str) else embeddings
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        """Get embedding dimension"""
+        return self._dimension
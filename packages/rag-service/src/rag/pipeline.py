@@ -1,10 +1,10 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 
-from src.rag.retriever import get_retriever
+from src.rag.retriever import get_retriever, get_similarity_cache
 from src.rag.embeddings import get_embedding_service
 from src.db.vector_store import get_vector_store
-from src.db.schemas import ComponentSchema
+from src.db.schemas import ComponentSchema, ComponentLike
 
 logger = logging.getLogger(__name__)
 
@@ -26,28 +26,50 @@ class RAGPipeline:
         """Search for components using semantic search"""
         return self.retriever.search(query=query, limit=limit, filters=filters)
     
-    def add_component(self, component: Dict[str, Any]) -> bool:
-        """Add a component to the knowledge base"""
+    def search_components_batch(
+        self,
+        queries: List[str],
+        limit: int = 10,
+        filters: Dict[str, Any] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Search for several queries in one embedding and vector store call"""
+        return self.retriever.search_batch(queries=queries, limit=limit, filters=filters)
+    
+    def add_component(self, component: ComponentLike, upsert: bool = False) -> bool:
+        """
+        Add a component (a dict or an API model) to the knowledge base
+        
+        With upsert=True a component already stored under the same ID is
+        replaced, or left as is if its content is unchanged.
+        """
+        if upsert:
+            return self.add_components([component], upsert=True)
+        
         try:
+            component_id = ComponentSchema.field(component, "id")
+            name = ComponentSchema.field(component, "name")
+            content_hash = ComponentSchema.content_hash(component)
+            
             # Convert component to document text
-            document = ComponentSchema.to_document(component)
+            document = ComponentSchema.to_document(component, content_hash)
             
             # Generate embedding
             embedding = self.embedding_service.encode(document)
             
             # Extract metadata
-            metadata = ComponentSchema.to_metadata(component)
+            metadata = ComponentSchema.to_metadata(component, content_hash)
             
             # Add to vector store
             success = self.vector_store.add_component(
-                component_id=component["id"],
+                component_id=component_id,
                 document=document,
                 embedding=embedding,
                 metadata=metadata
             )
             
             if success:
-                logger.info(f"Added component: {component['name']} ({component['id']})")
+                get_similarity_cache().clear()
+                logger.info(f"Added component: {name} ({component_id})")
             
             return success
             
@@ -55,28 +77,152 @@ class RAGPipeline:
             logger.error(f"Failed to add component: {e}")
             return False
     
-    def update_component(self, component: Dict[str, Any]) -> bool:
-        """Update a component in the knowledge base"""
+    def add_components(self, components: List[ComponentLike], upsert: bool = False) -> bool:
+        """
+        Add several components to the knowledge base
+        
+        Documents are embedded in one batched encoder call and written to the
+        vector store in a single add. With upsert=True, components already
+        stored under the same ID are replaced; those whose stored content hash
+        matches are skipped without being re-embedded.
+        """
+        if not components:
+            return True
+        
         try:
+            ids = [ComponentSchema.field(c, "id") for c in components]
+            hashes = [ComponentSchema.content_hash(c) for c in components]
+            
+            if upsert:
+                stored = self.vector_store.get_content_hashes(ids)
+                changed = [
+                    i for i, (component_id, h) in enumerate(zip(ids, hashes))
+                    if stored.get(component_id) != h
+                ]
+                if not changed:
+                    return True
+                components = [components[i] for i in changed]
+                ids = [ids[i] for i in changed]
+                hashes = [hashes[i] for i in changed]
+            
+            documents = [ComponentSchema.to_document(c, h) for c, h in zip(components, hashes)]
+            embeddings = self._embed(ids, documents) if upsert else self.embedding_service.encode(documents)
+            
+            write = self.vector_store.upsert_components if upsert else self.vector_store.add_components
+            success = write(
+                ids=ids,
+                documents=documents,
+                embeddings=embeddings,
+                metadatas=[ComponentSchema.to_metadata(c, h) for c, h in zip(components, hashes)]
+            )
+            
+            if success:
+                get_similarity_cache().clear()
+                logger.info(f"{'Upserted' if upsert else 'Added'} {len(components)} components")
+            
+            return success
+            
+        except Exception as e:
+            logger.error(f"Failed to add components: {e}")
+            return False
+    
+    def _embed(self, ids: List[str], documents: List[str]) -> List[List[float]]:
+        """
+        Embed the documents of components being re-indexed
+        
+        Many content changes (prop types, paths, export style) leave the
+        document text as it was; those components keep their stored embedding
+        and only the rest are run through the encoder.
+        """
+        stored = self.vector_store.get_documents_and_embeddings(ids)
+        
+        embeddings = [None] * len(ids)
+        changed = []
+        for i, (component_id, document) in enumerate(zip(ids, documents)):
+            stored_document, stored_embedding = stored.get(component_id, (None, None))
+            if stored_document == document and stored_embedding is not None:
+                embeddings[i] = stored_embedding
+            else:
+                changed.append(i)
+        
+        if changed:
+            encoded = self.embedding_service.encode([documents[i] for i in changed])
+            for i, embedding in zip(changed, encoded):
+                embeddings[i] = embedding
+        
+        return embeddings
+    
+    def is_unchanged(self, component_id: str, content_hash: str) -> bool:
+        """Whether the stored component already has this content hash"""
+        return self.vector_store.get_content_hash(component_id) == content_hash
+    
+    def add_components_batch(
+        self,
+        components: List[ComponentLike],
+        upsert: bool = False
+    ) -> List[Tuple[ComponentLike, bool, Optional[str]]]:
+        """
+        Add components in one batch, reporting the outcome per component
+        
+        If the batched write fails, each component is retried on its own so
+        that one bad component does not fail the whole batch.
+        
+        Returns:
+            (component, success, error message) for each component, in order
+        """
+        if self.add_components(components, upsert=upsert):
+            return [(component, True, None) for component in components]
+        
+        logger.warning(f"Batch add of {len(components)} components failed, retrying individually")
+        return [
+            (component, True, None) if self.add_component(component, upsert=upsert)
+            else (component, False, f"Failed to index component: {ComponentSchema.field(component, 'name')}")
+            for component in components
+        ]
+    
+    def update_component(
+        self,
+        component: ComponentLike,
+        content_hash: Optional[str] = None,
+        check_unchanged: bool = True
+    ) -> bool:
+        """
+        Update a component (a dict or an API model) in the knowledge base
+        
+        Callers that already compared the content hash pass it in with
+        check_unchanged=False to skip the second lookup.
+        """
+        try:
+            component_id = ComponentSchema.field(component, "id")
+            name = ComponentSchema.field(component, "name")
+            
+            # Skip re-indexing when the stored content is identical
+            if content_hash is None:
+                content_hash = ComponentSchema.content_hash(component)
+            if check_unchanged and self.is_unchanged(component_id, content_hash):
+                logger.info(f"Component unchanged: {name} ({component_id})")
+                return True
+            
             # Convert component to document text
-            document = ComponentSchema.to_document(component)
+            document = ComponentSchema.to_document(component, content_hash)
             
-            # Generate embedding
-            embedding = self.embedding_service.encode(document)
+            # Generate embedding, unless the stored one is for the same text
+            embedding = self._embed([component_id], [document])[0]
             
             # Extract metadata
-            metadata = ComponentSchema.to_metadata(component)
+            metadata = ComponentSchema.to_metadata(component, content_hash)
             
             # Update in vector store
             success = self.vector_store.update_component(
-                component_id=component["id"],
+                component_id=component_id,
                 document=document,
                 embedding=embedding,
                 metadata=metadata
             )
             
             if success:
-                logger.info(f"Updated component: {component['name']} ({component['id']})")
+                get_similarity_cache().clear()
+                logger.info(f"Updated component: {name} ({component_id})")
             
             return success
             
@@ -90,6 +236,7 @@ class RAGPipeline:
             success = self.vector_store.delete_component(component_id)
             
             if success:
+                get_similarity_cache().clear()
                 logger.info(f"Deleted component: {component_id}")
             
             return success
@@ -106,18 +253,32 @@ class RAGPipeline:
         """Get all components"""
         return self.retriever.get_all()
     
+    def get_components_page(self, limit: int, offset: int) -> List[Dict[str, Any]]:
+        """Get one page of components"""
+        return self.retriever.get_page(limit=limit, offset=offset)
+    
     def suggest_component_for_ui(
         self,
         ui_description: str,
         limit: int = 5
     ) -> List[Dict[str, Any]]:
         """Suggest components based on UI description"""
-        # Enhance the query with common UI patterns
-        enhanced_query = f"UI component for: {ui_description}"
-        return self.search_components(query=enhanced_query, limit=limit)
+        return self.search_components(query=self.build_ui_query(ui_description), limit=limit)
+    
+    @staticmethod
+    def build_ui_query(ui_description: str) -> str:
+        """Enhance a UI description with common UI patterns for searching"""
+        return f"UI component for: {ui_description}"
+
+
+# Global RAG pipeline instance
+_rag_pipeline: Optional[RAGPipeline] = None
 
 
 def get_rag_pipeline() -> RAGPipeline:
-    """Get RAG pipeline instance"""
-    return RAGPipeline()
+    """Get or create global RAG pipeline instance"""
+    global _rag_pipeline
+    if _rag_pipeline is None:
+        _rag_pipeline = RAGPipeline()
+    return _rag_pipeline
 
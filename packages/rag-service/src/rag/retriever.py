@@ -1,16 +1,131 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
+import threading
+import time
 
+import numpy as np
+import orjson
+
+from src.config.settings import get_settings
 from src.rag.embeddings import get_embedding_service
+from src.rag.vector_math import Vector, normalize, rerank
 from src.db.vector_store import get_vector_store
 
 logger = logging.getLogger(__name__)
 
 
+class SimilarityCache:
+    """
+    Recent search results, looked up by query embedding
+    
+    A query whose embedding has at least the threshold cosine similarity to a
+    cached query searched with the same limit and filters gets that query's
+    results without a vector store search. Entries are evicted first in,
+    first out, and expire after ttl seconds; cached vectors are kept
+    normalized in one contiguous matrix.
+    
+    clear() starts a new generation. Callers read the generation before
+    searching and pass it to put(), so results read before a write are not
+    cached after it.
+    """
+    
+    def __init__(self, size: int, threshold: float, ttl: float = 60.0):
+        self.size = size
+        self.threshold = threshold
+        self.ttl = ttl
+        self.generation = 0
+        self._keys: List[bytes] = []
+        self._results: List[List[Dict[str, Any]]] = []
+        self._stamps: List[float] = []
+        self._vectors: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(limit: int, filters: Optional[Dict[str, Any]]) -> bytes:
+        """Key of the searches whose results are interchangeable"""
+        return orjson.dumps([limit, filters or {}], option=orjson.OPT_SORT_KEYS)
+    
+    def get(self, key: bytes, embedding: Vector) -> Optional[List[Dict[str, Any]]]:
+        """Get the results of the most similar cached query, if similar enough"""
+        if self.size <= 0:
+            return None
+        
+        query = normalize(embedding)
+        with self._lock:
+            self._expire()
+            if self._vectors is None:
+                return None
+            
+            scores = self._vectors @ query
+            best = None
+            for i in np.flatnonzero(scores >= self.threshold):
+                if self._keys[i] == key and (best is None or scores[i] > scores[best]):
+                    best = i
+            
+            return list(self._results[best]) if best is not None else None
+    
+    def put(
+        self,
+        key: bytes,
+        embedding: Vector,
+        results: List[Dict[str, Any]],
+        generation: Optional[int] = None
+    ):
+        """
+        Cache the results of a query, evicting the oldest entry when full
+        
+        Results searched in an earlier generation than the current one are
+        dropped; without a generation they are taken as current.
+        """
+        if self.size <= 0:
+            return
+        
+        vector = normalize(embedding)[np.newaxis, :]
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            
+            vectors = vector if self._vectors is None else np.vstack([self._vectors, vector])
+            self._keys.append(key)
+            self._results.append(results)
+            self._stamps.append(time.monotonic())
+            
+            if len(self._keys) > self.size:
+                vectors = vectors[1:]
+                del self._keys[0]
+                del self._results[0]
+                del self._stamps[0]
+            self._vectors = vectors
+    
+    def _expire(self):
+        """Drop entries older than the TTL; entries are in insertion order"""
+        cutoff = time.monotonic() - self.ttl
+        expired = 0
+        while expired < len(self._stamps) and self._stamps[expired] <= cutoff:
+            expired += 1
+        if not expired:
+            return
+        
+        del self._keys[:expired]
+        del self._results[:expired]
+        del self._stamps[:expired]
+        self._vectors = self._vectors[expired:] if self._keys else None
+    
+    def clear(self):
+        """Drop all cached results and start a new generation, after the indexed components change"""
+        with self._lock:
+            self.generation += 1
+            self._keys = []
+            self._results = []
+            self._stamps = []
+            self._vectors = None
+
+
 class Retriever:
     """Retriever for semantic search"""
     
     def __init__(self):
+        self.settings = get_settings()
         self.embedding_service = get_embedding_service()
         self.vector_store = get_vector_store()
     
@@ -23,7 +138,15 @@ class Retriever:
         """Search for similar components"""
         try:
             # Generate query embedding
-            query_embedding = self.embedding_service.encode(query)
+            query_embedding = self.embedding_service.encode(query, use_cache=True, return_numpy=True)
+            
+            # Near-duplicates of a recent query reuse its results
+            cache = get_similarity_cache()
+            generation = cache.generation
+            key = cache.key(limit, filters)
+            cached = cache.get(key, query_embedding)
+            if cached is not None:
+                return cached
             
             # Search in vector store
             results = self.vector_store.search(
@@ -32,24 +155,98 @@ class Retriever:
                 filters=filters
             )
             
-            # Format results
-            formatted_results = []
+            formatted = self._rerank(self._format_results(results, 0))
+            if formatted:
+                cache.put(key, query_embedding, formatted, generation)
+            return formatted
+            
+        except Exception as e:
+            logger.error(f"Search failed: {e}")
+            return []
+    
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 10,
+        filters: Dict[str, Any] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries at once
+        
+        All queries are embedded in one encoder call. Queries close enough to
+        a recent one reuse its results, and the rest are answered by a single
+        vector store query. Returns one result list per query, in order.
+        """
+        if not queries:
+            return []
+        
+        try:
+            query_embeddings = self.embedding_service.encode(
+                queries,
+                use_cache=True,
+                return_numpy=True
+            )
+            
+            cache = get_similarity_cache()
+            generation = cache.generation
+            key = cache.key(limit, filters)
+            answers = [cache.get(key, embedding) for embedding in query_embeddings]
+            misses = [i for i, answer in enumerate(answers) if answer is None]
             
-            if results["ids"] and results["ids"][0]:
-                for i, component_id in enumerate(results["ids"][0]):
-                    formatted_results.append({
-                        "id": component_id,
-                        "metadata": results["metadatas"][0][i],
-                        "document": results["documents"][0][i],
-                        "distance": results["distances"][0][i],
-                        "score": 1 - results["distances"][0][i]  # Convert distance to similarity score
-                    })
+            if misses:
+                results = self.vector_store.search(
+                    query_embedding=query_embeddings[misses],
+                    limit=limit,
+                    filters=filters
+                )
+                
+                for row, i in enumerate(misses):
+                    answers[i] = self._rerank(self._format_results(results, row))
+                    if answers[i]:
+                        cache.put(key, query_embeddings[i], answers[i], generation)
             
-            return formatted_results
+            return answers
             
         except Exception as e:
-            logger.error(f"Search failed: {e}")
+            logger.error(f"Batch search failed: {e}")
+            return [[] for _ in queries]
+    
+    def _format_results(self, results: Dict[str, Any], row: int) -> List[Dict[str, Any]]:
+        """Format one result row of a vector store query"""
+        if not results["ids"] or len(results["ids"]) <= row:
             return []
+        
+        # Chroma returns one column per field; zip them once rather than index each
+        return [
+            {
+                "id": component_id,
+                "metadata": metadata,
+                "document": document,
+                "distance": distance,
+                "score": score
+            }
+            for component_id, metadata, document, distance, score in zip(
+                results["ids"][row],
+                results["metadatas"][row],
+                results["documents"][row],
+                results["distances"][row],
+                results["scores"][row]
+            )
+        ]
+    
+    def _rerank(self, formatted: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Favour components with Storybook examples, when weighted in the settings"""
+        weight = self.settings.search_example_weight
+        if not weight or not formatted:
+            return formatted
+        
+        examples = np.fromiter(
+            ((result["metadata"] or {}).get("num_examples", 0) for result in formatted),
+            dtype=np.float64,
+            count=len(formatted)
+        )
+        order, scores = rerank([result["score"] for result in formatted], examples / (examples + 1), weight)
+        return [{**formatted[i], "score": score} for i, score in zip(order.tolist(), scores.tolist())]
     
     def get_by_id(self, component_id: str) -> Dict[str, Any]:
         """Get component by ID"""
@@ -58,9 +255,37 @@ class Retriever:
     def get_all(self) -> List[Dict[str, Any]]:
         """Get all components"""
         return self.vector_store.get_all_components()
+    
+    def get_page(self, limit: int, offset: int) -> List[Dict[str, Any]]:
+        """Get one page of components"""
+        return self.vector_store.get_all_components_paged(limit=limit, offset=offset)
+
+
+# Global similarity cache, shared by every retriever
+_similarity_cache: Optional[SimilarityCache] = None
+
+
+def get_similarity_cache() -> SimilarityCache:
+    """Get or create global similarity cache instance"""
+    global _similarity_cache
+    if _similarity_cache is None:
+        settings = get_settings()
+        _similarity_cache = SimilarityCache(
+            size=settings.search_similarity_cache_size,
+            threshold=settings.search_similarity_threshold,
+            ttl=settings.search_similarity_cache_ttl
+        )
+    return _similarity_cache
+
+
+# Global retriever instance
+_retriever: Optional[Retriever] = None
 
 
 def get_retriever() -> Retriever:
-    """Get retriever instance"""
-    return Retriever()
+    """Get or create global retriever instance"""
+    global _retriever
+    if _retriever is None:
+        _retriever = Retriever()
+    return _retriever
 
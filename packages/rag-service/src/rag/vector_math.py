@@ -0,0 +1,45 @@
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+
+Vector = Union[Sequence[float], np.ndarray]
+
+
+def normalize(vectors: Vector) -> np.ndarray:
+    """
+    Scale a vector, or each row of a matrix, to unit length as float32
+    
+    Zero vectors are left as they are.
+    """
+    array = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(array, axis=-1, keepdims=True)
+    return array / np.where(norms > 0, norms, 1.0)
+
+
+def cosine(a: Vector, b: Vector) -> float:
+    """Cosine similarity of two vectors"""
+    return float(normalize(a) @ normalize(b))
+
+
+def cosine_batch(matrix: Vector, query: Vector) -> np.ndarray:
+    """
+    Cosine similarity of each row of a matrix to a query vector
+    
+    Rows kept normalized up front (as embeddings from EmbeddingService are)
+    can skip this and take a plain matrix-vector product with the normalized
+    query instead.
+    """
+    return normalize(matrix) @ normalize(query)
+
+
+def rerank(scores: Vector, signals: Vector, weight: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rescore results as score + weight * signal
+    
+    Returns:
+        The order of the results by their new score, best first (ties keep
+        their original order), and the new scores in that order
+    """
+    adjusted = np.asarray(scores, dtype=np.float64) + weight * np.asarray(signals, dtype=np.float64)
+    order = np.argsort(-adjusted, kind="stable")
+    return order, adjusted[order]
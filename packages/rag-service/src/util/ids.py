@@ -0,0 +1,60 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+
+# State for monotonic ids within the same millisecond
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+_COUNTER_MAX = 0xFFF
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUID (version 7, RFC 9562)
+
+    The top 48 bits are the Unix time in milliseconds, so ids generated later
+    sort after earlier ones and inserts into B-tree backed storage stay mostly
+    sequential. Ids generated within the same millisecond use the 12-bit
+    rand_a field as a counter, keeping bulk-generated ids strictly increasing.
+    """
+    global _last_ms, _counter
+
+    random_bits = int.from_bytes(os.urandom(8), "big")
+
+    with _lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms > _last_ms:
+            _last_ms = timestamp_ms
+            # Start low in the counter space to leave room for increments
+            _counter = random_bits >> 56 & 0x7FF
+        else:
+            _counter += 1
+            if _counter > _COUNTER_MAX:
+                _last_ms += 1
+                _counter = 0
+        timestamp_ms = _last_ms
+        counter = _counter
+
+    value = (
+        (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | random_bits & 0x3FFF_FFFF_FFFF_FFFF
+    )
+    return uuid.UUID(int=value)
+
+
+def path_id(file_path: str) -> str:
+    """
+    Derive a stable id from a file's absolute path
+
+    The same file gets the same id on every scan, so re-indexing it replaces
+    its stored entry instead of adding a duplicate.
+    """
+    absolute = os.path.abspath(file_path)
+    return hashlib.blake2b(absolute.encode("utf-8", "surrogateescape"), digest_size=16).hexdigest()
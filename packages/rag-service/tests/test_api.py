@@ -105,3 +105,34 @@ def test_get_component_not_found(client):
     response = client.get("/api/components/nonexistent-id")
     assert response.status_code == 404
 
+
+
+def test_search_cache_ignores_responses_from_before_a_write():
+    """Test that a search finishing after a write does not cache its stale response"""
+    from src.api.models import SearchResponse
+    from src.api.routes import search
+    
+    key = search._cache_key("search", "button", 10, None)
+    generation = search._cache_generation
+    search.clear_search_cache()
+    search._cache_response(generation, key, SearchResponse(results=[], total=0, query="button"))
+    
+    assert search._get_cached_response(search._cache_generation, key, "button") is None
+
+
+def test_failed_scan_task_is_logged(caplog):
+    """Test that a background scan's failure is logged without anyone polling it"""
+    import asyncio
+    from src.api.routes import scan
+    
+    async def fail():
+        raise RuntimeError("disk gone")
+    
+    async def run():
+        task = asyncio.create_task(fail())
+        task.add_done_callback(lambda t: scan._log_scan_failure("task-1", t))
+        await asyncio.wait([task])
+    
+    asyncio.run(run())
+    
+    assert "Scan task task-1 failed: disk gone" in caplog.text
@@ -0,0 +1,197 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+import pytest
+
+from src.intelligence.ast_parser import ASTParser
+from src.intelligence.models import PropMeta
+
+
+BUTTON = b"""
+import React from 'react';
+
+export interface ButtonProps extends BaseProps {
+  /** label: shown on the button */
+  label: string;
+  size?: 'sm' | 'md';
+  onClick?: (event: MouseEvent) => void;
+}
+
+export default function Button(props: ButtonProps) {
+  return <button>{props.label}</button>;
+}
+"""
+
+
+def test_extract_props_simple():
+    """Test extracting prop names, types and optionality from a Props interface"""
+    props = ASTParser()._extract_props_simple(BUTTON)
+    
+    assert [(p.name, p.type, p.required) for p in props] == [
+        ("label", "string", True),
+        ("size", "'sm' | 'md'", False),
+        ("onClick", "(event: MouseEvent) => void", False),
+    ]
+
+
+def test_extract_props_without_props_interface():
+    """Test that files without a Props interface have no props"""
+    assert ASTParser()._extract_props_simple(b"interface Theme { color: string }") == []
+
+
+# Parser server standing in for parser.js: every file has one `label` prop
+STUB_SERVER = r"""
+const readline = require('readline');
+console.log(JSON.stringify({ ready: true }));
+readline.createInterface({ input: process.stdin }).on('line', (line) => {
+  const request = JSON.parse(line);
+  const results = request.paths.map((p) => p.endsWith('Missing.tsx')
+    ? { missing: true }
+    : { name: 'Stub', file_path: p, export_type: 'default', dependencies: [], has_children: false,
+        is_hoc: false, props: [{ name: 'label', type: 'string', required: true }] });
+  console.log(JSON.stringify({ id: request.id, results }));
+});
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="requires Node.js")
+def test_parse_files_uses_parser_server():
+    """Test that files are parsed in one batch by the long-lived parser process"""
+    with tempfile.TemporaryDirectory() as root:
+        script = os.path.join(root, "parser.js")
+        with open(script, "w") as f:
+            f.write(STUB_SERVER)
+        
+        parser = ASTParser()
+        parser.node_executable = shutil.which("node")
+        parser.parser_script = script
+        try:
+            button, missing = parser.parse_files(["Button.tsx", "Missing.tsx"])
+            card = parser.parse_file("Card.tsx")
+            proc = parser._proc
+        finally:
+            parser.close()
+    
+    assert button["name"] == "Stub"
+    assert button["file_path"] == "Button.tsx"
+    assert button["props"] == [PropMeta(name="label", type="string", required=True)]
+    assert missing is None
+    assert card["name"] == "Stub"
+    assert proc is not None and proc.returncode is not None
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="requires Node.js")
+def test_parse_file_falls_back_when_parser_server_hangs():
+    """Test that a parser server that stops answering is stopped and heuristics take over"""
+    with tempfile.TemporaryDirectory() as root:
+        script = os.path.join(root, "parser.js")
+        with open(script, "w") as f:
+            f.write("console.log(JSON.stringify({ ready: true })); setInterval(() => {}, 1000);\n")
+        file_path = os.path.join(root, "Button.tsx")
+        with open(file_path, "wb") as f:
+            f.write(BUTTON)
+        
+        parser = ASTParser()
+        parser.node_executable = shutil.which("node")
+        parser.parser_script = script
+        parser.timeout = 0.5
+        try:
+            result = parser.parse_file(file_path)
+            proc = parser._proc
+        finally:
+            parser.close()
+    
+    assert result["name"] == "Button"
+    assert proc is None
+    assert parser._server_failures == 1
+
+
+def _typescript_available() -> bool:
+    """Whether parser.js can load the typescript package, as it resolves it"""
+    node = shutil.which("node")
+    if node is None:
+        return False
+    script_dir = os.path.dirname(ASTParser()._get_parser_script_path())
+    check = subprocess.run(
+        [node, "-e", f"require.resolve('typescript', {{ paths: [process.cwd(), {json.dumps(script_dir)}] }})"],
+        capture_output=True
+    )
+    return check.returncode == 0
+
+
+@pytest.mark.skipif(not _typescript_available(), reason="requires Node.js and the typescript package")
+def test_parser_server_parses_typescript():
+    """Test parser.js on the TypeScript compiler, across requests that build on the last program"""
+    sources = {
+        "base.ts": "export interface BaseProps {\n  /** Shown to screen readers */\n  label: string;\n}\n",
+        "Button.tsx": (
+            "import { BaseProps } from './base';\n\n"
+            "export interface ButtonProps extends BaseProps {\n  size?: 'sm' | 'lg';\n}\n\n"
+            "export default function Button(props: ButtonProps) {\n  return null;\n}\n"
+        ),
+        "Card.tsx": (
+            "export interface CardProps {\n  children?: unknown;\n}\n\n"
+            "export const Card = (props: CardProps) => null;\n"
+        ),
+    }
+    with tempfile.TemporaryDirectory() as root:
+        for name, source in sources.items():
+            with open(os.path.join(root, name), "w") as f:
+                f.write(source)
+        
+        parser = ASTParser()
+        parser.node_executable = shutil.which("node")
+        try:
+            button = parser.parse_file(os.path.join(root, "Button.tsx"))
+            card, button_again = parser.parse_files(
+                [os.path.join(root, "Card.tsx"), os.path.join(root, "Button.tsx")]
+            )
+            proc = parser._proc
+        finally:
+            parser.close()
+    
+    assert proc is not None
+    assert button["export_type"] == "default"
+    assert button["dependencies"] == ["./base"]
+    assert {p.name: p.required for p in button["props"]} == {"size": False, "label": True}
+    assert {p.name: p.description for p in button["props"]}["label"] == "Shown to screen readers"
+    assert button_again["props"] == button["props"]
+    assert card["export_type"] == "named"
+    assert card["has_children"] is True
+
+
+def test_parse_file_falls_back_without_node():
+    """Test that files are parsed heuristically when Node.js is unavailable"""
+    with tempfile.TemporaryDirectory() as root:
+        file_path = os.path.join(root, "Button.tsx")
+        with open(file_path, "wb") as f:
+            f.write(BUTTON)
+        
+        parser = ASTParser()
+        parser.node_executable = os.path.join(root, "no-such-node")
+        result = parser.parse_file(file_path)
+        
+        assert result["name"] == "Button"
+        assert result["export_type"] == "default"
+        assert [p.name for p in result["props"]] == ["label", "size", "onClick"]
+        assert parser.parse_file(os.path.join(root, "Missing.tsx")) is None
+
+
+def test_mock_parse_reads_past_the_head_of_large_files():
+    """Test that signals late in a large file are still found"""
+    with tempfile.TemporaryDirectory() as root:
+        file_path = os.path.join(root, "Table.tsx")
+        with open(file_path, "wb") as f:
+            f.write(b"// generated\n" * 1000)
+            f.write(b"interface TableProps {\n  rows: Row[];\n}\n")
+            f.write(b"const Table = (props: TableProps) => props.children;\n")
+            f.write(b"export default Table;\n")
+        
+        result = ASTParser()._mock_parse(file_path)
+    
+    assert result["export_type"] == "default"
+    assert result["has_children"] is True
+    assert [(p.name, p.type) for p in result["props"]] == [("rows", "Row[]")]
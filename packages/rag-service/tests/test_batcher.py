@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+
+from src.api import batcher as batcher_module
+from src.api.batcher import SearchBatcher
+
+
+class FakePipeline:
+    """Pipeline stub that records batched search calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def search_components_batch(self, queries, limit=10, filters=None):
+        self.calls.append((list(queries), limit, filters))
+        return [
+            [{"id": f"{query}-{i}", "score": 1.0} for i in range(limit)]
+            for query in queries
+        ]
+
+    def search_components(self, query, limit=10, filters=None):
+        return self.search_components_batch([query], limit, filters)[0]
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    fake = FakePipeline()
+    monkeypatch.setattr(batcher_module, "get_rag_pipeline", lambda: fake)
+    return fake
+
+
+async def test_concurrent_queries_share_one_batch(pipeline):
+    """Test that concurrent queries are answered by a single batched call"""
+    batcher = SearchBatcher(max_batch_size=8, max_wait_ms=50)
+    await batcher.start()
+
+    try:
+        results = await asyncio.gather(
+            batcher.search("button", limit=2),
+            batcher.search("card", limit=3),
+            batcher.search("modal", limit=1),
+        )
+    finally:
+        await batcher.stop()
+
+    assert len(pipeline.calls) == 1
+    assert pipeline.calls[0][0] == ["button", "card", "modal"]
+    assert [len(r) for r in results] == [2, 3, 1]
+    assert results[1][0]["id"] == "card-0"
+
+
+async def test_queries_with_different_filters_are_split(pipeline):
+    """Test that queries are only batched with queries sharing their filters"""
+    batcher = SearchBatcher(max_batch_size=8, max_wait_ms=50)
+    await batcher.start()
+
+    try:
+        await asyncio.gather(
+            batcher.search("button", filters={"category": "Actions"}),
+            batcher.search("input", filters={"category": "Forms"}),
+            batcher.search("link", filters={"category": "Actions"}),
+        )
+    finally:
+        await batcher.stop()
+
+    assert len(pipeline.calls) == 2
+    assert sorted(call[0] for call in pipeline.calls) == [["button", "link"], ["input"]]
+
+
+async def test_search_without_worker_falls_back(pipeline):
+    """Test that searching before start() calls the pipeline directly"""
+    batcher = SearchBatcher()
+
+    results = await batcher.search("button", limit=2)
+
+    assert len(results) == 2
+    assert pipeline.calls == [(["button"], 2, None)]
+
+
+async def test_stop_fails_unanswered_queries(pipeline):
+    """Test that stopping fails queued queries and the batch being dispatched"""
+    import threading
+    release = threading.Event()
+    search_components_batch = pipeline.search_components_batch
+    pipeline.search_components_batch = lambda *args, **kwargs: (
+        release.wait(5), search_components_batch(*args, **kwargs)
+    )[1]
+
+    batcher = SearchBatcher(max_batch_size=1, max_wait_ms=0)
+    await batcher.start()
+    searches = [asyncio.create_task(batcher.search(query)) for query in ["button", "card", "modal"]]
+    await asyncio.sleep(0.05)
+
+    try:
+        await batcher.stop()
+        results = await asyncio.wait_for(asyncio.gather(*searches, return_exceptions=True), 1)
+    finally:
+        release.set()
+
+    assert all(isinstance(result, RuntimeError) for result in results)
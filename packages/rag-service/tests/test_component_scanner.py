@@ -0,0 +1,109 @@
+import os
+import tempfile
+import threading
+
+from src.intelligence import component_scanner
+from src.intelligence.component_scanner import walk_components
+from src.intelligence.metadata_extractor import MetadataExtractor
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+
+
+def test_walk_components_pairs_stories_per_directory():
+    """Test that components are paired with the stories beside them"""
+    with tempfile.TemporaryDirectory() as root:
+        for name in [
+            "Button.tsx",
+            "Button.stories.tsx",
+            "Button.test.tsx",
+            os.path.join("forms", "Input.jsx"),
+            os.path.join("forms", "Input.stories.ts"),
+            os.path.join("other", "Button.stories.tsx"),
+        ]:
+            _touch(os.path.join(root, name))
+        
+        pairs = {
+            os.path.relpath(component, root): story and os.path.relpath(story, root)
+            for component, story in walk_components(root)
+        }
+        without_stories = dict(walk_components(root, include_storybooks=False))
+    
+    assert pairs == {
+        "Button.tsx": "Button.stories.tsx",
+        os.path.join("forms", "Input.jsx"): os.path.join("forms", "Input.stories.ts"),
+    }
+    assert list(without_stories.values()) == [None, None]
+
+
+class RecordingPipeline:
+    """Pipeline stub that records each indexed batch and the thread indexing it"""
+    
+    def __init__(self):
+        self.batches = []
+    
+    def add_components_batch(self, components, upsert=False):
+        self.batches.append(([c.name for c in components], threading.current_thread().name))
+        return [(c, c.name != "Broken", None if c.name != "Broken" else "Failed") for c in components]
+
+
+def test_scan_folder_indexes_batches_on_indexing_thread(monkeypatch, tmp_path):
+    """Test that scanned components are indexed in bounded batches off the scanning thread"""
+    pipeline = RecordingPipeline()
+    extractor = MetadataExtractor(cache_path=str(tmp_path / "cache.json"))
+    monkeypatch.setattr(component_scanner, "get_rag_pipeline", lambda: pipeline)
+    monkeypatch.setattr(component_scanner, "get_metadata_extractor", lambda: extractor)
+    monkeypatch.setattr(component_scanner, "INDEX_BATCH_SIZE", 2)
+    monkeypatch.setattr(component_scanner, "INDEX_MIN_BATCH_SIZE", 2)
+    
+    with tempfile.TemporaryDirectory() as root:
+        for name in ["Alert", "Badge", "Broken", "Card", "Dialog"]:
+            with open(os.path.join(root, f"{name}.tsx"), "w") as f:
+                f.write(f"export const {name} = () => null;\n")
+        
+        result = component_scanner.ComponentScanner().scan_folder(root)
+    
+    indexed = [name for names, _ in pipeline.batches for name in names]
+    assert sorted(indexed) == ["Alert", "Badge", "Broken", "Card", "Dialog"]
+    assert all(len(names) <= 2 for names, _ in pipeline.batches)
+    assert any(thread.startswith("scan-index") for _, thread in pipeline.batches)
+    assert result["components_found"] == 4
+    assert result["errors"] == ["Failed"]
+
+
+def test_rescan_after_scan_reextracts_reverted_file(monkeypatch, tmp_path):
+    """Test that a rescan does not trust a hash recorded before a scan re-extracted the file"""
+    pipeline = RecordingPipeline()
+    added = []
+    pipeline.add_component = lambda component, upsert=False: added.append(component) or True
+    extractor = MetadataExtractor(cache_path=str(tmp_path / "cache.json"))
+    monkeypatch.setattr(component_scanner, "get_rag_pipeline", lambda: pipeline)
+    monkeypatch.setattr(component_scanner, "get_metadata_extractor", lambda: extractor)
+    
+    root = tmp_path / "components"
+    root.mkdir()
+    file_path = str(root / "Button.tsx")
+    version_a = "interface ButtonProps { label: string }\nexport const Button = (props: ButtonProps) => null;\n"
+    version_b = "interface ButtonProps { label: string; size: string }\nexport const Button = (props: ButtonProps) => null;\n"
+    
+    def write(content, mtime):
+        with open(file_path, "w") as f:
+            f.write(content)
+        os.utime(file_path, (mtime, mtime))
+    
+    scanner = component_scanner.ComponentScanner()
+    scanner.file_hashes_path = str(tmp_path / "hashes.json")
+    
+    write(version_a, 1_000_000)
+    assert [p.name for p in scanner.rescan_component(file_path).props] == ["label"]
+    
+    write(version_b, 1_000_100)
+    scanner.scan_folder(str(root))
+    
+    write(version_a, 1_000_200)
+    component = scanner.rescan_component(file_path)
+    
+    assert [p.name for p in component.props] == ["label"]
+    assert len(added) == 2
@@ -1,5 +1,10 @@
+from concurrent.futures import Future
+import numpy as np
 import pytest
+import torch
+from src.rag import embeddings as embeddings_module
 from src.rag.embeddings import EmbeddingService
+from src.rag.vector_math import cosine
 
 
 @pytest.fixture
@@ -33,6 +38,13 @@ def test_encode_multiple_texts(embedding_service):
     assert all(len(emb) == embedding_service.get_dimension() for emb in embeddings)
 
 
+def test_embeddings_are_normalized(embedding_service):
+    """Test that embeddings have unit length"""
+    embeddings = embedding_service.encode(["Button", "A much longer description of a data table"])
+    
+    assert np.linalg.norm(embeddings, axis=1) == pytest.approx([1.0, 1.0], abs=1e-5)
+
+
 def test_embedding_similarity(embedding_service):
     """Test that similar texts have similar embeddings"""
     text1 = "Button component"
@@ -43,17 +55,135 @@ def test_embedding_similarity(embedding_service):
     emb2 = embedding_service.encode(text2)
     emb3 = embedding_service.encode(text3)
     
-    # Calculate cosine similarity
-    def cosine_similarity(a, b):
-        import math
-        dot_product = sum(x * y for x, y in zip(a, b))
-        magnitude_a = math.sqrt(sum(x * x for x in a))
-        magnitude_b = math.sqrt(sum(y * y for y in b))
-        return dot_product / (magnitude_a * magnitude_b)
-    
-    sim_1_2 = cosine_similarity(emb1, emb2)
-    sim_1_3 = cosine_similarity(emb1, emb3)
+    sim_1_2 = cosine(emb1, emb2)
+    sim_1_3 = cosine(emb1, emb3)
     
     # Similar texts should have higher similarity
     assert sim_1_2 > sim_1_3
 
+
+
+class CountingModel:
+    """Model stub that records the texts it is asked to encode"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def encode(self, text, batch_size=32, convert_to_numpy=True, show_progress_bar=None,
+               normalize_embeddings=False):
+        self.calls.append(text)
+        texts = [text] if isinstance(text, str) else text
+        embeddings = np.array([[float(len(t)), 1.0] for t in texts])
+        return embeddings[0] if isinstance(text, str) else embeddings
+    
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+
+def test_encode_caches_query_embeddings(monkeypatch):
+    """Test that cached queries skip the model and only misses are encoded"""
+    model = CountingModel()
+    monkeypatch.setattr(EmbeddingService, "_load_model", lambda self: setattr(self, "model", model))
+    service = EmbeddingService()
+    
+    assert service.encode("button", use_cache=True) == [6.0, 1.0]
+    assert service.encode(["button", "card", "card"], use_cache=True) == [
+        [6.0, 1.0], [4.0, 1.0], [4.0, 1.0]
+    ]
+    assert service.encode("button", use_cache=True) == [6.0, 1.0]
+    service.encode("button")
+    
+    assert model.calls == [["button"], ["card"], "button"]
+
+
+class DeviceModel(CountingModel):
+    """Model stub on a given device that records conversion to fp16"""
+    
+    def __init__(self, device):
+        super().__init__()
+        self.device = torch.device(device)
+        self.halved = False
+    
+    def half(self):
+        self.halved = True
+
+
+def test_half_precision_only_on_cuda(monkeypatch):
+    """Test that fp16 converts the model on CUDA and leaves a CPU model in fp32"""
+    monkeypatch.setattr(EmbeddingService, "_load_model", lambda self: None)
+    service = EmbeddingService()
+    
+    service.model = DeviceModel("cpu")
+    service._set_precision("fp16")
+    assert service.model.halved is False
+    
+    service.model = DeviceModel("cuda")
+    service._set_precision("fp16")
+    assert service.model.halved is True
+    
+    service.model = DeviceModel("cuda")
+    service._set_precision("bf16")
+    assert service.model.halved is False
+    assert service._autocast_dtype is torch.bfloat16
+
+
+def test_encode_returns_numpy(monkeypatch):
+    """Test that return_numpy hands back arrays, with cached rows read-only"""
+    model = CountingModel()
+    monkeypatch.setattr(EmbeddingService, "_load_model", lambda self: setattr(self, "model", model))
+    service = EmbeddingService()
+    
+    embeddings = service.encode(["button", "card"], use_cache=True, return_numpy=True)
+    assert isinstance(embeddings, np.ndarray)
+    assert embeddings.tolist() == [[6.0, 1.0], [4.0, 1.0]]
+    
+    embedding = service.encode("card", use_cache=True, return_numpy=True)
+    assert embedding.tolist() == [4.0, 1.0]
+    assert not embedding.flags.writeable
+    assert isinstance(service.encode("card", return_numpy=True), np.ndarray)
+
+
+def test_warmup_runs_one_uncached_batch(monkeypatch):
+    """Test that warmup encodes a batch through the model without caching it"""
+    model = CountingModel()
+    monkeypatch.setattr(EmbeddingService, "_load_model", lambda self: setattr(self, "model", model))
+    service = EmbeddingService()
+    
+    service.warmup()
+    
+    assert len(model.calls) == 1
+    assert len(model.calls[0]) > 1
+    assert len(service._query_cache) == 0
+
+
+class InlineExecutor:
+    """Executor stub that runs each call as it is submitted"""
+    
+    def __init__(self, **kwargs):
+        self.submitted = []
+    
+    def submit(self, fn, *args, **kwargs):
+        self.submitted.append(args[0])
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def test_encode_processes_run_the_model_in_workers(monkeypatch):
+    """Test that with encode_processes the service process loads no model"""
+    model = CountingModel()
+    monkeypatch.setattr(EmbeddingService, "_load_model", lambda self: setattr(self, "model", model))
+    monkeypatch.setattr(embeddings_module, "_worker_service", EmbeddingService(encode_processes=0))
+    monkeypatch.setattr(embeddings_module, "ProcessPoolExecutor", InlineExecutor)
+    
+    service = EmbeddingService(encode_processes=2)
+    
+    assert service.model is None
+    assert service.get_dimension() == 2
+    assert service.encode(["button", "card"]) == [[6.0, 1.0], [4.0, 1.0]]
+    assert service.encode("card", use_cache=True) == [4.0, 1.0]
+    assert service.encode("card", use_cache=True) == [4.0, 1.0]
+    assert model.calls == [["button", "card"], ["card"]]
+    
+    service.warmup()
+    assert service._encode_pool.submitted == ["get_dimension", "encode", "encode", "warmup", "warmup"]
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from src.db.exact_index import ExactIndex
+
+
+@pytest.fixture
+def index():
+    index = ExactIndex()
+    index.add(
+        ["right", "up", "diagonal"],
+        ["Right", "Up", "Diagonal"],
+        [[1.0, 0.0], [0.0, 2.0], [1.0, 1.0]],
+        [{"category": "Actions"}, {"category": "Forms"}, None]
+    )
+    return index
+
+
+def test_search_ranks_by_cosine_similarity(index):
+    """Test that each query gets its nearest components, best first"""
+    results = index.search([[1.0, 0.0], [0.0, 1.0]], limit=2)
+    
+    assert results["ids"] == [["right", "diagonal"], ["up", "diagonal"]]
+    assert results["documents"][0] == ["Right", "Diagonal"]
+    assert results["scores"][0] == pytest.approx([1.0, 0.5 ** 0.5])
+    assert results["distances"][0] == pytest.approx([0.0, 1 - 0.5 ** 0.5])
+    assert index.search([[1.0, 0.0]], limit=10)["ids"] == [["right", "diagonal", "up"]]
+
+
+def test_search_filters_on_metadata(index):
+    """Test that filters keep components whose field takes one of the given values"""
+    assert index.search([[1.0, 0.0]], limit=5, filters={"category": ["Forms"]})["ids"] == [["up"]]
+    assert index.search([[1.0, 0.0]], limit=5, filters={"category": ["Missing"]})["ids"] == [[]]
+
+
+def test_writes_follow_chroma_semantics(index):
+    """Test that add keeps, update replaces and upsert does both, like ChromaDB"""
+    index.add(["right"], ["Ignored"], [[0.0, 1.0]], [{}])
+    index.update(["up", "unknown"], ["Up v2", "Unknown"], [[1.0, 0.0], [1.0, 0.0]], [{}, {}])
+    index.upsert(["new"], ["New"], [[-1.0, 0.0]], [{}])
+    index.delete(["diagonal", "missing"])
+    
+    results = index.search([[1.0, 0.0]], limit=10)
+    
+    assert len(index) == 3
+    assert results["ids"] == [["right", "up", "new"]]
+    assert results["documents"] == [["Right", "Up v2", "New"]]
+
+
+def test_search_empty_index():
+    """Test that an empty index answers each query with no results"""
+    assert ExactIndex().search([[1.0, 0.0], [0.0, 1.0]], limit=3)["ids"] == [[], []]
+
+
+def test_quantized_index_keeps_ranking():
+    """Test that an int8 index ranks like the float32 one, with close scores"""
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(50, 16)).astype(np.float32)
+    ids = [str(i) for i in range(50)]
+    queries = rng.normal(size=(3, 16)).astype(np.float32)
+    
+    exact = ExactIndex()
+    quantized = ExactIndex(quantize=True)
+    for index in (exact, quantized):
+        index.add(ids, ids, embeddings, [{}] * 50)
+    quantized.update(["0"], ["0"], embeddings[:1] * 2, [{}])
+    quantized.delete(["1"])
+    exact.delete(["1"])
+    
+    expected = exact.search(queries, limit=3)
+    results = quantized.search(queries, limit=3)
+    
+    assert quantized._matrix.dtype == np.int8
+    assert results["ids"] == expected["ids"]
+    for row, expected_scores in zip(results["scores"], expected["scores"]):
+        assert row == pytest.approx(expected_scores, abs=0.02)
@@ -0,0 +1,71 @@
+import mmap
+import os
+import tempfile
+
+from src.intelligence.fs import MMAP_MIN_SIZE, iter_dirs, iter_files, open_source, read_many
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+
+
+def test_iter_files_skips_ignored_directories():
+    """Test that the walk finds nested files and skips node_modules"""
+    with tempfile.TemporaryDirectory() as root:
+        _touch(os.path.join(root, "Button.tsx"))
+        _touch(os.path.join(root, "forms", "Input.tsx"))
+        _touch(os.path.join(root, "node_modules", "lib", "Skip.tsx"))
+        
+        names = sorted(entry.name for entry in iter_files(root))
+        top_level = sorted(entry.name for entry in iter_files(root, recursive=False))
+    
+    assert names == ["Button.tsx", "Input.tsx"]
+    assert top_level == ["Button.tsx"]
+
+
+def test_iter_dirs_groups_files_by_directory():
+    """Test that each directory is yielded once with its own files"""
+    with tempfile.TemporaryDirectory() as root:
+        _touch(os.path.join(root, "Button.tsx"))
+        _touch(os.path.join(root, "forms", "Input.tsx"))
+        _touch(os.path.join(root, "forms", "Input.stories.tsx"))
+        
+        listing = {
+            os.path.relpath(path, root): sorted(entry.name for entry in files)
+            for path, files in iter_dirs(root)
+        }
+    
+    assert listing == {".": ["Button.tsx"], "forms": ["Input.stories.tsx", "Input.tsx"]}
+
+
+def test_open_source_maps_large_files():
+    """Test that small files are read and large files are memory-mapped"""
+    with tempfile.TemporaryDirectory() as root:
+        small = os.path.join(root, "Small.tsx")
+        large = os.path.join(root, "Large.tsx")
+        with open(small, "wb") as f:
+            f.write(b"export default Small")
+        with open(large, "wb") as f:
+            f.write(b"x" * MMAP_MIN_SIZE + b"export default Large")
+        
+        with open_source(small) as content:
+            assert isinstance(content, bytes)
+        with open_source(large) as content:
+            assert isinstance(content, mmap.mmap)
+            assert content.find(b"export default Large") == MMAP_MIN_SIZE
+
+
+def test_read_many_skips_unreadable_files():
+    """Test that files are read concurrently and missing ones are left out"""
+    with tempfile.TemporaryDirectory() as root:
+        paths = [os.path.join(root, f"Comp{i}.tsx") for i in range(5)]
+        for i, path in enumerate(paths):
+            with open(path, "wb") as f:
+                f.write(b"export default %d" % i)
+        missing = os.path.join(root, "Missing.tsx")
+        
+        contents = read_many(paths + [missing, paths[0]])
+    
+    assert sorted(contents) == sorted(paths)
+    assert contents[paths[3]] == b"export default 3"
@@ -0,0 +1,29 @@
+import os
+import uuid
+
+from src.util.ids import path_id, uuid7
+
+
+def test_uuid7_version_and_variant():
+    """Test that generated ids are RFC 9562 version 7 UUIDs"""
+    value = uuid7()
+    
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+
+def test_uuid7_is_monotonic():
+    """Test that ids generated in a burst sort in generation order"""
+    ids = [uuid7() for _ in range(5000)]
+    
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_path_id_is_stable_per_file():
+    """Test that path ids depend only on the file's absolute path"""
+    relative = os.path.join("components", "Button.tsx")
+    
+    assert path_id(relative) == path_id(os.path.abspath(relative))
+    assert path_id(relative) != path_id(os.path.join("components", "Card.tsx"))
+    assert len(path_id(relative)) == 32
@@ -0,0 +1,157 @@
+import os
+import tempfile
+
+from src.intelligence.metadata_extractor import MetadataExtractor
+from src.intelligence.models import ComponentMeta, ExampleMeta, PropMeta
+
+
+CARD = """interface CardProps {
+  title: string;
+}
+export default function Card(props: CardProps) {
+  return <div>{props.children}</div>;
+}
+"""
+
+
+def test_extract_from_file_reuses_unchanged_files():
+    """Test that unchanged files are served from the extraction cache, across instances"""
+    with tempfile.TemporaryDirectory() as root:
+        file_path = os.path.join(root, "Card.tsx")
+        with open(file_path, "w") as f:
+            f.write(CARD)
+        cache_path = os.path.join(root, "cache", ".component-cache.json")
+        
+        extractor = MetadataExtractor(cache_path=cache_path)
+        first = extractor.extract_from_file(file_path)
+        assert extractor.extract_from_file(file_path).id == first.id
+        
+        extractor.save_cache()
+        reloaded = MetadataExtractor(cache_path=cache_path)
+        assert reloaded.extract_from_file(file_path) == first
+        
+        with open(file_path, "w") as f:
+            f.write(CARD.replace("title", "subtitle"))
+        changed = reloaded.extract_from_file(file_path)
+        assert changed.id == first.id
+        assert [p.name for p in changed.props] == ["subtitle"]
+
+
+def test_component_meta_round_trip():
+    """Test converting scanned components to dicts and back"""
+    component = ComponentMeta(
+        id="c1",
+        name="Button",
+        description="A button",
+        file_path="/ui/Button.tsx",
+        props=[PropMeta(name="label", type="string", required=True)],
+        examples=[ExampleMeta(title="Primary", code="export const Primary = {}")],
+    )
+    
+    data = component.to_dict()
+    
+    assert data["props"][0]["name"] == "label"
+    assert ComponentMeta.from_dict(data) == component
+
+
+def test_infer_category_prefers_earlier_categories():
+    """Test that category keywords keep their priority regardless of position"""
+    extractor = MetadataExtractor()
+    
+    assert extractor._infer_category({"name": "IconButton"}) == "Actions"
+    assert extractor._infer_category({"name": "TextInput"}) == "Forms"
+    assert extractor._infer_category({"name": "NavCard"}) == "Layout"
+    assert extractor._infer_category({"name": "Tabs"}) == "Navigation"
+    assert extractor._infer_category({"name": "Spinner"}) == "General"
+
+
+def test_generate_tags_from_name():
+    """Test that name keywords add their tags in a fixed order"""
+    extractor = MetadataExtractor()
+    
+    assert extractor._generate_tags({"name": "FormButton"}) == ["interactive", "form"]
+    assert extractor._generate_tags({"name": "InputContainer", "has_children": True}) == [
+        "container", "form", "layout"
+    ]
+    assert extractor._generate_tags({"name": "Spinner"}) == []
+
+
+def test_extract_many_reads_components_and_stories():
+    """Test batch extraction with stories, missing files and cache updates"""
+    with tempfile.TemporaryDirectory() as root:
+        card = os.path.join(root, "Card.tsx")
+        story = os.path.join(root, "Card.stories.tsx")
+        missing = os.path.join(root, "Missing.tsx")
+        with open(card, "w") as f:
+            f.write(CARD)
+        with open(story, "w") as f:
+            f.write("export default { title: 'Layout/Card' };\nexport const Basic = { args: { title: 'Hi' } };\n")
+        
+        extractor = MetadataExtractor()
+        (component, error), (absent, _) = extractor.extract_many([(card, story), (missing, None)])
+        
+        assert error is None
+        assert component.name == "Card"
+        assert [example.title for example in component.examples] == ["Basic"]
+        assert absent is None
+        assert extractor.lookup(card, story)[1] == component
+
+
+class ServerParser:
+    """AST parser stub whose server reads component files itself"""
+    
+    def __init__(self):
+        self.started = False
+    
+    def start(self):
+        self.started = True
+        return True
+    
+    def parse_files(self, file_paths, contents):
+        assert self.started
+        assert not set(file_paths) & set(contents)
+        return [{"name": "Card", "props": [], "export_type": "default"} for _ in file_paths]
+
+
+def test_extract_many_leaves_component_files_to_parser_server(monkeypatch):
+    """Test that the parser server is started before deciding which files to read"""
+    from src.intelligence import metadata_extractor
+    with tempfile.TemporaryDirectory() as root:
+        file_path = os.path.join(root, "Card.tsx")
+        with open(file_path, "w") as f:
+            f.write(CARD)
+        
+        read = []
+        read_many = metadata_extractor.read_many
+        monkeypatch.setattr(metadata_extractor, "read_many", lambda paths: read.extend(paths) or read_many(paths))
+        extractor = MetadataExtractor()
+        extractor.ast_parser = ServerParser()
+        
+        [(component, error)] = extractor.extract_many([(file_path, None)])
+    
+    assert error is None
+    assert component.name == "Card"
+    assert read == []
+
+
+def test_component_meta_interns_vocabulary():
+    """Test that repeated vocabulary strings share one object across components"""
+    def load(i):
+        return ComponentMeta.from_dict({
+            "id": f"c{i}",
+            "name": f"Comp{i}",
+            "description": "",
+            "file_path": f"/ui/Comp{i}.tsx",
+            "props": [{"name": "".join(["on", "Click"]), "type": "".join(["str", "ing"]), "required": True}],
+            "category": "".join(["Ac", "tions"]),
+            "tags": ["".join(["inter", "active"])],
+            "export_type": "".join(["def", "ault"]),
+        })
+    
+    first, second = load(1), load(2)
+    
+    assert first.category is second.category
+    assert first.tags[0] is second.tags[0]
+    assert first.export_type is second.export_type
+    assert first.props[0].type is second.props[0].type
+    assert first.props[0].name is second.props[0].name
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from src.rag.onnx_encoder import OnnxEncoder, mean_pool
+
+
+def test_mean_pool_ignores_padding():
+    """Test that padding tokens are left out of the average"""
+    token_embeddings = np.array([
+        [[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]],
+        [[5.0, 5.0], [100.0, 100.0], [100.0, 100.0]],
+    ])
+    attention_mask = np.array([[1, 1, 0], [1, 0, 0]])
+    
+    assert mean_pool(token_embeddings, attention_mask).tolist() == [[2.0, 3.0], [5.0, 5.0]]
+
+
+class WordTokenizer:
+    """Tokenizer stub with one token per word, each token id being the word length"""
+    
+    def __call__(self, texts, padding, truncation, max_length, return_tensors):
+        ids = [[len(word) for word in text.split()] for text in texts]
+        width = max(len(row) for row in ids)
+        return {
+            "input_ids": np.array([row + [0] * (width - len(row)) for row in ids]),
+            "attention_mask": np.array([[1] * len(row) + [0] * (width - len(row)) for row in ids]),
+        }
+
+
+class IdentitySession:
+    """Session stub whose token embedding is [token id, 1]"""
+    
+    def __init__(self):
+        self.batches = []
+    
+    def run(self, outputs, inputs):
+        self.batches.append(inputs["input_ids"].shape)
+        ids = inputs["input_ids"].astype(np.float32)
+        return [np.stack([ids, np.ones_like(ids)], axis=-1)]
+
+
+def test_encode_batches_by_length_and_keeps_order():
+    """Test that texts are batched longest first and returned in input order"""
+    encoder = OnnxEncoder.__new__(OnnxEncoder)
+    encoder.tokenizer = WordTokenizer()
+    encoder.session = IdentitySession()
+    encoder.max_seq_length = 16
+    encoder._input_names = {"input_ids", "attention_mask"}
+    encoder._dimension = 2
+    
+    embeddings = encoder.encode(["ab", "abcd abcd abcd", "a", "abc abc"], batch_size=2)
+    
+    assert embeddings.tolist() == [[2.0, 1.0], [4.0, 1.0], [1.0, 1.0], [3.0, 1.0]]
+    assert encoder.session.batches == [(2, 3), (2, 1)]
+    assert encoder.encode("abc abc", normalize_embeddings=True) == pytest.approx(
+        [3 / np.sqrt(10), 1 / np.sqrt(10)]
+    )
@@ -0,0 +1,40 @@
+from src.rag.pipeline import RAGPipeline
+
+
+class StoredVectors:
+    """Vector store stub holding one stored document and embedding per component"""
+    
+    def __init__(self, stored):
+        self.stored = stored
+    
+    def get_documents_and_embeddings(self, component_ids):
+        return {i: self.stored[i] for i in component_ids if i in self.stored}
+
+
+class CountingEncoder:
+    """Embedding service stub that records the documents it embeds"""
+    
+    def __init__(self):
+        self.encoded = []
+    
+    def encode(self, documents):
+        self.encoded.extend(documents)
+        return [[float(len(document))] for document in documents]
+
+
+def test_embed_reuses_embeddings_of_unchanged_documents():
+    """Test that re-indexed components with the same document text are not re-embedded"""
+    pipeline = RAGPipeline.__new__(RAGPipeline)
+    pipeline.vector_store = StoredVectors({
+        "same": ("Component: Button", [0.5]),
+        "edited": ("Component: Card", [0.7]),
+    })
+    pipeline.embedding_service = CountingEncoder()
+    
+    embeddings = pipeline._embed(
+        ["same", "edited", "new"],
+        ["Component: Button", "Component: Card v2", "Component: Modal"]
+    )
+    
+    assert embeddings == [[0.5], [18.0], [16.0]]
+    assert pipeline.embedding_service.encoded == ["Component: Card v2", "Component: Modal"]
@@ -0,0 +1,103 @@
+import dataclasses
+
+import pytest
+
+from src.config.settings import get_settings
+from src.rag.retriever import Retriever, SimilarityCache
+
+
+def test_similarity_cache_matches_near_duplicate_queries():
+    """Test that close embeddings with the same limit and filters share results"""
+    cache = SimilarityCache(size=4, threshold=0.97)
+    key = cache.key(5, {"category": "Actions"})
+    cache.put(key, [1.0, 0.0, 0.0], [{"id": "button"}])
+    
+    assert cache.get(key, [2.0, 0.1, 0.0]) == [{"id": "button"}]
+    assert cache.get(key, [0.0, 1.0, 0.0]) is None
+    assert cache.get(cache.key(10, {"category": "Actions"}), [1.0, 0.0, 0.0]) is None
+    
+    cache.clear()
+    assert cache.get(key, [1.0, 0.0, 0.0]) is None
+
+
+def test_similarity_cache_evicts_oldest_entries():
+    """Test first-in, first-out eviction once the cache is full"""
+    cache = SimilarityCache(size=2, threshold=0.99)
+    key = cache.key(5, None)
+    for i, vector in enumerate([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]):
+        cache.put(key, vector, [{"id": str(i)}])
+    
+    assert cache.get(key, [1.0, 0.0, 0.0]) is None
+    assert cache.get(key, [0.0, 1.0, 0.0]) == [{"id": "1"}]
+    assert cache.get(key, [0.0, 0.0, 1.0]) == [{"id": "2"}]
+
+
+def test_similarity_cache_drops_results_from_before_a_clear():
+    """Test that results searched before a write are not cached after it"""
+    cache = SimilarityCache(size=4, threshold=0.99)
+    key = cache.key(5, None)
+    generation = cache.generation
+    
+    cache.clear()
+    cache.put(key, [1.0, 0.0, 0.0], [{"id": "stale"}], generation)
+    assert cache.get(key, [1.0, 0.0, 0.0]) is None
+    
+    cache.put(key, [1.0, 0.0, 0.0], [{"id": "fresh"}], cache.generation)
+    assert cache.get(key, [1.0, 0.0, 0.0]) == [{"id": "fresh"}]
+
+
+def test_similarity_cache_expires_entries(monkeypatch):
+    """Test that entries are no longer served after the TTL"""
+    from src.rag import retriever
+    now = [1000.0]
+    monkeypatch.setattr(retriever.time, "monotonic", lambda: now[0])
+    cache = SimilarityCache(size=4, threshold=0.99, ttl=10.0)
+    key = cache.key(5, None)
+    cache.put(key, [1.0, 0.0, 0.0], [{"id": "old"}])
+    now[0] += 5
+    cache.put(key, [0.0, 1.0, 0.0], [{"id": "new"}])
+    
+    now[0] += 6
+    assert cache.get(key, [1.0, 0.0, 0.0]) is None
+    assert cache.get(key, [0.0, 1.0, 0.0]) == [{"id": "new"}]
+    
+    now[0] += 5
+    assert cache.get(key, [0.0, 1.0, 0.0]) is None
+
+
+def test_format_results_zips_columns():
+    """Test that one row of a columnar vector store result becomes a result per component"""
+    results = {
+        "ids": [["a", "b"], []],
+        "metadatas": [[{"name": "A"}, {"name": "B"}], []],
+        "documents": [["Doc A", "Doc B"], []],
+        "distances": [[0.1, 0.4], []],
+        "scores": [[0.9, 0.6], []],
+    }
+    retriever = Retriever.__new__(Retriever)
+    
+    assert retriever._format_results(results, 0) == [
+        {"id": "a", "metadata": {"name": "A"}, "document": "Doc A", "distance": 0.1, "score": 0.9},
+        {"id": "b", "metadata": {"name": "B"}, "document": "Doc B", "distance": 0.4, "score": 0.6},
+    ]
+    assert retriever._format_results(results, 1) == []
+    assert retriever._format_results(results, 2) == []
+
+
+def test_rerank_favours_components_with_examples():
+    """Test that weighted example counts reorder a page of results"""
+    retriever = Retriever.__new__(Retriever)
+    retriever.settings = dataclasses.replace(get_settings(), search_example_weight=0.2)
+    formatted = [
+        {"id": "bare", "metadata": {"num_examples": 0}, "score": 0.8},
+        {"id": "documented", "metadata": {"num_examples": 3}, "score": 0.7},
+        {"id": "unknown", "metadata": None, "score": 0.1},
+    ]
+    
+    reranked = retriever._rerank(formatted)
+    
+    assert [r["id"] for r in reranked] == ["documented", "bare", "unknown"]
+    assert reranked[0]["score"] == pytest.approx(0.85)
+    
+    retriever.settings = dataclasses.replace(retriever.settings, search_example_weight=0.0)
+    assert retriever._rerank(formatted) is formatted
@@ -0,0 +1,59 @@
+from src.intelligence.storybook_parser import StorybookParser, storybook_stem
+
+
+STORIES = b"""
+import { Button } from './Button';
+
+export default {
+  title: 'Actions/Button',
+  component: Button,
+};
+
+export const Primary = {
+  args: {
+    label: 'Save',
+    variant: 'primary',
+  },
+};
+
+const Template = (args) => <Button {...args} />;
+export const Legacy = Template.bind({});
+"""
+
+
+def test_extract_title():
+    """Test reading the title from the default export"""
+    assert StorybookParser()._extract_title(STORIES) == "Actions/Button"
+
+
+def test_extract_stories():
+    """Test extracting object stories with nested args and Template.bind stories"""
+    stories = StorybookParser()._extract_stories(STORIES)
+    
+    assert [story["name"] for story in stories] == ["Primary", "Legacy"]
+    assert stories[0]["args"] == {"label": "'Save'", "variant": "'primary'"}
+    assert stories[0]["code"].endswith("},\n}")
+    assert stories[1]["args"] == {}
+
+
+def test_extract_args_ignores_braces_in_strings_and_comments():
+    """Test that nested objects, strings and comments do not split args"""
+    args = StorybookParser()._extract_args(
+        b"args: { label: 'a, } b', // note: }\n style: { color: 'red' } }"
+    )
+    
+    assert args == {"label": "'a, } b'", "style": "{ color: 'red' }"}
+
+
+def test_extract_args():
+    """Test reading key/value pairs from a story's args"""
+    args = StorybookParser()._extract_args(b"args: { label: 'Save', disabled: true }")
+    
+    assert args == {"label": "'Save'", "disabled": "true"}
+
+
+def test_storybook_stem():
+    """Test stripping the stories suffix from Storybook paths"""
+    assert storybook_stem("/ui/Button.stories.tsx") == "/ui/Button"
+    assert storybook_stem("Card.stories.ts") == "Card"
+    assert storybook_stem("my.stories.tsx.bak") == "my.stories.tsx.bak"
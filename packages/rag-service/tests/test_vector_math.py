@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from src.rag.vector_math import normalize, cosine, cosine_batch, rerank
+
+
+def test_normalize():
+    """Test that vectors and matrix rows are scaled to unit length"""
+    assert normalize([3.0, 4.0]).tolist() == pytest.approx([0.6, 0.8])
+    assert normalize([0.0, 0.0]).tolist() == [0.0, 0.0]
+    assert np.linalg.norm(normalize([[1.0, 1.0], [0.0, 2.0]]), axis=1) == pytest.approx([1.0, 1.0])
+
+
+def test_cosine():
+    """Test cosine similarity of one vector and of each matrix row"""
+    assert cosine([1.0, 0.0], [2.0, 0.0]) == pytest.approx(1.0)
+    assert cosine([1.0, 0.0], [0.0, 3.0]) == pytest.approx(0.0)
+    assert cosine_batch([[2.0, 0.0], [0.0, 1.0], [1.0, 1.0]], [1.0, 0.0]).tolist() == pytest.approx(
+        [1.0, 0.0, np.sqrt(0.5)]
+    )
+
+
+def test_rerank():
+    """Test that weighted signals reorder results, keeping ties in order"""
+    order, scores = rerank([0.9, 0.8, 0.7, 0.7], [0.0, 1.0, 0.0, 0.0], weight=0.2)
+    
+    assert order.tolist() == [1, 0, 2, 3]
+    assert scores.tolist() == pytest.approx([1.0, 0.9, 0.7, 0.7])
@@ -1,5 +1,7 @@
 import pytest
+import numpy as np
 from src.db.vector_store import VectorStore
+import dataclasses
 import tempfile
 import shutil
 
@@ -11,7 +13,7 @@ def vector_store():
     
     # Create vector store with temp directory
     store = VectorStore()
-    store.settings.chroma_persist_directory = temp_dir
+    store.settings = dataclasses.replace(store.settings, chroma_persist_directory=temp_dir)
     store._initialize()
     
     yield store
@@ -134,3 +136,204 @@ def test_health_check(vector_store):
     """Test health check"""
     assert vector_store.health_check() is True
 
+
+
+def test_add_components_batch(vector_store):
+    """Test adding several components in one call"""
+    ids = ["batch-1", "batch-2", "batch-3"]
+    
+    success = vector_store.add_components(
+        ids=ids,
+        documents=["First", "Second", "Third"],
+        embeddings=[[0.1] * 384, [0.2] * 384, [0.3] * 384],
+        metadatas=[{"name": "First"}, {"name": "Second"}, {"name": "Third"}]
+    )
+    
+    assert success is True
+    assert vector_store.get_component("batch-2")["metadata"]["name"] == "Second"
+    
+    success = vector_store.update_components(
+        ids=ids[:2],
+        documents=["First v2", "Second v2"],
+        embeddings=[[0.4] * 384, [0.5] * 384],
+        metadatas=[{"name": "FirstV2"}, {"name": "SecondV2"}]
+    )
+    
+    assert success is True
+    assert vector_store.get_component("batch-1")["metadata"]["name"] == "FirstV2"
+    
+    assert vector_store.delete_components(ids) is True
+    assert all(vector_store.get_component(i) is None for i in ids)
+
+
+def test_search_with_category_filters(vector_store):
+    """Test filtering search by one or several categories"""
+    components = [
+        ("filter-1", "Primary button", {"name": "Button", "category": "Actions"}),
+        ("filter-2", "Text input", {"name": "Input", "category": "Forms"}),
+        ("filter-3", "Modal dialog", {"name": "Modal", "category": "Overlays"}),
+    ]
+    
+    for comp_id, doc, meta in components:
+        vector_store.add_component(comp_id, doc, [0.1] * 384, meta)
+    
+    results = vector_store.search([0.1] * 384, limit=10, filters={"category": "Forms"})
+    assert results["ids"][0] == ["filter-2"]
+    
+    results = vector_store.search(
+        [0.1] * 384,
+        limit=10,
+        filters={"category": ["Actions", "Overlays"]}
+    )
+    assert sorted(results["ids"][0]) == ["filter-1", "filter-3"]
+
+
+def test_search_returns_similarity_scores(vector_store):
+    """Test that search converts distances to similarity scores"""
+    vector_store.add_component("score-1", "Button", [0.1] * 384, {"name": "Button"})
+    
+    results = vector_store.search([0.1] * 384, limit=1)
+    
+    assert len(results["scores"][0]) == len(results["distances"][0])
+    assert results["scores"][0][0] == pytest.approx(1 - results["distances"][0][0])
+
+
+def test_get_content_hash(vector_store):
+    """Test reading a component's stored content hash"""
+    vector_store.add_component(
+        component_id="hashed",
+        document="Hashed component",
+        embedding=[0.1] * 384,
+        metadata={"name": "Hashed", "content_hash": "abc123"}
+    )
+    
+    assert vector_store.get_content_hash("hashed") == "abc123"
+    assert vector_store.get_content_hash("missing") is None
+
+
+def test_build_where_clause(vector_store):
+    """Test that filters are limited to known fields and combined with $and"""
+    assert vector_store._build_where_clause({"unknown": "x"}) is None
+    assert vector_store._build_where_clause({"export_type": "default"}) == {"export_type": "default"}
+    assert vector_store._build_where_clause(
+        {"category": ["Actions", "Forms"], "import_path": "ui/Button", "unknown": "x"}
+    ) == {
+        "$and": [
+            {"category": {"$in": ["Actions", "Forms"]}},
+            {"import_path": "ui/Button"},
+        ]
+    }
+
+
+def test_upsert_components(vector_store):
+    """Test that upserting adds new components and replaces stored ones"""
+    vector_store.add_component("upsert-1", "Old", [0.1] * 384, {"name": "Old", "content_hash": "a"})
+    
+    success = vector_store.upsert_components(
+        ids=["upsert-1", "upsert-2"],
+        documents=["New", "Added"],
+        embeddings=[[0.2] * 384, [0.3] * 384],
+        metadatas=[{"name": "New", "content_hash": "b"}, {"name": "Added", "content_hash": "c"}]
+    )
+    
+    assert success is True
+    assert vector_store.get_component("upsert-1")["metadata"]["name"] == "New"
+    assert vector_store.get_content_hashes(["upsert-1", "upsert-2", "missing"]) == {
+        "upsert-1": "b",
+        "upsert-2": "c",
+    }
+
+
+def test_search_accepts_numpy_embeddings(vector_store):
+    """Test that one embedding or several can be searched as numpy arrays"""
+    vector_store.add_component("array-1", "Button", [0.1] * 384, {"name": "Button"})
+    
+    single = vector_store.search(np.full(384, 0.1, dtype=np.float32), limit=1)
+    assert single["ids"] == [["array-1"]]
+    
+    batch = vector_store.search(np.full((2, 384), 0.1, dtype=np.float32), limit=1)
+    assert batch["ids"] == [["array-1"], ["array-1"]]
+
+
+def test_get_documents_and_embeddings(vector_store):
+    """Test reading stored documents and embeddings by ID"""
+    vector_store.add_component("stored-1", "Stored", [0.25] * 384, {"name": "Stored"})
+    
+    stored = vector_store.get_documents_and_embeddings(["stored-1", "missing"])
+    
+    assert list(stored) == ["stored-1"]
+    document, embedding = stored["stored-1"]
+    assert document == "Stored"
+    assert list(embedding) == pytest.approx([0.25] * 384)
+
+
+def test_exact_search_follows_writes(vector_store):
+    """Test that searches of a small collection see each add, update and delete"""
+    vector_store.add_component("exact-1", "First", [1.0] + [0.0] * 383, {"name": "First"})
+    vector_store.add_component("exact-2", "Second", [0.0, 1.0] + [0.0] * 382, {"name": "Second"})
+    query = [1.0] + [0.0] * 383
+    
+    assert vector_store.search(query, limit=1)["ids"] == [["exact-1"]]
+    
+    vector_store.update_component("exact-2", "Second", [1.0] + [0.0] * 383, {"name": "Second"})
+    vector_store.delete_component("exact-1")
+    
+    assert vector_store.search(query, limit=2)["ids"] == [["exact-2"]]
+
+
+def test_listings_are_cached_until_a_write(vector_store):
+    """Test that repeated listings are reused and any write refreshes them"""
+    vector_store.add_component("listed-1", "First", [0.1] * 384, {"name": "First"})
+    
+    first = vector_store.get_all_components_paged(limit=10, offset=0)
+    assert vector_store.get_all_components_paged(limit=10, offset=0) is first
+    assert vector_store.get_all_components() is vector_store.get_all_components()
+    
+    vector_store.add_component("listed-2", "Second", [0.2] * 384, {"name": "Second"})
+    
+    assert [c["id"] for c in vector_store.get_all_components_paged(limit=10, offset=0)] == [
+        "listed-1", "listed-2"
+    ]
+    assert len(vector_store.get_all_components()) == 2
+
+
+def test_distance_space_only_applies_to_new_collections(vector_store):
+    """Test that an existing collection keeps the space it was created with"""
+    vector_store.settings = dataclasses.replace(
+        vector_store.settings,
+        chroma_collection_name="components-ip",
+        chroma_space="ip",
+        exact_search_max_components=0
+    )
+    vector_store._initialize()
+    vector_store.add_component("ip-1", "Button", [0.6, 0.8] + [0.0] * 382, {"name": "Button"})
+    
+    vector_store.settings = dataclasses.replace(vector_store.settings, chroma_space="cosine")
+    vector_store._initialize()
+    
+    assert vector_store.collection.metadata["hnsw:space"] == "ip"
+    results = vector_store.search([0.6, 0.8] + [0.0] * 382, limit=1)
+    assert results["scores"][0][0] == pytest.approx(1.0, abs=1e-4)
+
+
+def test_backfill_descriptions_pages_through_collection(vector_store, monkeypatch):
+    """Test that descriptions are recovered for old components across pages"""
+    from src.db import vector_store as vector_store_module
+    monkeypatch.setattr(vector_store_module, "_BACKFILL_PAGE_SIZE", 2)
+    
+    vector_store.collection.add(
+        ids=["old-1", "old-2", "new-1"],
+        documents=[
+            "Component: Alert\nDescription: Shows a message",
+            "Component: Badge\nDescription: Small count",
+            "Component: Card\nDescription: Ignored",
+        ],
+        embeddings=[[0.1] * 384, [0.2] * 384, [0.3] * 384],
+        metadatas=[{"name": "Alert"}, {"name": "Badge"}, {"name": "Card", "description": "Kept"}]
+    )
+    
+    vector_store._backfill_descriptions()
+    
+    result = vector_store.collection.get(ids=["old-1", "old-2", "new-1"], include=["metadatas"])
+    descriptions = {i: m["description"] for i, m in zip(result["ids"], result["metadatas"])}
+    assert descriptions == {"old-1": "Shows a message", "old-2": "Small count", "new-1": "Kept"}